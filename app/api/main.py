@@ -107,6 +107,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down RSSNewsReader API...")
+    
+    # Chiude il connection pool condiviso degli scrapers
+    from ..scrapers import ScraperManager
+    await ScraperManager.close_shared_context()
 
 # Root endpoint
 @app.get("/", tags=["root"])
@@ -45,6 +45,9 @@ class SourceResponse(BaseModel):
     next_scrape: Optional[dt.datetime] = None
     rate_limit_delay: int
     update_frequency: int
+    poll_interval: Optional[int] = None
+    claimed_by: Optional[str] = None
+    lease_expires: Optional[dt.datetime] = None
     created_date: dt.datetime
     updated_date: dt.datetime
     article_count: Optional[int] = None
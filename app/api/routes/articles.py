@@ -7,6 +7,7 @@ import datetime as dt
 from ..dependencies import get_db, validate_pagination
 from ..models import ArticleResponse, ArticleListResponse, ArticleUpdate, SearchFilter
 from ...models import Article, Source, Tag, ArticleTag
+from ...scrapers import ScraperManager
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
@@ -192,6 +193,7 @@ async def delete_article(article_id: int, db: Session = Depends(get_db)):
             detail=f"Article with id {article_id} not found"
         )
     
+    source_id = article.source_id
     try:
         db.delete(article)
         db.commit()
@@ -202,6 +204,9 @@ async def delete_article(article_id: int, db: Session = Depends(get_db)):
             detail=f"Error deleting article: {str(e)}"
         )
     
+    # L'articolo potrà essere di nuovo importato dallo scraper
+    ScraperManager.get_shared_context().seen_index.forget(source_id) # type: ignore
+    
     return {"message": f"Article {article_id} deleted successfully"}
 
 @router.post("/search", response_model=ArticleListResponse)
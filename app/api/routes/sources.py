@@ -9,9 +9,19 @@ from ..dependencies import get_db
 from ..models import SourceResponse, SourceListResponse, SourceCreate, SourceUpdate, ScrapeRequest, ScrapeResponse
 from ...models import Source, Article
 from ...scrapers import ScraperManager
+from ...scrapers.selectors import validate_scraping_config
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
+def _check_scraping_config(scraping_config):
+    """Rifiuta configurazioni con selettori non compilabili"""
+    errors = validate_scraping_config(scraping_config)
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid scraping_config: {'; '.join(errors)}"
+        )
+
 @router.get("/", response_model=SourceListResponse)
 async def get_sources(
     skip: int = Query(0, ge=0),
@@ -68,6 +78,9 @@ async def get_sources(
             next_scrape=source.next_scrape,
             rate_limit_delay=source.rate_limit_delay,
             update_frequency=source.update_frequency,
+            poll_interval=source.poll_interval,
+            claimed_by=source.claimed_by,
+            lease_expires=source.lease_expires,
             created_date=source.created_date,
             updated_date=source.updated_date,
             article_count=article_count
@@ -109,6 +122,9 @@ async def get_source(source_id: int, db: Session = Depends(get_db)):
         next_scrape=source.next_scrape,
         rate_limit_delay=source.rate_limit_delay,
         update_frequency=source.update_frequency,
+        poll_interval=source.poll_interval,
+        claimed_by=source.claimed_by,
+        lease_expires=source.lease_expires,
         created_date=source.created_date,
         updated_date=source.updated_date,
         article_count=article_count
@@ -126,6 +142,8 @@ async def create_source(source_create: SourceCreate, db: Session = Depends(get_d
             detail=f"Source with name '{source_create.name}' already exists"
         )
     
+    _check_scraping_config(source_create.scraping_config)
+    
     # Crea source
     source = Source(
         name=source_create.name,
@@ -180,12 +198,18 @@ async def update_source(
     
     # Aggiorna campi
     update_data = source_update.dict(exclude_unset=True)
+    if 'scraping_config' in update_data:
+        _check_scraping_config(update_data['scraping_config'])
     
     for field, value in update_data.items():
         if field in ['base_url', 'rss_url'] and value:
             value = str(value)
         setattr(source, field, value)
     
+    # Nuova frequenza: l'intervallo adattivo riparte da quella
+    if 'update_frequency' in update_data:
+        source.poll_interval = None # type: ignore
+    
     source.updated_date = dt.datetime.now(dt.timezone.utc)
     
     try:
@@ -224,6 +248,8 @@ async def delete_source(source_id: int, db: Session = Depends(get_db)):
             detail=f"Error deleting source: {str(e)}"
         )
     
+    ScraperManager.get_shared_context().seen_index.forget(source_id)
+    
     return {
         "message": f"Source {source_id} deleted successfully",
         "articles_deleted": article_count
@@ -264,27 +290,31 @@ async def scrape_source(
         manager = ScraperManager(db)
         start_time = dt.datetime.now(dt.timezone.utc)
         
-        articles = await manager.scrape_source(source)
+        # Esito reale della pipeline: lease di un altro worker o scrape fallito non sono successi
+        runs = await manager.scrape_sources([source])
+        if not runs:
+            raise RuntimeError("Scraper returned no result")
+        run = runs[0]
         
         end_time = dt.datetime.now(dt.timezone.utc)
         duration = (end_time - start_time).total_seconds()
         
         from ..models import ScrapeResult
         result = ScrapeResult(
-            source_id=source.id,
-            source_name=source.name,
-            articles_scraped=len(articles),
-            success=True,
-            error_message=None,
-            duration_seconds=duration
+            source_id=run.source_id,
+            source_name=run.source_name,
+            articles_scraped=len(run.articles),
+            success=run.success,
+            error_message=run.error,
+            duration_seconds=run.duration
         )
         
         return ScrapeResponse(
             results=[result],
-            total_articles=len(articles),
+            total_articles=len(run.articles),
             total_duration=duration,
-            success_count=1,
-            error_count=0
+            success_count=1 if run.success else 0,
+            error_count=0 if run.success else 1
         )
         
     except Exception as e:
@@ -347,43 +377,26 @@ async def scrape_sources(
         manager = ScraperManager(db)
         start_time = dt.datetime.now(dt.timezone.utc)
         
-        # Scrape in parallelo
+        # Scrape in parallelo nella pipeline dello scraper
+        from ..models import ScrapeResult
         results = []
         total_articles = 0
         success_count = 0
         error_count = 0
         
-        for source in sources:
-            try:
-                source_start = dt.datetime.now(dt.timezone.utc)
-                articles = await manager.scrape_source(source)
-                source_end = dt.datetime.now(dt.timezone.utc)
-                source_duration = (source_end - source_start).total_seconds()
-                
-                from ..models import ScrapeResult
-                result = ScrapeResult(
-                    source_id=source.id,
-                    source_name=source.name,
-                    articles_scraped=len(articles),
-                    success=True,
-                    error_message=None,
-                    duration_seconds=source_duration
-                )
-                results.append(result)
-                total_articles += len(articles)
+        for run in await manager.scrape_sources(sources):
+            results.append(ScrapeResult(
+                source_id=run.source_id,
+                source_name=run.source_name,
+                articles_scraped=len(run.articles),
+                success=run.success,
+                error_message=run.error,
+                duration_seconds=run.duration
+            ))
+            total_articles += len(run.articles)
+            if run.success:
                 success_count += 1
-                
-            except Exception as e:
-                from ..models import ScrapeResult
-                result = ScrapeResult(
-                    source_id=source.id,
-                    source_name=source.name,
-                    articles_scraped=0,
-                    success=False,
-                    error_message=str(e),
-                    duration_seconds=0
-                )
-                results.append(result)
+            else:
                 error_count += 1
         
         end_time = dt.datetime.now(dt.timezone.utc)
@@ -7,7 +7,8 @@ from collections import Counter
 
 from ..dependencies import get_db
 from ..models import SystemStats, SourceStats, ArticleStats
-from ...models import Source, Article, Tag, ArticleTag
+from ...models import Source, Article, Tag, ArticleTag, FetchStat
+from ...scrapers import ScraperManager
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
@@ -510,4 +511,98 @@ async def get_source_errors(
         "error_sources": errors_data,
         "total_error_sources": len(errors_data),
         "check_date": dt.datetime.now(dt.timezone.utc).isoformat()
-    }
\ No newline at end of file
+    }
+
+@router.get("/scraper")
+async def get_scraper_metrics():
+    """Get in-process scraper metrics (transfer sizes, HTTP cache hits/misses, pipeline queues)"""
+    
+    context = ScraperManager.get_shared_context()
+    metrics = context.metrics.snapshot()
+    
+    return {
+        **metrics,
+        "cache_storage": context.http_cache.stats() if context.http_cache else None,
+        "check_time": dt.datetime.now(dt.timezone.utc).isoformat()
+    }
+
+
+def _network_columns():
+    """Somme dei contatori di FetchStat per le query aggregate"""
+    return (
+        func.sum(FetchStat.requests),
+        func.sum(FetchStat.errors),
+        func.sum(FetchStat.reused_connections),
+        func.sum(FetchStat.bytes),
+        func.sum(FetchStat.dns_ms),
+        func.sum(FetchStat.connect_ms),
+        func.sum(FetchStat.ttfb_ms),
+        func.sum(FetchStat.transfer_ms),
+        func.sum(FetchStat.total_ms),
+        func.max(FetchStat.max_total_ms)
+    )
+
+def _network_summary(values) -> Dict:
+    """Medie per fase a partire dalle somme aggregate"""
+    requests, errors, reused, total_bytes, dns, connect, ttfb, transfer, total, max_total = values
+    requests = requests or 0
+    
+    def avg(value):
+        return round((value or 0) / requests, 1) if requests else 0
+    
+    return {
+        "requests": requests,
+        "errors": errors or 0,
+        "error_percentage": round((errors or 0) / requests * 100, 1) if requests else 0,
+        "reused_connections": reused or 0,
+        "bytes": total_bytes or 0,
+        "avg_dns_ms": avg(dns),
+        "avg_connect_ms": avg(connect),
+        "avg_ttfb_ms": avg(ttfb),
+        "avg_transfer_ms": avg(transfer),
+        "avg_total_ms": avg(total),
+        "max_total_ms": round(max_total or 0, 1)
+    }
+
+@router.get("/network")
+async def get_network_stats(
+    days: int = Query(7, ge=1, le=365),
+    source_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get network timing (DNS, connect/TLS, TTFB, transfer) per source and per host"""
+    
+    start_date = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=days)
+    
+    by_source_query = db.query(FetchStat.source_id, Source.name, *_network_columns())\
+        .outerjoin(Source, FetchStat.source_id == Source.id)\
+        .filter(FetchStat.recorded_date >= start_date)
+    by_host_query = db.query(FetchStat.host, *_network_columns())\
+        .filter(FetchStat.recorded_date >= start_date)
+    
+    if source_id:
+        by_source_query = by_source_query.filter(FetchStat.source_id == source_id)
+        by_host_query = by_host_query.filter(FetchStat.source_id == source_id)
+    
+    by_source = by_source_query.group_by(FetchStat.source_id, Source.name).all()
+    by_host = by_host_query.group_by(FetchStat.host).all()
+    
+    sources_data = [
+        {"source_id": row[0], "source_name": row[1], **_network_summary(row[2:])}
+        for row in by_source
+    ]
+    hosts_data = [
+        {"host": row[0], **_network_summary(row[1:])}
+        for row in by_host
+    ]
+    
+    # Le più lente in cima
+    sources_data.sort(key=lambda x: x["avg_total_ms"], reverse=True)
+    hosts_data.sort(key=lambda x: x["avg_total_ms"], reverse=True)
+    
+    return {
+        "sources": sources_data,
+        "hosts": hosts_data,
+        "period_days": days,
+        "check_date": dt.datetime.now(dt.timezone.utc).isoformat()
+    }
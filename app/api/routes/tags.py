@@ -9,6 +9,7 @@ import datetime as dt
 from ..dependencies import get_db
 from ..models import TagResponse, CategoryResponse, TagCreate, CategoryCreate
 from ...models import Tag, Category, ArticleTag, Article
+from ...scrapers import ScraperManager
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
@@ -171,6 +172,9 @@ async def update_tag(
             detail=f"Error updating tag: {str(e)}"
         )
     
+    # normalized_name cambiato: la cache dello scraper va ricaricata
+    ScraperManager.get_shared_context().tag_cache.invalidate()
+    
     return await get_tag(tag_id, db)
 
 @router.delete("/{tag_id}")
@@ -198,6 +202,8 @@ async def delete_tag(tag_id: int, db: Session = Depends(get_db)):
             detail=f"Error deleting tag: {str(e)}"
         )
     
+    ScraperManager.get_shared_context().tag_cache.invalidate()
+    
     return {
         "message": f"Tag {tag_id} deleted successfully",
         "associations_removed": associations_count
@@ -544,6 +550,7 @@ async def bulk_delete_tags(
         deleted_count = db.query(Tag).filter(Tag.id.in_(tag_ids)).delete(synchronize_session=False)
         
         db.commit()
+        ScraperManager.get_shared_context().tag_cache.invalidate()
         
         return {
             "message": f"Successfully deleted {deleted_count} tags",
@@ -615,6 +622,7 @@ async def merge_tags(
         db.delete(source_tag)
         
         db.commit()
+        ScraperManager.get_shared_context().tag_cache.invalidate()
         
         return {
             "message": f"Successfully merged '{source_tag.name}' into '{target_tag.name}'",
@@ -0,0 +1,21 @@
+"""Hash di URL e contenuto degli articoli.
+
+Senza dipendenze da database o logging: li usano sia i modelli sia i worker
+del ParserPool, che non devono importare app.models (crea l'engine).
+"""
+import hashlib
+from typing import Optional
+
+
+def compute_url_hash(url: str) -> str:
+    """Hash dell'URL canonico (senza query string e fragment)"""
+    # Rimuovi parametri di tracking comuni
+    url_clean = url.split('?')[0].split('#')[0]
+    return hashlib.sha256(url_clean.encode()).hexdigest()
+
+
+def compute_content_hash(content: Optional[str]) -> Optional[str]:
+    """Hash del contenuto normalizzato, per la deduplicazione"""
+    if content is None:
+        return None
+    return hashlib.sha256(content.strip().lower().encode()).hexdigest()
@@ -1,11 +1,12 @@
 from .base import Base
 from .source import Source
-from .article import Article
+from .article import Article, compute_url_hash
 from .category import Category
 from .tag import Tag
 from .article_tag import ArticleTag
 from .article_metadata import ArticleMetadata
 from .article_version import ArticleVersion
+from .fetch_stat import FetchStat
 
 __all__ = [
     'Base',
@@ -15,5 +16,7 @@ __all__ = [
     'Tag',
     'ArticleTag',
     'ArticleMetadata',
-    'ArticleVersion'
+    'ArticleVersion',
+    'FetchStat',
+    'compute_url_hash'
 ]
\ No newline at end of file
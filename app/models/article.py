@@ -1,8 +1,9 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from app.hashing import compute_url_hash, compute_content_hash
 import datetime as dt
-import hashlib
+
 
 class Article(Base):
     __tablename__ = 'articles'
@@ -61,15 +62,12 @@ class Article(Base):
     def generate_content_hash(self):
         """Genera hash del contenuto per deduplicazione"""
         if self.content is not None:
-            content_clean = self.content.strip().lower()
-            self.content_hash = hashlib.sha256(content_clean.encode()).hexdigest()
+            self.content_hash = compute_content_hash(self.content) # type: ignore
     
     def generate_url_hash(self):
         """Genera hash dell'URL canonico"""
         if self.url is not None:
-            # Rimuovi parametri di tracking comuni
-            url_clean = self.url.split('?')[0].split('#')[0]
-            self.url_hash = hashlib.sha256(url_clean.encode()).hexdigest()
+            self.url_hash = compute_url_hash(self.url) # type: ignore
     
     def to_dict(self):
         return {
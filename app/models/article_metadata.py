@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -15,6 +15,8 @@ class ArticleMetadata(Base):
     
     # Indice composito per performance
     __table_args__ = (
+        # Metadata per articolo e chiave (es. rss_id caricati dal SeenUrlIndex)
+        Index('ix_article_metadata_article_key', 'article_id', 'key'),
         {'extend_existing': True},
     )
     
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 import os
 
 Base = declarative_base()
@@ -17,17 +17,29 @@ def get_db_path():
     
     return os.path.join(data_dir, 'database.db')
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL: i lettori non bloccano il writer, più processi possono usare il database"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
 def create_db_engine():
-    """Crea engine SQLite compatibile cross-platform"""
+    """Crea engine SQLite compatibile cross-platform, o per DATABASE_URL se impostata (es. PostgreSQL multi-nodo)"""
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url and not database_url.startswith('sqlite'):
+        return create_engine(database_url, echo=False, pool_pre_ping=True)
+    
     db_path = get_db_path()
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
     engine = create_engine(
-        f'sqlite:///{db_path}',
+        database_url or f'sqlite:///{db_path}',
         echo=False,
         pool_pre_ping=True,
-        connect_args={'check_same_thread': False}
+        connect_args={'check_same_thread': False, 'timeout': 30}  # attesa del lock di scrittura
     )
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
     return engine
 
 # Crea engine globale
@@ -42,6 +54,34 @@ def get_db():
     finally:
         db.close()
 
+def add_missing_columns(bind=None):
+    """Aggiunge alle tabelle esistenti le colonne nullable introdotte dopo la loro creazione"""
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = inspector.get_table_names()
+    
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def add_missing_indexes(bind=None):
+    """Crea sulle tabelle esistenti gli indici introdotti dopo la loro creazione"""
+    bind = bind or engine
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
 def create_tables():
     """Crea tutte le tabelle nel database"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    add_missing_indexes()
\ No newline at end of file
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
+from .base import Base
+import datetime as dt
+
+class FetchStat(Base):
+    __tablename__ = 'fetch_stats'
+
+    id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, ForeignKey('sources.id', ondelete='CASCADE'), nullable=True)
+    host = Column(String(255), nullable=False)
+    recorded_date = Column(DateTime, default=lambda: dt.datetime.now(dt.timezone.utc))
+
+    # Contatori della run di scraping
+    requests = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    reused_connections = Column(Integer, default=0)
+    bytes = Column(Integer, default=0)
+
+    # Somme dei tempi per fase (ms): la media è somma / requests
+    dns_ms = Column(Float, default=0.0)
+    connect_ms = Column(Float, default=0.0)  # TCP + TLS
+    ttfb_ms = Column(Float, default=0.0)
+    transfer_ms = Column(Float, default=0.0)
+    total_ms = Column(Float, default=0.0)
+    max_total_ms = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index('ix_fetch_stats_source_date', 'source_id', 'recorded_date'),
+        Index('ix_fetch_stats_host_date', 'host', 'recorded_date'),
+    )
+
+    def __repr__(self):
+        return f"<FetchStat(source_id={self.source_id}, host='{self.host}', requests={self.requests})>"
+
+    def to_dict(self):
+        requests = self.requests or 0
+        return {
+            'source_id': self.source_id,
+            'host': self.host,
+            'recorded_date': self.recorded_date.isoformat() if self.recorded_date else None, # type: ignore
+            'requests': requests,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'avg_dns_ms': round(self.dns_ms / requests, 1) if requests else 0, # type: ignore
+            'avg_connect_ms': round(self.connect_ms / requests, 1) if requests else 0, # type: ignore
+            'avg_ttfb_ms': round(self.ttfb_ms / requests, 1) if requests else 0, # type: ignore
+            'avg_transfer_ms': round(self.transfer_ms / requests, 1) if requests else 0, # type: ignore
+            'avg_total_ms': round(self.total_ms / requests, 1) if requests else 0, # type: ignore
+            'max_total_ms': self.max_total_ms
+        }
@@ -19,10 +19,23 @@ class Source(Base):
     update_frequency = Column(Integer, default=3600)  # secondi
     last_scraped = Column(DateTime)
     next_scrape = Column(DateTime)
+    poll_interval = Column(Integer, nullable=True)  # secondi, adattato alla resa di articoli nuovi
     
     # Rate limiting
     rate_limit_delay = Column(Integer, default=2)  # secondi
     
+    # Validatori HTTP per conditional GET
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    feed_hash = Column(String(64), nullable=True)  # sha256 dell'ultimo body scaricato
+    
+    # Sitemap: lastmod più recente già elaborato (scraping incrementale)
+    sitemap_watermark = Column(DateTime, nullable=True)
+    
+    # Lease per lo scraping distribuito: worker che sta facendo lo scrape e scadenza
+    claimed_by = Column(String(100), nullable=True)
+    lease_expires = Column(DateTime, nullable=True)
+    
     # Stato
     is_active = Column(Boolean, default=True)
     error_count = Column(Integer, default=0)
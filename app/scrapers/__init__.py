@@ -1,11 +1,33 @@
-from .base import BaseReader
-from .rss_reader import RSSReader
-from .web_reader import WebReader
-from .manager import ScraperManager
+from importlib import import_module
+
+# Esportazioni caricate al primo accesso: i worker del ParserPool importano solo
+# app.scrapers.parsing e app.scrapers.articles, senza la configurazione del
+# logging di base/manager né l'engine creato da app.models
+_EXPORTS = {
+    'BaseReader': '.base',
+    'RSSReader': '.rss_reader',
+    'WebReader': '.web_reader',
+    'SitemapReader': '.sitemap_reader',
+    'ScraperManager': '.manager',
+    'ScraperConfig': '.config',
+    'ScraperContext': '.context'
+}
 
 __all__ = [
     'BaseReader',
     'RSSReader', 
     'WebReader',
-    'ScraperManager'
-]
\ No newline at end of file
+    'SitemapReader',
+    'ScraperManager',
+    'ScraperConfig',
+    'ScraperContext'
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
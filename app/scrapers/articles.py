@@ -0,0 +1,81 @@
+"""Articoli estratti dai reader e preparati per il database.
+
+Solo dati e calcoli puri: il modulo non importa sessione, modelli né
+configurazione del logging, così i worker del ParserPool lo caricano senza
+inizializzare il resto del pacchetto.
+"""
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.hashing import compute_url_hash, compute_content_hash
+
+
+@dataclass
+class ScrapedArticle:
+    """Struttura dati per articolo estratto"""
+    title: str
+    content: str
+    url: str
+    author: Optional[str] = None
+    published_date: Optional[dt.datetime] = None
+    summary: Optional[str] = None
+    tags: Optional[List[str]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        if self.tags is None:
+            self.tags = []
+        if self.metadata is None:
+            self.metadata = {}
+
+
+@dataclass
+class PreparedArticle:
+    """Articolo pronto per l'inserimento: hash, conteggi e tag calcolati fuori dalla sessione"""
+    title: str
+    content: str
+    url: str
+    url_hash: str
+    content_hash: Optional[str]
+    word_count: int
+    author: Optional[str] = None
+    published_date: Optional[dt.datetime] = None
+    summary: Optional[str] = None
+    tags: Dict[str, str] = field(default_factory=dict)  # normalized_name -> nome originale
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+
+def prepare_articles(scraped_articles: List[ScrapedArticle]) -> List[PreparedArticle]:
+    """Lavoro CPU degli articoli di una run, senza accesso al database
+
+    Un articolo per URL anche se il reader ne ha prodotto più copie. Gira
+    anche nel ParserPool: argomenti e risultato sono picklable.
+    """
+    prepared: Dict[str, PreparedArticle] = {}
+    for scraped in scraped_articles:
+        if scraped.url in prepared:
+            continue
+
+        tags: Dict[str, str] = {}
+        for tag_name in scraped.tags or []:
+            if not tag_name:
+                continue
+            tag_name_clean = tag_name.strip().lower()
+            if tag_name_clean:
+                tags.setdefault(tag_name_clean, tag_name)
+
+        prepared[scraped.url] = PreparedArticle(
+            title=scraped.title,
+            content=scraped.content,
+            url=scraped.url,
+            url_hash=compute_url_hash(scraped.url),
+            content_hash=compute_content_hash(scraped.content),
+            word_count=len(scraped.content.split()) if scraped.content else 0,
+            author=scraped.author,
+            published_date=scraped.published_date,
+            summary=scraped.summary,
+            tags=tags,
+            metadata={key: str(value) for key, value in (scraped.metadata or {}).items() if value is not None}
+        )
+    return list(prepared.values())
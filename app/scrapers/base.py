@@ -1,11 +1,26 @@
 import asyncio
+import hashlib
 import logging
+import time
+import logging.config
 from abc import ABC, abstractmethod
 import datetime as dt
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Union
 import aiohttp
 from dataclasses import dataclass
 
+from .articles import ScrapedArticle
+from .context import ScraperContext
+from .http_cache import CacheEntry
+from .encoding import detect_charset, decode_body, accept_encoding
+from .metrics import ScraperMetrics
+from .parser_pool import ParserPool
+from .rate_limiter import HostRateLimiter
+from .retry import RetryPolicy, parse_retry_after
+from .robots import RobotsCache
+from .text import normalize_text
+from .tracing import RequestTiming, create_trace_config
+
 # Configurazione logging
 # logging.basicConfig(
 #     level=logging.INFO,
@@ -14,35 +29,92 @@ from dataclasses import dataclass
 logging.config.fileConfig('logging.ini')
 
 @dataclass
-class ScrapedArticle:
-    """Struttura dati per articolo estratto"""
-    title: str
-    content: str
+class FetchResult:
+    """Risposta HTTP scaricata: bytes grezzi e charset rilevato"""
     url: str
-    author: Optional[str] = None
-    published_date: Optional[dt.datetime] = None
-    summary: Optional[str] = None
-    tags: Optional[List[str]] = None
-    metadata: Optional[Dict[str, Any]] = None
-    
-    def __post_init__(self):
-        if self.tags is None:
-            self.tags = []
-        if self.metadata is None:
-            self.metadata = {}
+    body: bytes
+    status: int = 200
+    content_type: Optional[str] = None
+    encoding: Optional[str] = None
+    from_cache: bool = False
+    
+    @property
+    def text(self) -> str:
+        """Body decodificato con il charset rilevato"""
+        return decode_body(self.body, self.encoding)
+    
+    @property
+    def response_headers(self) -> Dict[str, str]:
+        """Headers utili ai parser che fanno la propria decodifica (feedparser)"""
+        return {'content-type': self.content_type} if self.content_type else {}
+
+class ResponseAbortedError(Exception):
+    """Lettura del body interrotta: oltre il limite di dimensione o di tempo della source"""
+    pass
+
+class RetryableFetchError(Exception):
+    """Errore transitorio di fetch (5xx, 429, ...) per cui ha senso ritentare"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 class BaseReader(ABC):
     """Classe base astratta per tutti i reader"""
     
-    def __init__(self, source_config: Dict[str, Any]):
+    def __init__(self, source_config: Dict[str, Any], context: Optional[ScraperContext] = None):
         self.source_config = source_config
+        self.context = context
         self.logger = logging.getLogger(self.__class__.__name__)
         self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
         
         # Configurazione di base
         self.timeout = source_config.get('timeout', 30)
         self.rate_limit = source_config.get('rate_limit_delay', 2)
         self.max_retries = source_config.get('max_retries', 3)
+        self.max_response_bytes = source_config.get('max_response_bytes', 5 * 1024 * 1024)
+        self.body_timeout = source_config.get('body_timeout', 20)
+        
+        # Validatori per conditional GET (persistiti sulla Source)
+        self.validators: Dict[str, Optional[str]] = {
+            'etag': source_config.get('etag'),
+            'last_modified': source_config.get('last_modified'),
+            'feed_hash': source_config.get('feed_hash')
+        }
+        self.not_modified = False
+        
+        # Rate limiter per host e metriche: condivisi se il reader riceve un contesto
+        self.rate_limiter = context.rate_limiter if context is not None else HostRateLimiter()
+        self.metrics = context.metrics if context is not None else ScraperMetrics()
+        self.http_cache = context.http_cache if context is not None else None
+        self.robots = context.robots if context is not None else RobotsCache()
+        self.parser_pool = context.parser_pool if context is not None else ParserPool()
+        self.source_key = str(source_config.get('source_id') or source_config.get('base_url', ''))
+        
+        # Politica di retry ed esito dell'ultima richiesta
+        self.retry_policy = RetryPolicy(
+            max_retries=self.max_retries,
+            base_delay=source_config.get('retry_base_delay', 1.0),
+            max_delay=source_config.get('retry_max_delay', 60.0)
+        )
+        self.last_status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        
+        # Tempi per fase delle richieste di rete di questa run
+        self.request_timings: List[RequestTiming] = []
+        
+        # URL completi degli articoli già salvati: le entry note vengono saltate prima di ogni elaborazione
+        self.known_urls: Set[str] = source_config.get('known_urls') or set()
+        # Id delle entry RSS già salvate: il link può cambiare, l'id resta
+        self.known_ids: Set[str] = source_config.get('known_ids') or set()
+        self.skipped_known = 0
+        
+        # URL non richiesti perché esclusi da robots.txt
+        self.skipped_robots = 0
+        
+        # Memo delle pagine (feed, elenchi) della run: ogni URL è scaricato una sola volta
+        self._pages: Dict[str, Optional[FetchResult]] = {}
         
         # Headers comuni
         self.headers = {
@@ -50,69 +122,288 @@ class BaseReader(ABC):
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'it-IT,it;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': accept_encoding(
+                source_config.get('enable_brotli', True),
+                source_config.get('enable_zstd', True)
+            ),
             'Connection': 'keep-alive',
         }
     
     async def __aenter__(self):
         """Context manager entry"""
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers=self.headers
-        )
+        self._pages = {}
+        if self.context is not None:
+            # Sessione condivisa prestata dal ScraperManager
+            self.session = self.context.get_session()
+            self._owns_session = False
+        else:
+            # Uso standalone: sessione privata del reader
+            connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[create_trace_config()]
+            )
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+        self.session = None
+    
+    async def _read_body(self, response: aiohttp.ClientResponse, max_bytes: Optional[int] = None) -> bytes:
+        """Legge il body in streaming interrompendo oltre max_bytes (default max_response_bytes)"""
+        max_bytes = max_bytes or self.max_response_bytes
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise ResponseAbortedError(f"Content-Length {response.content_length} exceeds {max_bytes} bytes")
+        
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseAbortedError(f"Body exceeds {max_bytes} bytes")
+            chunks.append(chunk)
+        
+        return b''.join(chunks)
+    
+    def _record_transfer(self, response: aiohttp.ClientResponse, body: bytes):
+        """Registra byte sul filo e decodificati per la source"""
+        encoding = response.headers.get('Content-Encoding')
+        wire_bytes = getattr(response.content, 'total_raw_bytes', None)
+        if wire_bytes is None:
+            # aiohttp più vecchi: Content-Length è la dimensione codificata
+            wire_bytes = response.content_length if response.content_length is not None else len(body)
+        
+        self.metrics.record_transfer(self.source_key, encoding, wire_bytes, len(body))
     
-    async def get_response_content(self, response: aiohttp.ClientResponse) -> str:
-        """Helper per ottenere il testo della risposta"""
+    def _conditional_headers(self) -> Dict[str, str]:
+        """Headers If-None-Match / If-Modified-Since dai validatori salvati"""
+        headers = {}
+        if self.validators.get('etag'):
+            headers['If-None-Match'] = str(self.validators['etag'])
+        if self.validators.get('last_modified'):
+            headers['If-Modified-Since'] = str(self.validators['last_modified'])
+        return headers
+    
+    def _store_validators(self, response: aiohttp.ClientResponse):
+        """Memorizza ETag / Last-Modified della risposta"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag:
+            self.validators['etag'] = etag
+        if last_modified:
+            self.validators['last_modified'] = last_modified
+    
+    def is_unchanged_body(self, content: Union[bytes, str]) -> bool:
+        """Confronta l'hash del body con quello dell'ultimo fetch e lo aggiorna"""
+        if isinstance(content, str):
+            content = content.encode('utf-8', 'ignore')
+        body_hash = hashlib.sha256(content).hexdigest()
+        unchanged = body_hash == self.validators.get('feed_hash')
+        self.validators['feed_hash'] = body_hash
+        return unchanged
+    
+    async def _from_cache(self, url: str, content_type: Optional[str]) -> Optional[FetchResult]:
+        """Costruisce il risultato dal body in cache"""
+        body = await asyncio.to_thread(self.http_cache.read_body, url) # type: ignore
+        if body is None:
+            return None
+        return FetchResult(
+            url=url,
+            body=body,
+            content_type=content_type,
+            encoding=detect_charset(body, content_type),
+            from_cache=True
+        )
+    
+    async def _fetch_once(self, url: str, conditional: bool, max_bytes: Optional[int] = None,
+                          body_timeout: Optional[float] = None) -> Optional[FetchResult]:
+        """Singolo tentativo di fetch; solleva RetryableFetchError per errori transitori"""
+        if not self.session:
+            raise RuntimeError("Session is not initialized. Use 'async with BaseReader(...) as reader:' context manager.")
+        
+        # Cache HTTP: un'entry fresca evita del tutto la richiesta
+        cached = self.http_cache.lookup(url) if self.http_cache is not None else None
+        if cached is not None and cached.is_fresh():
+            result = await self._from_cache(url, cached.content_type)
+            if result is not None:
+                self.logger.debug(f"Cache hit: {url}")
+                self.metrics.record_cache('hits')
+                return result
+        
+        await self.rate_limiter.acquire(url, self.rate_limit)
+        
+        self.logger.info(f"Fetching URL: {url}")
+        
+        headers = dict(self.headers)
+        if conditional:
+            headers.update(self._conditional_headers())
+        elif cached is not None:
+            headers.update(cached.validators())
+        
+        timing = RequestTiming(url=url, host=self.extract_domain(url))
+        self.request_timings.append(timing)
         try:
-            content = await response.text()
+            return await self._request(url, headers, conditional, cached, timing, max_bytes, body_timeout)
         except Exception as e:
-            content = await response.text(encoding='latin-1')
-        return content
+            timing.error = timing.error or type(e).__name__
+            raise
+        finally:
+            if timing.finished is None:
+                timing.finished = time.perf_counter()
     
-    async def fetch_url(self, url: str, retries: int = 0) -> Optional[str]:
-        """Fetch URL con retry logic e rate limiting"""
-        try:
-            if retries > 0:
-                await asyncio.sleep(self.rate_limit * retries)
+    async def _request(self, url: str, headers: Dict[str, str], conditional: bool,
+                       cached: Optional[CacheEntry], timing: RequestTiming,
+                       max_bytes: Optional[int] = None, body_timeout: Optional[float] = None) -> Optional[FetchResult]:
+        """Esegue la GET e interpreta la risposta"""
+        body_timeout = body_timeout or self.body_timeout
+        timeout = aiohttp.ClientTimeout(total=max(self.timeout, body_timeout))
+        async with self.session.get(url, headers=headers, timeout=timeout, trace_request_ctx=timing) as response: # type: ignore
+            self.last_status = response.status
             
-            self.logger.info(f"Fetching URL: {url}")
+            if response.status == 304:
+                if conditional:
+                    self.logger.info(f"Not modified (304): {url}")
+                    self.not_modified = True
+                    return None
+                
+                if cached is not None:
+                    await asyncio.to_thread(self.http_cache.refresh, url, response.headers) # type: ignore
+                    result = await self._from_cache(url, cached.content_type)
+                    if result is not None:
+                        self.logger.debug(f"Cache revalidated: {url}")
+                        self.metrics.record_cache('revalidated')
+                        return result
             
-            if not self.session:
-                raise RuntimeError("Session is not initialized. Use 'async with BaseReader(...) as reader:' context manager.")
+            if response.status == 200:
+                # Early abort se il body non arriva entro body_timeout
+                try:
+                    body = await asyncio.wait_for(self._read_body(response, max_bytes), timeout=body_timeout)
+                except asyncio.TimeoutError:
+                    raise ResponseAbortedError(f"Body not received within {body_timeout}s")
+                
+                timing.finished = time.perf_counter()
+                timing.bytes = len(body)
+                
+                if conditional:
+                    self._store_validators(response)
+                
+                self._record_transfer(response, body)
+                content_type = response.headers.get('Content-Type')
+                
+                if self.http_cache is not None:
+                    self.metrics.record_cache('misses')
+                    if await asyncio.to_thread(self.http_cache.store, url, body, response.headers):
+                        self.metrics.record_cache('stored')
+                
+                self.logger.debug(f"Successfully fetched {len(body)} bytes from {url}")
+                return FetchResult(
+                    url=str(response.url),
+                    body=body,
+                    status=response.status,
+                    content_type=content_type,
+                    encoding=detect_charset(body, content_type)
+                )
             
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    content = await self.get_response_content(response)
-                    if content is None:
-                        self.logger.error(f"Failed to fetch content from {url}")
-                        return None
-                        
-                    self.logger.debug(f"Successfully fetched {len(content)} characters from {url}")
-                    return content
-                else:
-                    self.logger.warning(f"HTTP {response.status} for {url}")
-                    return None
-                    
-        except asyncio.TimeoutError:
-            self.logger.error(f"Timeout fetching {url}")
-            if retries < self.max_retries:
-                return await self.fetch_url(url, retries + 1)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                self.retry_after = max(self.retry_after or 0.0, retry_after)
+            
+            if self.retry_policy.is_retryable_status(response.status):
+                raise RetryableFetchError(f"HTTP {response.status}", retry_after)
+            
+            # 4xx e simili: ritentare non serve
+            self.logger.warning(f"HTTP {response.status} for {url}")
             return None
+    
+    async def fetch_document(self, url: str, conditional: bool = False, max_bytes: Optional[int] = None,
+                             body_timeout: Optional[float] = None) -> Optional[FetchResult]:
+        """Fetch URL con retry (backoff esponenziale + jitter) e rate limiting
+        
+        Con conditional=True invia i validatori salvati: una risposta 304
+        imposta self.not_modified e ritorna None. Gli URL esclusi da robots.txt
+        non sono richiesti (None). max_bytes e body_timeout sostituiscono i
+        limiti della source per documenti più grandi di una pagina (sitemap).
+        """
+        if not await self.is_allowed_by_robots(url):
+            self.logger.info(f"Skipping {url}: disallowed by robots.txt")
+            self.skipped_robots += 1
+            return None
+        
+        for attempt in range(self.retry_policy.max_retries + 1):
+            try:
+                return await self._fetch_once(url, conditional, max_bytes, body_timeout)
+            
+            except ResponseAbortedError as e:
+                self.logger.warning(f"Skipping {url}: {str(e)}")
+                return None
+            except RetryableFetchError as e:
+                error, retry_after = str(e), e.retry_after
+            except asyncio.TimeoutError:
+                error, retry_after = "Timeout", None
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+                error, retry_after = f"{type(e).__name__}: {str(e)}", None
+            except Exception as e:
+                self.logger.error(f"{type(e)}: Error fetching {url}: {str(e)}")
+                return None
             
+            if attempt >= self.retry_policy.max_retries:
+                self.logger.error(f"{error} fetching {url}, giving up after {attempt + 1} attempts")
+                return None
+            
+            delay = self.retry_policy.backoff(attempt, retry_after)
+            self.logger.warning(f"{error} fetching {url}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return None
+    
+    async def is_allowed_by_robots(self, url: str) -> bool:
+        """Controlla robots.txt dell'host (in cache) e ne applica il Crawl-delay al rate limiter"""
+        if self.robots is None or self.session is None:
+            return True
+        
+        user_agent = self.headers['User-Agent']
+        try:
+            if not await self.robots.can_fetch(self.session, url, user_agent, self.rate_limiter, self.rate_limit):
+                return False
         except Exception as e:
-            self.logger.error(f"{type(e)}: Error fetching {url}: {str(e)}")
-            if retries < self.max_retries:
-                return await self.fetch_url(url, retries + 1)
-            return None
+            self.logger.warning(f"Error checking robots.txt for {url}: {str(e)}")
+            return True
+        
+        self.rate_limiter.set_crawl_delay(url, self.robots.crawl_delay(url, user_agent))
+        return True
+    
+    async def fetch_page(self, url: str, conditional: bool = False, max_bytes: Optional[int] = None,
+                         body_timeout: Optional[float] = None) -> Optional[FetchResult]:
+        """fetch_document memoizzato per la run (validazione, fetch e paginazione condividono la pagina)
+        
+        Anche un fallimento (None) è memoizzato: la pagina non viene richiesta di nuovo nella stessa run.
+        """
+        if url not in self._pages:
+            self._pages[url] = await self.fetch_document(url, conditional, max_bytes, body_timeout)
+        return self._pages[url]
+    
+    async def fetch_url(self, url: str, conditional: bool = False) -> Optional[str]:
+        """Fetch URL e ritorna il body decodificato"""
+        result = await self.fetch_document(url, conditional)
+        return result.text if result is not None else None
+    
+    def is_known_url(self, url: str) -> bool:
+        """True se l'articolo è già nel database (secondo l'indice caricato dal manager)"""
+        # Confronto sull'URL esatto: url_hash ignora la query string (?id=, ?p=)
+        return url in self.known_urls
+    
+    def is_known_id(self, entry_id: Optional[str]) -> bool:
+        """True se un'entry con questo id (rss_id) è già nel database"""
+        return bool(entry_id) and entry_id in self.known_ids
+    
+    async def run_parser(self, func, document: FetchResult, *args) -> Any:
+        """Esegue una funzione di app.scrapers.parsing sul body del documento nel pool di processi"""
+        return await self.parser_pool.run(func, document.body, *args, size=len(document.body))
     
     @abstractmethod
     async def fetch_articles(self) -> List[ScrapedArticle]:
@@ -147,22 +438,8 @@ class BaseReader(ABC):
         return dt.datetime.now(dt.timezone.utc)
     
     def clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Remove common HTML entities
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&quot;', '"')
-        text = text.replace('&#39;', "'")
-        
-        return text.strip()
+        """Clean and normalize text (entità HTML decodificate, spazi compattati)"""
+        return normalize_text(text)
     
     def extract_domain(self, url: str) -> str:
         """Extract domain from URL"""
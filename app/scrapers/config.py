@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class ScraperConfig:
+    """Configurazione condivisa del layer di fetch"""
+
+    # Pool di connessioni condiviso
+    connection_limit: int = 100  # connessioni totali aperte
+    connection_limit_per_host: int = 8  # connessioni per singolo host
+    dns_cache_ttl: int = 300  # secondi
+    keepalive_timeout: float = 30.0  # secondi
+
+    # Default per i reader
+    request_timeout: int = 30  # secondi
+    max_retries: int = 3
+    retry_base_delay: float = 1.0  # secondi, raddoppiati ad ogni tentativo
+    retry_max_delay: float = 60.0  # cap del backoff
+    max_response_bytes: int = 5 * 1024 * 1024  # sovrascrivibile per source in scraping_config
+    body_timeout: float = 20.0  # secondi per ricevere l'intero body
+    sitemap_max_bytes: int = 50 * 1024 * 1024  # limite del protocollo sitemap (non compressa); per source in scraping_config
+    sitemap_body_timeout: float = 120.0  # secondi per ricevere una sitemap
+    fetch_concurrency: int = 4  # pagine articolo scaricate in parallelo per source
+    enable_brotli: bool = True  # negoziato solo se il decoder è installato
+    enable_zstd: bool = True  # idem
+
+    # Pipeline fetch → parse → write (un solo task scrive sul database)
+    pipeline_fetch_workers: int = 8  # source scaricate in parallelo
+    pipeline_parse_workers: int = 2  # task che preparano gli articoli per il writer
+    pipeline_queue_size: int = 16  # risultati in attesa fra uno stadio e il successivo
+
+    # Intervallo di polling adattivo (sovrascrivibile per source in scraping_config)
+    adaptive_interval: bool = True  # False = sempre update_frequency
+    min_poll_interval: int = 300  # secondi
+    max_poll_interval: int = 86400  # secondi
+    target_yield: float = 3.0  # articoli nuovi per scrape verso cui tende l'intervallo
+
+    # Scheduler (run_scheduler.py)
+    scheduler_batch_size: int = 50  # source due avviate insieme nella pipeline
+    scheduler_refresh_interval: int = 60  # secondi fra due riletture delle source dal database
+
+    # Lease sulle source: più processi o nodi si dividono lo scraping
+    leases_enabled: bool = True
+    lease_ttl: int = 300  # secondi; rinnovato ogni ttl/3 durante lo scrape
+    worker_id: Optional[str] = None  # prefisso dell'id del worker, default hostname
+
+    # Rate limiting per host
+    rate_limit_burst: int = 1  # richieste consecutive ammesse senza attesa
+    domain_rate_limits: Dict[str, float] = field(default_factory=dict)  # dominio -> secondi fra richieste
+
+    # robots.txt: URL non permessi saltati, Crawl-delay applicato al rate limiter
+    robots_enabled: bool = True
+    robots_ttl: int = 86400  # secondi di validità di un robots.txt in cache
+    robots_max_crawl_delay: float = 30.0  # cap del Crawl-delay dichiarato
+
+    # Circuit breaker per source
+    breaker_failure_threshold: int = 5  # fallimenti consecutivi prima dell'apertura
+    breaker_max_cooldown: int = 86400  # secondi
+
+    # Cache HTTP su disco
+    http_cache_enabled: bool = True
+    http_cache_dir: Optional[str] = None  # default: data/http_cache
+    http_cache_max_bytes: int = 256 * 1024 * 1024
+    http_cache_heuristic_max_age: int = 3600  # secondi, per risposte con solo Last-Modified
+
+    # Indice degli URL già salvati, per saltare le entry note
+    seen_index_size: int = 5000  # URL più recenti caricati per source
+    seen_index_ttl: int = 3600  # secondi prima di ricaricare dal database
+
+    # Cache normalized_name -> id dei tag
+    tag_cache_ttl: int = 3600  # secondi prima di ricaricare dal database
+
+    # Parsing CPU-bound fuori dall'event loop
+    parse_workers: int = 2  # processi del pool; 0 = parsing inline
+    parse_inline_max_bytes: int = 64 * 1024  # documenti più piccoli sono parsati inline
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+import aiohttp
+
+from .config import ScraperConfig
+from .http_cache import HttpCache
+from .metrics import ScraperMetrics
+from .parser_pool import ParserPool
+from .rate_limiter import HostRateLimiter
+from .robots import RobotsCache
+from .seen_index import SeenUrlIndex
+from .tag_cache import TagCache
+from .tracing import create_trace_config
+
+
+class ScraperContext:
+    """Risorse di rete condivise tra tutti i reader di un processo"""
+
+    def __init__(self, config: Optional[ScraperConfig] = None):
+        self.config = config or ScraperConfig()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.rate_limiter = HostRateLimiter(self.config.domain_rate_limits, self.config.rate_limit_burst)
+        self.metrics = ScraperMetrics()
+        self.robots = RobotsCache(self.config.robots_ttl, max_crawl_delay=self.config.robots_max_crawl_delay) \
+            if self.config.robots_enabled else None
+        self.http_cache = self._create_http_cache()
+        self.seen_index = SeenUrlIndex(self.config.seen_index_size, self.config.seen_index_ttl)
+        self.tag_cache = TagCache(self.config.tag_cache_ttl)
+        self.parser_pool = ParserPool(self.config.parse_workers, self.config.parse_inline_max_bytes)
+    
+    def _create_http_cache(self) -> Optional[HttpCache]:
+        """Cache HTTP su disco, accanto al database se non configurata"""
+        if not self.config.http_cache_enabled:
+            return None
+        
+        directory = self.config.http_cache_dir
+        if directory is None:
+            from app.models.base import get_db_path
+            directory = os.path.join(os.path.dirname(get_db_path()), 'http_cache')
+        
+        try:
+            return HttpCache(directory, self.config.http_cache_max_bytes, self.config.http_cache_heuristic_max_age)
+        except OSError as e:
+            self.logger.error(f"HTTP cache disabled, cannot use {directory}: {str(e)}")
+            return None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Crea connector e sessione long-lived"""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.connection_limit,
+            limit_per_host=self.config.connection_limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            keepalive_timeout=self.config.keepalive_timeout
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            trace_configs=[create_trace_config()]
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Ritorna la sessione condivisa, creandola se necessario"""
+        loop = asyncio.get_running_loop()
+
+        # Una sessione aiohttp è legata al loop che l'ha creata
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self.logger.info(
+                f"Creating shared HTTP session (limit={self.config.connection_limit}, "
+                f"per_host={self.config.connection_limit_per_host})"
+            )
+            self._session = self._create_session()
+            self._loop = loop
+
+        return self._session
+
+    async def close(self):
+        """Chiude la sessione condivisa e il pool di parsing"""
+        self.parser_pool.shutdown()
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
@@ -0,0 +1,233 @@
+"""Parsing delle date trovate nei feed e nelle pagine.
+
+Le forme più comuni sono riconosciute da espressioni precompilate prima di
+ricorrere a dateutil o parsedatetime: ISO 8601, RFC 822 (feed), date numeriche
+giorno/mese/anno, mesi in italiano ('10 giugno 2025', 'lun 10 giu 2025 ore
+10:30') ed espressioni relative in italiano e inglese ('ieri', '3 ore fa',
+'2 days ago'). Le date assolute sono memorizzate in una cache LRU (le pagine
+ripetono le stesse stringhe a ogni run); quelle relative dipendono dall'ora
+corrente e sono sempre ricalcolate, come le date incomplete ('12:30', 'Monday',
+'10 maggio'), completate con now. Le date ritornate hanno sempre un fuso:
+quelle senza fuso sono interpretate nel fuso locale.
+"""
+import datetime as dt
+import re
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional
+
+from dateutil import parser as date_parser
+
+ITALIAN_MONTHS = {
+    'gennaio': 1, 'febbraio': 2, 'marzo': 3, 'aprile': 4, 'maggio': 5, 'giugno': 6,
+    'luglio': 7, 'agosto': 8, 'settembre': 9, 'ottobre': 10, 'novembre': 11, 'dicembre': 12,
+    'gen': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'mag': 5, 'giu': 6,
+    'lug': 7, 'ago': 8, 'set': 9, 'sett': 9, 'ott': 10, 'nov': 11, 'dic': 12,
+}
+
+# Secondi per unità delle espressioni relative
+_RELATIVE_UNITS = {
+    'secondo': 1, 'secondi': 1, 'sec': 1, 'second': 1, 'seconds': 1, 'secs': 1,
+    'minuto': 60, 'minuti': 60, 'min': 60, 'minute': 60, 'minutes': 60, 'mins': 60,
+    'ora': 3600, 'ore': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600, 'h': 3600,
+    'giorno': 86400, 'giorni': 86400, 'day': 86400, 'days': 86400, 'd': 86400,
+    'settimana': 604800, 'settimane': 604800, 'week': 604800, 'weeks': 604800,
+}
+_ONE = {'un': 1, 'una': 1, 'uno': 1, "un'": 1, 'a': 1, 'an': 1, 'one': 1}
+
+_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?)?(?:Z|[+-]\d{2}(?::?\d{2})?)?$')
+_RFC822_RE = re.compile(r'(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+\d{2}:\d{2}')
+_NUMERIC_RE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})(?:[\sT,]+(?:ore\s+)?(\d{1,2})[:.](\d{2})(?::(\d{2}))?)?$')
+# Come sopra ma con l'anno a due cifre ('10/06/25'), lasciato a dateutil
+_SHORT_NUMERIC_RE = re.compile(r'\d{1,2}[/.-]\d{1,2}[/.-]\d{2}\b')
+_ITALIAN_RE = re.compile(
+    r'(?:[a-zì]+,?\s+)?(\d{1,2})\s+([a-z]+)\.?\s+(\d{4})'
+    r'(?:\s*(?:,|-|alle|ore|alle ore)?\s*(\d{1,2})[:.](\d{2}))?$'
+)
+# Senza anno ('10 maggio', 'sab 10 mag alle 10:30'): risolta rispetto a now, mai in cache
+_ITALIAN_NO_YEAR_RE = re.compile(
+    r'(?:[a-zì]+,?\s+)?(\d{1,2})\s+([a-z]+)\.?'
+    r'(?:\s*(?:,|-|alle|ore|alle ore)?\s*(\d{1,2})[:.](\d{2}))?$'
+)
+_RELATIVE_RE = re.compile(
+    r"(\d+|un'?|una|uno|an?|one)\s*([a-z]+)\s+(?:fa|ago)$"
+)
+_DAY_WORDS = {'oggi': 0, 'today': 0, 'ieri': 1, 'yesterday': 1, "l'altro ieri": 2, 'altro ieri': 2}
+_DAY_WORD_RE = re.compile(
+    r"(l'altro ieri|altro ieri|oggi|ieri|today|yesterday)(?:\s*,?\s*(?:alle\s+|ore\s+|alle ore\s+|at\s+)?(\d{1,2})[:.](\d{2}))?$"
+)
+
+# Etichette prima della data nelle pagine ('Pubblicato il 10 giugno 2025', 'Updated: ...')
+_PREFIX_RE = re.compile(
+    r'^(?:pubblicato|aggiornato|modificato|data|published|updated|posted)(?:\s+(?:il|on))?\s*:?\s+',
+    re.IGNORECASE
+)
+_YEAR_RE = re.compile(r'\b\d{4}\b')
+
+# Default diversi: se dateutil restituisce date diverse la stringa non ha anno, mese e giorno
+_DEFAULT_A = dt.datetime(2000, 1, 1)
+_DEFAULT_B = dt.datetime(2001, 2, 2)
+
+_DATEUTIL_INFO = date_parser.parserinfo()
+
+_calendar = None
+
+
+def _get_calendar():
+    """Calendar di parsedatetime condiviso (costruirlo costa più del parse)"""
+    global _calendar
+    if _calendar is None:
+        import parsedatetime
+        _calendar = parsedatetime.Calendar()
+    return _calendar
+
+
+def _local_timezone() -> dt.tzinfo:
+    tz = dt.datetime.now().astimezone().tzinfo
+    return tz if tz is not None else dt.timezone.utc
+
+
+def _aware(value: dt.datetime) -> dt.datetime:
+    """Le date senza fuso sono nel fuso locale"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=_local_timezone())
+    return value
+
+
+def _parse_italian(day: str, month_name: str, year: int, hour: Optional[str], minute: Optional[str]) -> Optional[dt.datetime]:
+    month = ITALIAN_MONTHS.get(month_name)
+    if month is None:
+        return None
+    return dt.datetime(year, month, int(day), int(hour) if hour else 0, int(minute) if minute else 0)
+
+
+@lru_cache(maxsize=4096)
+def parse_absolute_date(text: str) -> Optional[dt.datetime]:
+    """Data assoluta (con fuso) o None; il risultato è in cache per stringa"""
+    try:
+        if _ISO_RE.match(text):
+            return _aware(dt.datetime.fromisoformat(text))
+
+        if _RFC822_RE.match(text):
+            try:
+                return _aware(parsedate_to_datetime(text))
+            except (TypeError, ValueError):
+                pass
+
+        # Siti italiani: giorno prima del mese
+        match = _NUMERIC_RE.match(text)
+        if match:
+            day, month, year, hour, minute, second = match.groups()
+            return _aware(dt.datetime(
+                int(year), int(month), int(day),
+                int(hour or 0), int(minute or 0), int(second or 0)
+            ))
+
+        lowered = text.lower()
+        match = _ITALIAN_RE.match(lowered)
+        if match:
+            day, month_name, year, hour, minute = match.groups()
+            parsed = _parse_italian(day, month_name, int(year), hour, minute)
+            if parsed is not None:
+                return _aware(parsed)
+
+        # Le espressioni relative non sono date assolute
+        if _RELATIVE_RE.match(lowered) or _DAY_WORD_RE.match(lowered) or _ITALIAN_NO_YEAR_RE.match(lowered):
+            return None
+
+        # Giorno prima del mese solo per le date numeriche; '2025/06/10' e le altre forme restano a dateutil
+        dayfirst = bool(_SHORT_NUMERIC_RE.match(text))
+        parsed = date_parser.parse(text, dayfirst=dayfirst, default=_DEFAULT_A)
+        if parsed != date_parser.parse(text, dayfirst=dayfirst, default=_DEFAULT_B):
+            # Manca anno, mese o giorno ('12:30', 'Monday'): dipende da now, niente cache
+            return None
+        return _aware(parsed)
+    except (ValueError, OverflowError):
+        return None
+
+
+def parse_relative_date(text: str, now: Optional[dt.datetime] = None) -> Optional[dt.datetime]:
+    """Espressioni relative ('ieri', '3 ore fa', '2 days ago') rispetto a now"""
+    now = now or dt.datetime.now(dt.timezone.utc)
+    local_now = now.astimezone(_local_timezone())
+    lowered = text.lower()
+
+    match = _RELATIVE_RE.match(lowered)
+    if match:
+        amount, unit = match.groups()
+        seconds = _RELATIVE_UNITS.get(unit)
+        if seconds is not None:
+            count = _ONE[amount] if amount in _ONE else int(amount)
+            return now - dt.timedelta(seconds=count * seconds)
+
+    match = _DAY_WORD_RE.match(lowered)
+    if match:
+        word, hour, minute = match.groups()
+        day = local_now - dt.timedelta(days=_DAY_WORDS[word])
+        if hour is None:
+            return day if word in ('oggi', 'today') else day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day.replace(hour=int(hour), minute=int(minute), second=0, microsecond=0)
+
+    match = _ITALIAN_NO_YEAR_RE.match(lowered)
+    if match:
+        day, month_name, hour, minute = match.groups()
+        try:
+            parsed = _parse_italian(day, month_name, local_now.year, hour, minute)
+            # Una data di pubblicazione non è nel futuro: '20 dicembre' letto a gennaio è dell'anno prima
+            if parsed is not None and parsed > local_now.replace(tzinfo=None) + dt.timedelta(days=1):
+                parsed = _parse_italian(day, month_name, local_now.year - 1, hour, minute)
+        except ValueError:
+            return None
+        if parsed is not None:
+            return _aware(parsed)
+
+    # Con un anno è una data assoluta già scartata (es. '31 Feb 2025'): parsedatetime la sposterebbe di mese
+    if _YEAR_RE.search(text):
+        return None
+
+    # Data incompleta per dateutil ('12:30', 'Monday'): le parti mancanti vengono da now
+    today = local_now.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    try:
+        parsed = date_parser.parse(text, default=today)
+    except (ValueError, OverflowError):
+        parsed = None
+    if parsed is not None:
+        if parsed.date() > today.date():
+            # Una data di pubblicazione non è nel futuro: 'June 20' è dell'anno prima,
+            # un giorno della settimana ('Monday') l'ultimo passato
+            if any(_DATEUTIL_INFO.month(word) for word in re.findall(r'[a-z]+', lowered)):
+                parsed = parsed.replace(year=parsed.year - 1)
+            else:
+                parsed -= dt.timedelta(days=7)
+        return _aware(parsed)
+
+    # Ultima risorsa: linguaggio naturale inglese di parsedatetime, solo se riconosce
+    # una data in tutto il testo (altrimenti 'foo 10:00' diventerebbe oggi)
+    try:
+        matches = _get_calendar().nlp(text, now.astimezone(_local_timezone()).replace(tzinfo=None))
+    except Exception:
+        return None
+    if not matches or len(matches) != 1:
+        return None
+    value, parse_status, start, end, _ = matches[0]
+    if not parse_status & 1 or start != 0 or end != len(text):
+        return None
+    return _aware(value)
+
+
+def parse_date(text: Optional[str], now: Optional[dt.datetime] = None) -> Optional[dt.datetime]:
+    """Data (con fuso) da una stringa di feed o pagina; None se non riconosciuta"""
+    if not text:
+        return None
+    text = _PREFIX_RE.sub('', ' '.join(text.split()), count=1)
+    if not text:
+        return None
+    return parse_absolute_date(text) or parse_relative_date(text, now)
+
+
+def struct_to_datetime(parsed) -> Optional[dt.datetime]:
+    """Tupla *_parsed di feedparser (sempre UTC) in datetime con fuso"""
+    try:
+        return dt.datetime(*parsed[:6], tzinfo=dt.timezone.utc)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,95 @@
+import codecs
+import re
+from typing import Optional
+
+# Decoder opzionali: aiohttp li usa se i pacchetti (Brotli / backports.zstd) sono installati
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    from aiohttp.compression_utils import HAS_ZSTD
+except ImportError:
+    HAS_ZSTD = False
+
+# Byte order marks, dal più lungo al più corto
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Prologhi compilati una volta sola
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_XML_PROLOG = re.compile(rb'^\s*<\?xml[^>]*encoding\s*=\s*["\']([\w.:-]+)["\']', re.IGNORECASE)
+_HTML_META = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Quanto del documento ispezionare per prolog / meta
+_SNIFF_BYTES = 4096
+
+
+def _normalize(charset: Optional[str]) -> Optional[str]:
+    """Ritorna il nome canonico del codec, None se sconosciuto"""
+    if not charset:
+        return None
+    try:
+        return codecs.lookup(charset.strip()).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Estrae il charset dall'header Content-Type"""
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET.search(content_type)
+    return _normalize(match.group(1)) if match else None
+
+
+def detect_charset(body: bytes, content_type: Optional[str] = None) -> Optional[str]:
+    """Rileva il charset da BOM, header Content-Type o prolog XML/HTML"""
+    for bom, charset in _BOMS:
+        if body.startswith(bom):
+            return charset
+
+    charset = charset_from_content_type(content_type)
+    if charset:
+        return charset
+
+    head = body[:_SNIFF_BYTES]
+    for pattern in (_XML_PROLOG, _HTML_META):
+        match = pattern.search(head)
+        if match:
+            charset = _normalize(match.group(1).decode('ascii', 'ignore'))
+            if charset:
+                return charset
+
+    return None
+
+
+def decode_body(body: bytes, charset: Optional[str] = None) -> str:
+    """Decodifica il body con il charset rilevato, ripiegando su utf-8 e cp1252"""
+    if charset:
+        try:
+            return body.decode(charset)
+        except (UnicodeDecodeError, LookupError):
+            pass
+
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError:
+        return body.decode('cp1252', errors='replace')
+
+
+def accept_encoding(enable_brotli: bool = True, enable_zstd: bool = True) -> str:
+    """Valore di Accept-Encoding in base ai decoder disponibili"""
+    encodings = []
+    if enable_zstd and HAS_ZSTD:
+        encodings.append('zstd')
+    if enable_brotli and HAS_BROTLI:
+        encodings.append('br')
+    encodings.extend(['gzip', 'deflate'])
+    return ', '.join(encodings)
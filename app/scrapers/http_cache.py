@@ -0,0 +1,306 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Mapping
+
+
+@dataclass
+class CacheEntry:
+    """Metadati di una risposta in cache"""
+    url: str
+    size: int
+    stored_at: float
+    expires_at: float
+    content_type: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    must_revalidate: bool = False
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return not self.must_revalidate and (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Headers per la rivalidazione condizionale"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Direttive Cache-Control in minuscolo"""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HttpCache:
+    """Cache HTTP su disco con freshness da Cache-Control/Expires ed eviction LRU
+
+    La directory può essere condivisa da più processi (più run_scheduler.py):
+    l'indice in memoria è solo la vista del processo, le entry scritte dagli
+    altri sono lette dal disco al primo lookup. Il limite max_bytes vale per
+    l'intera directory: l'eviction riscandisce i file (LRU per mtime, che
+    read_body aggiorna) quando la vista locale supera il limite o al più ogni
+    scan_interval secondi durante le scritture.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, heuristic_max_age: int = 3600, scan_interval: float = 60.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.heuristic_max_age = heuristic_max_age
+        self.scan_interval = scan_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._index: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._total_bytes = 0
+        self._scanned = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def _load_index(self):
+        """Ricostruisce l'indice LRU dai file presenti (ordine per ultimo accesso)"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            meta_path, body_path = self._paths(key)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry = CacheEntry(**json.load(f))
+                entries.append((os.path.getmtime(body_path), key, entry))
+            except (OSError, ValueError, TypeError):
+                self._remove_files(key)
+
+        for _, key, entry in sorted(entries, key=lambda item: item[0]):
+            self._index[key] = entry
+            self._total_bytes += entry.size
+
+        self.logger.info(f"HTTP cache loaded: {len(self._index)} entries, {self._total_bytes} bytes")
+
+    def _remove_files(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load_entry(self, key: str) -> Optional[CacheEntry]:
+        """Entry scritta da un altro processo sulla stessa directory"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = CacheEntry(**json.load(f))
+            if not os.path.exists(body_path):
+                return None
+        except (OSError, ValueError, TypeError):
+            return None
+
+        with self._lock:
+            if key not in self._index:
+                self._index[key] = entry
+                self._total_bytes += entry.size
+            return self._index[key]
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Metadati dell'entry per l'URL, se presente"""
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+        return entry if entry is not None else self._load_entry(key)
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        """Legge il body dell'entry e la marca come usata di recente"""
+        key = self._key(url)
+        _, body_path = self._paths(key)
+        try:
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            os.utime(body_path)
+        except OSError:
+            self.delete(url)
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        return body
+
+    def freshness(self, headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+        """Istante di scadenza della risposta; None se non deve essere salvata"""
+        now = now or time.time()
+        directives = _parse_cache_control(headers.get('Cache-Control'))
+
+        if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+            return None
+
+        try:
+            age = float(headers.get('Age') or 0)
+        except ValueError:
+            age = 0.0
+
+        if 'max-age' in directives:
+            try:
+                return now + max(0.0, float(directives['max-age'] or 0) - age)
+            except ValueError:
+                return now
+
+        expires = _http_date(headers.get('Expires'))
+        if expires is not None:
+            date = _http_date(headers.get('Date')) or now
+            return now + max(0.0, expires - date)
+
+        # Freshness euristica (RFC 9111 §4.2.2): 10% dell'età di Last-Modified
+        last_modified = _http_date(headers.get('Last-Modified'))
+        if last_modified is not None:
+            return now + min(self.heuristic_max_age, max(0.0, (now - last_modified) * 0.1))
+
+        # Senza freshness né validatori l'entry sarebbe inutile
+        return now if headers.get('ETag') else None
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str]) -> bool:
+        """Salva una risposta 200 se la cache policy lo consente"""
+        expires_at = self.freshness(headers)
+        if expires_at is None or len(body) > self.max_bytes:
+            return False
+
+        directives = _parse_cache_control(headers.get('Cache-Control'))
+        entry = CacheEntry(
+            url=url,
+            size=len(body),
+            stored_at=time.time(),
+            expires_at=expires_at,
+            content_type=headers.get('Content-Type'),
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            must_revalidate='no-cache' in directives
+        )
+
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(body_path, 'wb') as f:
+                f.write(body)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(asdict(entry), f)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry for {url}: {str(e)}")
+            self._remove_files(key)
+            return False
+
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+            self._index[key] = entry
+            self._total_bytes += entry.size
+        self._evict()
+        return True
+
+    def refresh(self, url: str, headers: Mapping[str, str]) -> Optional[CacheEntry]:
+        """Aggiorna la freshness dopo un 304 di rivalidazione"""
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+        if entry is None:
+            return None
+
+        expires_at = self.freshness(headers)
+        entry.expires_at = expires_at if expires_at is not None else time.time()
+        entry.etag = headers.get('ETag') or entry.etag
+        entry.last_modified = headers.get('Last-Modified') or entry.last_modified
+
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(asdict(entry), f)
+        except OSError:
+            pass
+        return entry
+
+    def delete(self, url: str):
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+        self._remove_files(key)
+
+    def _evict(self) -> int:
+        """Rimuove le entry meno usate, di qualunque processo, finché la directory rientra nel limite"""
+        with self._lock:
+            over = self._total_bytes > self.max_bytes
+        if not over and time.monotonic() - self._scanned < self.scan_interval:
+            return 0
+        self._scanned = time.monotonic()
+
+        # Vista globale dal disco: anche le entry degli altri processi contano per il limite
+        bodies = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            self.logger.warning(f"Could not scan cache directory {self.directory}: {str(e)}")
+            return 0
+        for name in names:
+            if not name.endswith('.body'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                # Rimossa nel frattempo da un altro processo
+                continue
+            bodies.append((stat.st_mtime, stat.st_size, name[:-5]))
+
+        total = sum(size for _, size, _ in bodies)
+        evicted = []
+        for _, size, key in sorted(bodies):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+
+        for key in evicted:
+            self._remove_files(key)
+        with self._lock:
+            for key in evicted:
+                entry = self._index.pop(key, None)
+                if entry is not None:
+                    self._total_bytes -= entry.size
+        if evicted:
+            self.logger.debug(f"Evicted {len(evicted)} cache entries")
+        return len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._index), 'bytes': self._total_bytes, 'max_bytes': self.max_bytes}
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+import datetime as dt
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.models import Source
+
+
+class SourceLeases:
+    """Lease sulle source, per dividere lo scraping fra più processi o nodi
+
+    Un worker può fare lo scrape di una source solo dopo averla reclamata: un
+    UPDATE condizionale imposta claimed_by e lease_expires se la source è
+    libera, già sua o con un lease scaduto. L'UPDATE è atomico sia su SQLite
+    (un solo writer alla volta, WAL per non bloccare i lettori) sia su
+    PostgreSQL (lock di riga e WHERE rivalutato), quindi due worker non
+    ottengono mai la stessa source. I lease vanno rinnovati durante lo scrape;
+    quelli di un worker terminato scadono dopo ttl secondi e diventano
+    reclamabili da chiunque.
+
+    I rinnovi usano una sessione propria: un heartbeat non deve mai fare
+    commit di una scrittura a metà sulla sessione dello scrape.
+    """
+
+    def __init__(self, db: Session, worker_id: Optional[str] = None, ttl: int = 300):
+        self.db = db
+        self.heartbeat_db = Session(bind=db.get_bind())
+        self.ttl = ttl
+        # Un id per istanza: due manager dello stesso processo non condividono i lease
+        self.worker_id = f"{worker_id or socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _expires(self) -> dt.datetime:
+        return dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=self.ttl)
+
+    def _held(self, db: Session, source_ids: List[int]) -> Set[int]:
+        query = db.query(Source.id).filter(Source.id.in_(source_ids), Source.claimed_by == self.worker_id)
+        return {source_id for source_id, in query}
+
+    def claim(self, source_ids: Iterable[int]) -> Set[int]:
+        """Reclama le source libere o con lease scaduto; ritorna gli id ottenuti"""
+        source_ids = list(source_ids)
+        if not source_ids:
+            return set()
+
+        now = dt.datetime.now(dt.timezone.utc)
+        try:
+            self.db.execute(
+                update(Source)
+                .where(
+                    Source.id.in_(source_ids),
+                    or_(Source.claimed_by.is_(None), Source.claimed_by == self.worker_id, Source.lease_expires < now)
+                )
+                .values(claimed_by=self.worker_id, lease_expires=self._expires())
+                .execution_options(synchronize_session=False)
+            )
+            claimed = self._held(self.db, source_ids)
+            self.db.commit()
+        except Exception as e:
+            self.logger.error(f"Error claiming {len(source_ids)} sources: {str(e)}")
+            self.db.rollback()
+            return set()
+
+        if len(claimed) < len(source_ids):
+            self.logger.info(f"Claimed {len(claimed)} of {len(source_ids)} sources, the others are leased by other workers")
+        return claimed
+
+    def renew(self, source_ids: Iterable[int]) -> Set[int]:
+        """Prolunga i lease ancora posseduti; ritorna gli id per cui è riuscito"""
+        source_ids = list(source_ids)
+        if not source_ids:
+            return set()
+
+        try:
+            self.heartbeat_db.execute(
+                update(Source)
+                .where(Source.id.in_(source_ids), Source.claimed_by == self.worker_id)
+                .values(lease_expires=self._expires())
+                .execution_options(synchronize_session=False)
+            )
+            held = self._held(self.heartbeat_db, source_ids)
+            self.heartbeat_db.commit()
+        except Exception as e:
+            # Esito ignoto: i lease restano validi fino a lease_expires, si riprova al prossimo giro
+            self.logger.error(f"Error renewing {len(source_ids)} leases: {str(e)}")
+            self.heartbeat_db.rollback()
+            return set(source_ids)
+
+        lost = set(source_ids) - held
+        if lost:
+            self.logger.warning(f"Lost leases on sources {sorted(lost)}: expired and claimed by another worker")
+        return held
+
+    def release(self, source_ids: Iterable[int]):
+        """Rilascia i lease posseduti"""
+        source_ids = list(source_ids)
+        if not source_ids:
+            return
+
+        try:
+            self.db.execute(
+                update(Source)
+                .where(Source.id.in_(source_ids), Source.claimed_by == self.worker_id)
+                .values(claimed_by=None, lease_expires=None)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception as e:
+            # Non rilasciati: scadono da soli dopo ttl secondi
+            self.logger.error(f"Error releasing {len(source_ids)} leases: {str(e)}")
+            self.db.rollback()
+
+    def recover(self) -> int:
+        """Libera i lease scaduti (worker terminati); ritorna quanti"""
+        try:
+            result = self.db.execute(
+                update(Source)
+                .where(Source.claimed_by.is_not(None), Source.lease_expires < dt.datetime.now(dt.timezone.utc))
+                .values(claimed_by=None, lease_expires=None)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception as e:
+            self.logger.error(f"Error recovering expired leases: {str(e)}")
+            self.db.rollback()
+            return 0
+
+        if result.rowcount:
+            self.logger.warning(f"Recovered {result.rowcount} expired source leases")
+        return result.rowcount
+
+    @asynccontextmanager
+    async def hold(self, source_ids: Iterable[int]):
+        """Rinnova i lease ogni ttl/3 secondi finché il blocco è in corso, poi li rilascia
+
+        Restituisce l'insieme, aggiornato a ogni rinnovo, delle source il cui
+        lease è stato perso: i loro risultati non vanno salvati.
+        """
+        source_ids = set(source_ids)
+        lost: Set[int] = set()
+
+        async def keep_alive():
+            while True:
+                await asyncio.sleep(self.ttl / 3)
+                held = source_ids - lost
+                if held:
+                    lost.update(held - self.renew(held))
+
+        task = asyncio.create_task(keep_alive()) if source_ids else None
+        try:
+            yield lost
+        finally:
+            if task is not None:
+                task.cancel()
+            self.release(source_ids - lost)
+
+    def close(self):
+        self.heartbeat_db.close()
@@ -1,45 +1,114 @@
-import asyncio
 import logging
 import logging.config
 import datetime as dt
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 
-from .base import BaseReader, ScrapedArticle
+from .base import BaseReader
+from .config import ScraperConfig
+from .context import ScraperContext
+from .leases import SourceLeases
+from .pipeline import ScrapePipeline, SourceRun
+from .polling import AdaptivePollInterval
+from .retry import SourceCircuitBreaker
 from .rss_reader import RSSReader
+from .sitemap_reader import SitemapReader
 from .web_reader import WebReader
-from app.models import Source, Article, Tag, ArticleTag, ArticleMetadata
+from .writer import ArticleWriter
+from app.models import Source, Article, FetchStat
 
 logging.config.fileConfig('logging.ini')
 
 class ScraperManager:
     """Manager per orchestrare tutti gli scrapers"""
     
-    def __init__(self, db_session: Session):
+    # Risorse di rete condivise da tutte le istanze del processo
+    _shared_context: Optional[ScraperContext] = None
+    
+    def __init__(self, db_session: Session, config: Optional[ScraperConfig] = None):
         self.db = db_session
         self.logger = logging.getLogger(self.__class__.__name__)
         self.active_scrapers = {}
+        self.context = self.get_shared_context(config)
+        self.writer = ArticleWriter(self.db, self.context.seen_index, self.context.tag_cache)
+        self.breaker = SourceCircuitBreaker(
+            self.context.config.breaker_failure_threshold,
+            self.context.config.breaker_max_cooldown
+        )
+        self.poll_interval = AdaptivePollInterval(
+            self.context.config.min_poll_interval,
+            self.context.config.max_poll_interval,
+            self.context.config.target_yield
+        ) if self.context.config.adaptive_interval else None
+        self.leases = SourceLeases(
+            self.db,
+            self.context.config.worker_id,
+            self.context.config.lease_ttl
+        ) if self.context.config.leases_enabled else None
+        self._warm_tag_cache()
+    
+    def _warm_tag_cache(self):
+        """Carica i tag all'avvio, non alla prima run (no-op se la cache è ancora fresca)"""
+        try:
+            self.context.tag_cache.ensure_loaded(self.db)
+        except Exception as e:
+            # Non bloccante: la pipeline riprova a caricarla prima di ogni run
+            self.logger.warning(f"Error warming tag cache: {str(e)}")
+            self.db.rollback()
+    
+    @classmethod
+    def get_shared_context(cls, config: Optional[ScraperConfig] = None) -> ScraperContext:
+        """Ritorna il contesto di rete condiviso, creandolo al primo utilizzo"""
+        if cls._shared_context is None:
+            cls._shared_context = ScraperContext(config)
+        return cls._shared_context
+    
+    @classmethod
+    async def close_shared_context(cls):
+        """Chiude sessione e connection pool condivisi"""
+        if cls._shared_context is not None:
+            await cls._shared_context.close()
         
     def create_reader(self, source: Source) -> Optional[BaseReader]:
         """Factory method per creare il reader appropriato"""
         try:
             config = {
+                'source_id': source.id,
                 'base_url': source.base_url,
                 'rss_url': source.rss_url,
                 'scraping_config': source.scraping_config or {},
                 'rate_limit_delay': source.rate_limit_delay,
-                'timeout': 30,
-                'max_retries': 3,
-                'max_articles': 100
+                'etag': source.etag,
+                'last_modified': source.last_modified,
+                'feed_hash': source.feed_hash,
+                'sitemap_watermark': source.sitemap_watermark,
+                'timeout': self.context.config.request_timeout,
+                'max_retries': self.context.config.max_retries,
+                'retry_base_delay': self.context.config.retry_base_delay,
+                'retry_max_delay': self.context.config.retry_max_delay,
+                'max_response_bytes': (source.scraping_config or {}).get('max_response_bytes', self.context.config.max_response_bytes),
+                'body_timeout': self.context.config.body_timeout,
+                'sitemap_max_bytes': (source.scraping_config or {}).get('sitemap_max_bytes', self.context.config.sitemap_max_bytes),
+                'sitemap_body_timeout': self.context.config.sitemap_body_timeout,
+                'enable_brotli': self.context.config.enable_brotli,
+                'enable_zstd': self.context.config.enable_zstd,
+                'fetch_concurrency': (source.scraping_config or {}).get('fetch_concurrency', self.context.config.fetch_concurrency),
+                'extract_full_content': (source.scraping_config or {}).get('extract_full_content', False),
+                'max_articles': 100,
+                'known_urls': self.context.seen_index.for_source(self.db, source.id), # type: ignore
+                'known_ids': self.context.seen_index.ids_for_source(self.db, source.id) # type: ignore
             }
             
             # Scegli il reader basato sulla configurazione
             if source.rss_url is not None:
                 self.logger.info(f"Creating RSSReader for source {source.name}")
-                return RSSReader(config)
+                return RSSReader(config, self.context)
+            elif source.scraping_config is not None and source.scraping_config.get('sitemap_url'):
+                self.logger.info(f"Creating SitemapReader for source {source.name}")
+                return SitemapReader(config, self.context)
             elif source.scraping_config is not None:
                 self.logger.info(f"Creating WebReader for source {source.name}")
-                return WebReader(config)
+                return WebReader(config, self.context)
             else:
                 self.logger.error(f"No valid configuration for source {source.name}")
                 return None
@@ -50,165 +119,113 @@ class ScraperManager:
     
     async def scrape_source(self, source: Source) -> List[Article]:
         """Scrape singola source e salva articoli nel database"""
-        try:
-            self.logger.info(f"Starting scrape for source: {source.name}")
-            
-            # Crea reader
-            reader = self.create_reader(source)
-            if not reader:
-                self.logger.error(f"Failed to create reader for source {source.name}")
-                return []
-            
-            articles = []
-            async with reader:
-                # Valida source
-                if not await reader.validate_source():
-                    self.logger.error(f"Source validation failed: {source.name}")
-                    source.error_count += 1 # type: ignore
-                    source.last_error = "Source validation failed" # type: ignore
-                    self.db.commit()
-                    return []
-                
-                # Fetch articles
-                scraped_articles = await reader.fetch_articles()
-                
-                if not scraped_articles:
-                    self.logger.warning(f"No articles found for source: {source.name}")
-                    return []
-                
-                # Salva articoli nel database
-                for scraped_article in scraped_articles:
-                    article = await self._save_article(scraped_article, source)
-                    if article:
-                        articles.append(article)
-                
-                # Aggiorna source metadata
-                source.last_scraped = dt.datetime.now(dt.timezone.utc) # type: ignore
-                source.next_scrape = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=source.update_frequency) # type: ignore
-                source.error_count = 0 # type: ignore
-                source.last_error = None # type: ignore
-                self.db.commit()
-                
-                self.logger.info(f"Successfully scraped {len(articles)} articles from {source.name}")
-                return articles
-                
-        except Exception as e:
-            self.logger.error(f"Error scraping source {source.name}: {str(e)}")
-            source.error_count += 1 # type: ignore
-            source.last_error = str(e) # type: ignore
-            self.db.commit()
-            return []
+        runs = await self.scrape_sources([source])
+        return runs[0].articles if runs else []
     
-    async def _save_article(self, scraped_article: ScrapedArticle, source: Source) -> Optional[Article]:
-        """Salva articolo nel database con deduplicazione"""
+    async def scrape_sources(self, sources: List[Source]) -> List[SourceRun]:
+        """Scrape delle sources nella pipeline fetch → parse → write, un esito per source"""
         try:
-            # Controlla se l'articolo esiste già (by URL)
-            existing_article = self.db.query(Article).filter_by(url=scraped_article.url).first()
-            if existing_article:
-                self.logger.debug(f"Article already exists: {scraped_article.url}")
-                return existing_article
-            
-            # Crea nuovo articolo
-            article = Article(
-                title=scraped_article.title,
-                content=scraped_article.content,
-                summary=scraped_article.summary,
-                url=scraped_article.url,
-                author=scraped_article.author,
-                source_id=source.id,
-                published_date=scraped_article.published_date,
-                scraped_date=dt.datetime.now(dt.timezone.utc),
-                word_count=len(scraped_article.content.split()) if scraped_article.content else 0,
-                language='it'  # Default, potrebbe essere rilevato automaticamente
-            )
-            
-            # Genera hash per deduplicazione
-            article.generate_content_hash()
-            article.generate_url_hash()
-            
-            # Controlla duplicati per content hash
-            if article.content_hash is not None:
-                duplicate = self.db.query(Article).filter_by(content_hash=article.content_hash).first()
-                if duplicate:
-                    self.logger.debug(f"Duplicate content found for: {scraped_article.title}")
-                    article.is_duplicate = True # type: ignore
-            
-            self.db.add(article)
-            self.db.flush()  # Per ottenere l'ID senza commit
-            
-            # Salva tags
-            await self._save_article_tags(article, scraped_article.tags) # type: ignore
-            
-            # Salva metadata
-            await self._save_article_metadata(article, scraped_article.metadata) # type: ignore
-            
-            self.db.commit()
-            
-            self.logger.debug(f"Saved article: {article.title[:50]}...")
-            return article
-            
+            if self.leases is None:
+                return await ScrapePipeline(self).run(sources)
+            
+            # Solo le sources reclamate: le altre sono in corso su un altro worker
+            claimed = self.leases.claim(source.id for source in sources)
+            runs = {}
+            async with self.leases.hold(claimed) as lost:
+                for run in await ScrapePipeline(self, lost).run([source for source in sources if source.id in claimed]):
+                    runs[run.source_id] = run
+            
+            for source in sources:
+                if source.id not in claimed:
+                    runs[source.id] = SourceRun(
+                        source_id=source.id, # type: ignore
+                        source_name=source.name, # type: ignore
+                        articles=[],
+                        success=False,
+                        error=f"Source is being scraped by {source.claimed_by}"
+                    )
+            return [runs[source.id] for source in sources if source.id in runs]
         except Exception as e:
-            self.logger.error(f"Error saving article {scraped_article.title}: {str(e)}")
-            self.db.rollback()
-            return None
+            self.logger.error(f"Error scraping {len(sources)} sources: {str(e)}")
+            return []
     
-    async def _save_article_tags(self, article: Article, tags: List[str]):
-        """Salva tags dell'articolo"""
+    def _add_fetch_stats(self, source: Source, reader: BaseReader):
+        """Aggrega per host i tempi di rete della run e li aggiunge alla sessione (commit del chiamante)"""
+        if not reader.request_timings:
+            return
+        
         try:
-            for tag_name in tags:
-                if not tag_name:
-                    continue
-                
-                tag_name_clean = tag_name.strip().lower()
-                
-                # Trova o crea tag
-                tag = self.db.query(Tag).filter_by(normalized_name=tag_name_clean).first()
-                if not tag:
-                    tag = Tag(
-                        name=tag_name,
-                        normalized_name=tag_name_clean,
-                        tag_type='auto'
+            stats: Dict[str, FetchStat] = {}
+            for timing in reader.request_timings:
+                stat = stats.get(timing.host)
+                if stat is None:
+                    stat = stats[timing.host] = FetchStat(
+                        source_id=source.id, host=timing.host, recorded_date=dt.datetime.now(dt.timezone.utc),
+                        requests=0, errors=0, reused_connections=0, bytes=0,
+                        dns_ms=0.0, connect_ms=0.0, ttfb_ms=0.0, transfer_ms=0.0, total_ms=0.0, max_total_ms=0.0
                     )
-                    self.db.add(tag)
-                    self.db.flush()
-                
-                rel = self.db.query(ArticleTag).filter_by(article_id=article.id, tag_id=tag.id).first()
-                if not rel:
-                    # Crea associazione article-tag
-                    article_tag = ArticleTag(
-                        article_id=article.id,
-                        tag_id=tag.id,
-                        confidence=0.8,
-                        source='scraper'
-                    )
-                    self.db.add(article_tag)
-                
-                    # Incrementa frequenza tag
-                    tag.increment_frequency()
                 
+                stat.requests += 1 # type: ignore
+                if timing.error or (timing.status is not None and timing.status >= 400):
+                    stat.errors += 1 # type: ignore
+                if timing.reused_connection:
+                    stat.reused_connections += 1 # type: ignore
+                stat.bytes += timing.bytes # type: ignore
+                stat.dns_ms += timing.dns_ms # type: ignore
+                stat.connect_ms += timing.connect_ms # type: ignore
+                stat.ttfb_ms += timing.ttfb_ms # type: ignore
+                stat.transfer_ms += timing.transfer_ms # type: ignore
+                stat.total_ms += timing.total_ms # type: ignore
+                stat.max_total_ms = max(stat.max_total_ms, timing.total_ms) # type: ignore
+            
+            self.db.add_all(stats.values())
+            reader.request_timings.clear()
+            
         except Exception as e:
-            self.logger.error(f"Error saving tags for article {article.id}: {str(e)}")
+            self.logger.error(f"Error collecting fetch stats for source {source.name}: {str(e)}")
     
-    async def _save_article_metadata(self, article: Article, metadata: Dict[str, Any]):
-        """Salva metadata dell'articolo"""
-        try:
-            for key, value in metadata.items():
-                if value is not None:
-                    article_metadata = ArticleMetadata(
-                        article_id=article.id,
-                        key=key,
-                        value=str(value)
-                    )
-                    self.db.add(article_metadata)
-                    
-        except Exception as e:
-            self.logger.error(f"Error saving metadata for article {article.id}: {str(e)}")
+    def _mark_scraped(self, source: Source, new_articles: int = 0):
+        """Aggiorna timestamp e stato della source dopo uno scrape riuscito"""
+        interval = source.update_frequency
+        if self.poll_interval is not None:
+            interval = source.poll_interval = self.poll_interval.next_interval(source, new_articles) # type: ignore
+        
+        source.last_scraped = dt.datetime.now(dt.timezone.utc) # type: ignore
+        source.next_scrape = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=interval) # type: ignore
+        source.error_count = 0 # type: ignore
+        source.last_error = None # type: ignore
+    
+    def _record_failure(self, source: Source, error: str, retry_after: Optional[float] = None):
+        """Registra un fallimento e sposta next_scrape secondo lo stato del circuit breaker"""
+        source.error_count = (source.error_count or 0) + 1 # type: ignore
+        source.last_error = error # type: ignore
+        
+        delay = self.breaker.next_delay(source, retry_after)
+        source.next_scrape = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=delay) # type: ignore
+        
+        if source.error_count >= self.breaker.failure_threshold: # type: ignore
+            self.logger.warning(
+                f"Circuit breaker open for {source.name} after {source.error_count} failures, "
+                f"next attempt in {int(delay)}s"
+            )
+    
+    def _store_validators(self, source: Source, reader: BaseReader):
+        """Persiste sulla source i validatori HTTP raccolti dal reader"""
+        for key in ('etag', 'last_modified', 'feed_hash'):
+            value = reader.validators.get(key)
+            if value is not None:
+                setattr(source, key, value)
+        
+        # Sitemap: lastmod fino al quale tutte le voci sono state elaborate
+        if isinstance(reader, SitemapReader) and reader.watermark is not None:
+            source.sitemap_watermark = reader.watermark.astimezone(dt.timezone.utc) # type: ignore
     
     async def scrape_all_active_sources(self) -> Dict[str, List[Article]]:
         """Scrape tutte le sources attive"""
         try:
-            # Ottieni sources attive
+            # Ottieni sources attive, escluse quelle con circuit breaker aperto
             active_sources = self.db.query(Source).filter_by(is_active=True).all()
+            active_sources = [source for source in active_sources if not self.breaker.is_open(source)]
             
             if not active_sources:
                 self.logger.warning("No active sources found")
@@ -217,27 +234,10 @@ class ScraperManager:
             self.logger.info(f"Starting scrape for {len(active_sources)} active sources")
             
             results = {}
-            
-            # Scrape sources in parallelo (con limite di concorrenza)
-            semaphore = asyncio.Semaphore(3)  # Max 3 concurrent scrapes
-            
-            async def scrape_with_semaphore(source):
-                async with semaphore:
-                    return source.name, await self.scrape_source(source)
-            
-            tasks = [scrape_with_semaphore(source) for source in active_sources]
-            completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Processa risultati
             total_articles = 0
-            for result in completed_tasks:
-                if isinstance(result, Exception):
-                    self.logger.error(f"Scraping task failed: {str(result)}")
-                    continue
-                
-                source_name, articles = result # type: ignore
-                results[source_name] = articles
-                total_articles += len(articles)
+            for run in await self.scrape_sources(active_sources):
+                results[run.source_name] = run.articles
+                total_articles += len(run.articles)
             
             self.logger.info(f"Scraping completed. Total articles: {total_articles}")
             return results
@@ -263,15 +263,8 @@ class ScraperManager:
             
             self.logger.info(f"Found {len(sources_to_update)} sources to update")
             
-            results = {}
-            for source in sources_to_update:
-                articles = await self.scrape_source(source)
-                results[source.name] = articles
-                
-                # Pausa tra sources per evitare overload
-                await asyncio.sleep(1)
-            
-            return results
+            runs = await self.scrape_sources(sources_to_update)
+            return {run.source_name: run.articles for run in runs}
             
         except Exception as e:
             self.logger.error(f"Error in scrape_sources_by_schedule: {str(e)}")
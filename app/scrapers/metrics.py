@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+
+class _TransferStats:
+    """Byte trasferiti (compressi) e decodificati per una source"""
+
+    def __init__(self):
+        self.requests = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.by_encoding: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'requests': 0, 'wire_bytes': 0, 'decoded_bytes': 0}
+        )
+
+    def add(self, encoding: str, wire_bytes: int, decoded_bytes: int):
+        self.requests += 1
+        self.wire_bytes += wire_bytes
+        self.decoded_bytes += decoded_bytes
+
+        stats = self.by_encoding[encoding]
+        stats['requests'] += 1
+        stats['wire_bytes'] += wire_bytes
+        stats['decoded_bytes'] += decoded_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        savings = 1 - (self.wire_bytes / self.decoded_bytes) if self.decoded_bytes else 0
+        return {
+            'requests': self.requests,
+            'wire_bytes': self.wire_bytes,
+            'decoded_bytes': self.decoded_bytes,
+            'savings_percentage': round(savings * 100, 1),
+            'by_encoding': dict(self.by_encoding)
+        }
+
+
+class StageStats:
+    """Contatori di uno stadio della pipeline e della sua coda d'ingresso"""
+
+    def __init__(self, name: str, workers: int, queue: Optional[asyncio.Queue] = None):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def queued(self):
+        """Da chiamare dopo ogni put sulla coda d'ingresso"""
+        if self.queue is not None:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def started(self) -> float:
+        self.busy += 1
+        return time.perf_counter()
+
+    def finished(self, started: float, error: bool = False):
+        self.busy -= 1
+        self.processed += 1
+        self.busy_seconds += time.perf_counter() - started
+        if error:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'busy': self.busy,
+            'processed': self.processed,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_size': self.queue.maxsize if self.queue is not None else 0
+        }
+
+
+class ScraperMetrics:
+    """Contatori in memoria del layer di fetch, per processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transfers: Dict[str, _TransferStats] = defaultdict(_TransferStats)
+        self._cache: Dict[str, int] = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+        # Stadi della pipeline in corso (o dell'ultima eseguita)
+        self._pipeline: Dict[str, StageStats] = {}
+
+    def record_transfer(self, source_key: str, encoding: Optional[str], wire_bytes: int, decoded_bytes: int):
+        """Registra i byte di una risposta per la source"""
+        with self._lock:
+            self._transfers[source_key].add(encoding or 'identity', wire_bytes, decoded_bytes)
+
+    def record_cache(self, event: str):
+        """Incrementa un contatore della cache HTTP (hits, revalidated, misses, stored)"""
+        with self._lock:
+            self._cache[event] = self._cache.get(event, 0) + 1
+
+    def set_pipeline(self, stages: Dict[str, StageStats]):
+        """Registra gli stadi della pipeline avviata, letti dal vivo da snapshot"""
+        with self._lock:
+            self._pipeline = stages
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia serializzabile dei contatori"""
+        with self._lock:
+            return {
+                'transfer': {key: stats.to_dict() for key, stats in self._transfers.items()},
+                'cache': dict(self._cache),
+                'pipeline': {name: stage.to_dict() for name, stage in self._pipeline.items()}
+            }
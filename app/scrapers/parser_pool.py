@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+def _init_worker(level: int):
+    """Logging minimo nei processi del pool: solo console, niente fileConfig
+
+    I worker importano solo i moduli delle funzioni che eseguono (parsing,
+    articles); logging.ini aprirebbe lo stesso file di log da più processi.
+    """
+    logging.basicConfig(level=level, format='%(levelname)s:     %(asctime)s - %(name)s - %(message)s')
+
+
+class ParserPool:
+    """Esegue il parsing CPU-bound in un ProcessPoolExecutor fuori dall'event loop"""
+
+    MAX_RESTARTS = 3
+
+    def __init__(self, workers: int = 0, inline_max_bytes: int = 0):
+        self.workers = workers
+        self.inline_max_bytes = inline_max_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._restarts = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0 or self._restarts > self.MAX_RESTARTS:
+            return None
+        if self._executor is None:
+            # spawn: niente fork di un processo con event loop e thread attivi
+            self.logger.info(f"Starting parser process pool with {self.workers} workers")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(logging.getLogger().getEffectiveLevel(),)
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, size: Optional[int] = None) -> Any:
+        """Esegue func(*args) nel pool; documenti piccoli sono parsati inline"""
+        executor = self._get_executor()
+        if executor is None or (size is not None and size <= self.inline_max_bytes):
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Worker morto (OOM, segfault del parser): si ricrea il pool, poi si rinuncia
+            self._restarts += 1
+            if self._restarts > self.MAX_RESTARTS:
+                self.logger.error("Parser process pool keeps breaking, parsing inline from now on")
+            else:
+                self.logger.error("Parser process pool broken, restarting it and parsing inline")
+            self.shutdown()
+            return func(*args)
+
+    def shutdown(self):
+        """Termina i processi del pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
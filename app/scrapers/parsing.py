@@ -0,0 +1,378 @@
+"""Parsing CPU-bound di feed e pagine HTML.
+
+Le funzioni di questo modulo sono pure e lavorano su bytes: possono girare in
+un processo separato (vedi ParserPool) e ritornano solo strutture picklable
+(dict, list, str), mai oggetti feedparser o elementi lxml.
+
+Per le pagine articolo i dati strutturati incorporati (JSON-LD, __NEXT_DATA__,
+OpenGraph, vedi structured.py) sono provati prima dei selettori: se contengono
+il corpo dell'articolo il DOM non viene costruito.
+
+Ogni documento HTML è parsato una sola volta da lxml (libxml2) direttamente dai
+bytes; il parse di recupero (html5lib se installato, altrimenti html.parser di
+BeautifulSoup) interviene solo se lxml non produce un documento utilizzabile.
+"""
+import datetime as dt
+import gzip
+import io
+import time
+from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
+
+import feedparser
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from .dates import parse_date
+from .encoding import decode_body
+from .selectors import ExtractionPlan, cached_selector, get_plan
+from .structured import empty_article, extract_structured
+
+# Parser html5 opzionale: stesso albero di un browser sul markup più rotto
+try:
+    from lxml.html import html5parser
+    HAS_HTML5LIB = True
+except ImportError:
+    HAS_HTML5LIB = False
+
+
+def _plain(value: Any) -> Any:
+    """Converte ricorsivamente FeedParserDict e liste in strutture standard"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, time.struct_time):
+        return tuple(value)
+    return value
+
+
+def _plain_entry(entry) -> Dict[str, Any]:
+    """Entry feedparser come dict, incluse le chiavi calcolate (category, enclosures)"""
+    plain = _plain(dict(entry))
+    for key in ('category', 'enclosures'):
+        try:
+            plain[key] = _plain(entry[key])
+        except (KeyError, IndexError):
+            continue
+    return plain
+
+
+def parse_feed(body: bytes, response_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Parse di un feed RSS/Atom dai bytes grezzi"""
+    feed = feedparser.parse(body, response_headers=response_headers or {})
+    return {
+        'bozo': bool(feed.get('bozo')),
+        'bozo_exception': str(feed.get('bozo_exception')) if feed.get('bozo') else None,
+        'entries': [_plain_entry(entry) for entry in feed.entries]
+    }
+
+
+_html_parsers: Dict[Optional[str], Optional[etree.HTMLParser]] = {}
+
+
+def _html_parser(encoding: Optional[str]) -> Optional[etree.HTMLParser]:
+    """HTMLParser lxml per encoding, riutilizzato fra i documenti del processo
+
+    None se libxml2 non conosce il charset: il body va decodificato in Python.
+    """
+    if encoding not in _html_parsers:
+        try:
+            _html_parsers[encoding] = etree.HTMLParser(encoding=encoding)
+        except LookupError:
+            _html_parsers[encoding] = None
+    return _html_parsers[encoding]
+
+
+def parse_html(body: bytes, encoding: Optional[str] = None):
+    """Parse HTML dei bytes in un albero lxml interrogabile via XPath"""
+    parser = _html_parser(encoding)
+    try:
+        if parser is None:
+            return etree.fromstring(decode_body(body, encoding), _html_parser(None))
+        return etree.fromstring(body, parser)
+    except (etree.LxmlError, ValueError):
+        return None
+
+
+def parse_html_recover(body: bytes, encoding: Optional[str] = None):
+    """Parse di recupero, compatibile html5 se html5lib è installato"""
+    text = decode_body(body, encoding)
+    try:
+        if HAS_HTML5LIB:
+            return html5parser.document_fromstring(text)
+        return etree.HTML(str(BeautifulSoup(text, 'html.parser')))
+    except Exception:
+        return None
+
+
+def select_nodes(element, xpath: Optional[etree.XPath], multiple: bool = False) -> Optional[List[Any]]:
+    """Nodi trovati dal selettore compilato (solo il primo se multiple=False)"""
+    if xpath is None:
+        return None
+    try:
+        found = xpath(element)
+    except Exception:
+        return None
+
+    if found is None or (isinstance(found, list) and len(found) == 0):
+        return None
+
+    if isinstance(found, list) and not multiple:
+        return [found[0]]
+    return found
+
+
+def select_text(element, xpath: Optional[etree.XPath]) -> Optional[str]:
+    """Testo del primo nodo trovato"""
+    found = select_nodes(element, xpath)
+    if not found:
+        return None
+    return getattr(found[0], 'text', None)
+
+
+def _absolute_url(href: Optional[str], base_url: str) -> Optional[str]:
+    if href is None:
+        return None
+    return href if href.startswith('http') else urljoin(base_url, href)
+
+
+def select_url(element, xpath: Optional[etree.XPath], base_url: str) -> Optional[str]:
+    """href assoluto del primo nodo trovato"""
+    found = select_nodes(element, xpath)
+    if not found or not hasattr(found[0], 'attrib'):
+        return None
+    return _absolute_url(found[0].attrib.get('href'), base_url)
+
+
+def select_tags(element, xpath: Optional[etree.XPath]) -> List[str]:
+    """Testi di tutti i nodi trovati"""
+    found = select_nodes(element, xpath, multiple=True) or []
+    return [elem.text.strip() for elem in found if getattr(elem, 'text', None)]
+
+
+def _listing_items(dom, base_url: str, plan: ExtractionPlan) -> List[Dict[str, Any]]:
+    elements = select_nodes(dom, plan.get('article_list'), multiple=True) or []
+
+    # XPath compilati una volta e riusati per ogni elemento
+    title, url, content = plan.get('title'), plan.get('url'), plan.get('content')
+    summary, author, date, tag = plan.get('summary'), plan.get('author'), plan.get('date'), plan.get('tag')
+
+    items = []
+    for element in elements:
+        if not isinstance(element, etree._Element):
+            continue
+        items.append({
+            'title': select_text(element, title),
+            'url': select_url(element, url, base_url),
+            'content': select_text(element, content),
+            'summary': select_text(element, summary),
+            'author': select_text(element, author),
+            'date_text': select_text(element, date),
+            'tags': select_tags(element, tag),
+            'element_classes': element.get('class', []),
+            'element_id': element.get('id')
+        })
+    return items
+
+
+def _links(dom, base_url: str, xpath: Optional[etree.XPath]) -> List[str]:
+    urls = []
+    for elem in select_nodes(dom, xpath, multiple=True) or []:
+        if isinstance(elem, etree._Element):
+            url = _absolute_url(elem.attrib.get('href'), base_url)
+            if url is not None and url not in urls:
+                urls.append(url)
+    return urls
+
+
+def extract_listing(body: bytes, encoding: Optional[str], base_url: str, selectors: Dict[str, Optional[str]]) -> Dict[str, List[Any]]:
+    """Estrae da un solo parse i campi grezzi degli articoli e (se c'è il selettore 'pagination') i link di paginazione"""
+    plan = get_plan(selectors)
+
+    dom = parse_html(body, encoding)
+    items = _listing_items(dom, base_url, plan) if dom is not None else []
+
+    # Nessun articolo: il markup potrebbe essere stato ricostruito male da libxml2
+    if not items:
+        recovered = parse_html_recover(body, encoding)
+        if recovered is not None:
+            dom = recovered
+            items = _listing_items(dom, base_url, plan)
+
+    pagination = _links(dom, base_url, plan.get('pagination')) if dom is not None else []
+    return {'items': items, 'pagination': pagination}
+
+
+def extract_text(body: bytes, encoding: Optional[str], selector: str) -> Optional[str]:
+    """Testo concatenato dei nodi trovati dal selettore"""
+    xpath = cached_selector(selector)
+    if xpath is None:
+        return None
+
+    dom = parse_html(body, encoding)
+    if dom is None:
+        dom = parse_html_recover(body, encoding)
+    if dom is None:
+        return None
+
+    elements = select_nodes(dom, xpath, multiple=True)
+    if not elements:
+        return None
+    return ' '.join([elem.text for elem in elements if getattr(elem, 'text', None) is not None])
+
+
+def extract_css_text(body: bytes, encoding: Optional[str], selector: str) -> Optional[str]:
+    """Testo completo (inclusi i discendenti) degli elementi trovati dal selettore CSS"""
+    xpath = cached_selector(f'css:{selector}')
+    if xpath is None:
+        # Selettore non traducibile (es. pseudo-classi senza cssselect): BeautifulSoup
+        soup = BeautifulSoup(body, 'html.parser', from_encoding=encoding)
+        elements = soup.select(selector)
+        if not elements:
+            return None
+        return ' '.join([elem.get_text() for elem in elements])
+
+    dom = parse_html(body, encoding)
+    if dom is None:
+        return None
+
+    elements = [elem for elem in select_nodes(dom, xpath, multiple=True) or [] if isinstance(elem, etree._Element)]
+    if not elements:
+        return None
+    return ' '.join([''.join(elem.itertext()) for elem in elements])
+
+
+def extract_content(body: bytes, encoding: Optional[str], selector: Optional[str],
+                    css: bool = False, structured: bool = True) -> Dict[str, Any]:
+    """Corpo e metadati di una pagina articolo: dati strutturati, poi il selettore (CSS o XPath)"""
+    result = None
+    if structured:
+        result = extract_structured(decode_body(body, encoding))
+    result = result or empty_article()
+
+    if not result['content'] and selector:
+        content = extract_css_text(body, encoding, selector) if css else extract_text(body, encoding, selector)
+        if content:
+            result['content'] = content
+            result['source'] = 'selector'
+    return result
+
+
+def _first_element(dom, xpath: Optional[etree.XPath]):
+    found = [elem for elem in select_nodes(dom, xpath) or [] if isinstance(elem, etree._Element)]
+    return found[0] if found else None
+
+
+def extract_article(body: bytes, encoding: Optional[str], url: str, selectors: Dict[str, Optional[str]],
+                    structured: bool = True) -> Optional[Dict[str, Any]]:
+    """Campi di una pagina articolo
+
+    Se i dati strutturati contengono il corpo il DOM non viene costruito; altrimenti
+    i selettori sono applicati al primo elemento 'article_list' e i campi mancanti
+    completati dai dati strutturati. Il contenuto è il testo completo (inclusi i
+    discendenti) di tutti i nodi trovati.
+    """
+    data = extract_structured(decode_body(body, encoding)) if structured else None
+    if data is not None and data['content'] and data['title']:
+        return {
+            'title': data['title'],
+            'url': url,
+            'content': data['content'],
+            'summary': data['summary'],
+            'author': data['author'],
+            'date_text': data['published'],
+            'tags': data['tags']
+        }
+
+    plan = get_plan(selectors)
+
+    dom = parse_html(body, encoding)
+    element = _first_element(dom, plan.get('article_list')) if dom is not None else None
+
+    # Nessun elemento: il markup potrebbe essere stato ricostruito male da libxml2
+    if element is None:
+        dom = parse_html_recover(body, encoding)
+        element = _first_element(dom, plan.get('article_list')) if dom is not None else None
+    if element is None:
+        return None
+
+    data = data or empty_article()
+    content_nodes = [elem for elem in select_nodes(element, plan.get('content'), multiple=True) or [] if isinstance(elem, etree._Element)]
+    return {
+        'title': data['title'] or select_text(element, plan.get('title')) or select_text(dom, cached_selector('//title')),
+        'url': url,
+        'content': ' '.join(''.join(elem.itertext()) for elem in content_nodes) or data['content'],
+        'summary': data['summary'] or select_text(element, plan.get('summary')),
+        'author': data['author'] or select_text(element, plan.get('author')),
+        'date_text': data['published'] or select_text(element, plan.get('date')),
+        'tags': data['tags'] or select_tags(element, plan.get('tag'))
+    }
+
+
+def _localname(element) -> str:
+    tag = element.tag
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _child_texts(element) -> Dict[str, str]:
+    """Testo dei figli diretti per nome locale (namespace ignorati)"""
+    texts = {}
+    for child in element:
+        name = _localname(child)
+        if name and name not in texts and child.text:
+            texts[name] = child.text.strip()
+    return texts
+
+
+def parse_sitemap(body: bytes, since: Optional[dt.datetime] = None) -> Dict[str, Any]:
+    """Parse in streaming di una sitemap (urlset o sitemapindex, anche gzip)
+
+    Le voci con lastmod non successivo a since sono scartate durante il parse;
+    quelle senza lastmod sono sempre incluse. Gli elementi già letti sono
+    liberati man mano, la memoria non cresce con la dimensione del file.
+    """
+    stream = io.BytesIO(body)
+    if body[:2] == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream)
+
+    sitemaps: List[Dict[str, Any]] = []
+    urls: List[Dict[str, Any]] = []
+    skipped = 0
+    error = None
+    try:
+        for _, element in etree.iterparse(stream, events=('end',), resolve_entities=False, no_network=True):
+            name = _localname(element)
+            if name not in ('url', 'sitemap'):
+                continue
+
+            texts = _child_texts(element)
+            loc = texts.get('loc')
+            if loc:
+                lastmod = parse_date(texts.get('lastmod'))
+                if since is not None and lastmod is not None and lastmod <= since:
+                    skipped += 1
+                elif name == 'sitemap':
+                    sitemaps.append({'url': loc, 'lastmod': lastmod})
+                else:
+                    # Estensione news: titolo, data di pubblicazione e keyword
+                    news = next((child for child in element if _localname(child) == 'news'), None)
+                    news_texts = _child_texts(news) if news is not None else {}
+                    keywords = news_texts.get('keywords', '')
+                    urls.append({
+                        'url': loc,
+                        'lastmod': lastmod,
+                        'title': news_texts.get('title'),
+                        'published': parse_date(news_texts.get('publication_date')),
+                        'keywords': [keyword.strip() for keyword in keywords.split(',') if keyword.strip()]
+                    })
+
+            # Libera l'elemento e i fratelli già elaborati
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except (etree.XMLSyntaxError, OSError, EOFError) as e:
+        # Voci lette prima dell'errore comunque utilizzabili
+        error = str(e)
+
+    return {'sitemaps': sitemaps, 'urls': urls, 'skipped': skipped, 'error': error}
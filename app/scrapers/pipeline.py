@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from .articles import PreparedArticle, ScrapedArticle, prepare_articles
+from .base import BaseReader
+from .metrics import StageStats
+from app.models import Source, Article
+
+if TYPE_CHECKING:
+    from .manager import ScraperManager
+
+
+@dataclass
+class SourceJob:
+    """Una source in transito nella pipeline
+
+    Gli stadi di fetch e parse vedono solo il reader e dati semplici: la Source
+    ORM resta al writer, l'unico che usa la sessione.
+    """
+    source_id: int
+    name: str
+    reader: Optional[BaseReader]
+    started: float = 0.0
+    status: str = 'pending'  # ok, not_modified, no_new, empty, invalid, error, lost
+    error: Optional[str] = None
+    scraped: List[ScrapedArticle] = field(default_factory=list)
+    prepared: List[PreparedArticle] = field(default_factory=list)
+
+
+@dataclass
+class SourceRun:
+    """Esito dello scrape di una source"""
+    source_id: int
+    source_name: str
+    articles: List[Article]
+    success: bool
+    error: Optional[str] = None
+    duration: float = 0.0
+
+
+class ScrapePipeline:
+    """Scrape di più source in tre stadi collegati da code limitate
+
+    - fetch: pipeline_fetch_workers task eseguono i reader. Il parsing dei
+      documenti (feed, elenchi, sitemap, pagine articolo) avviene qui, dentro
+      reader.fetch_articles, nel ParserPool: i reader devono parsare una pagina
+      per sapere quali scaricare dopo, quindi non può stare in uno stadio a valle.
+    - parse: pipeline_parse_workers task preparano gli articoli estratti per il
+      database (hash di URL e contenuto, conteggi, tag normalizzati, metadata),
+      nel ParserPool per batch grandi. Non parsano documenti.
+    - write: un solo task possiede la sessione, salva gli articoli e aggiorna le source
+
+    Code piene fermano lo stadio precedente: la memoria resta limitata anche con
+    centinaia di fetch in parallelo, e il database ha un solo scrittore.
+
+    lost è l'insieme (aggiornato durante la run da SourceLeases.hold) delle
+    source il cui lease è passato a un altro worker: il writer ne scarta i risultati.
+    """
+
+    def __init__(self, manager: 'ScraperManager', lost: Optional[Set[int]] = None):
+        self.manager = manager
+        self.lost = lost if lost is not None else set()
+        self.db = manager.db
+        self.config = manager.context.config
+        self.parser_pool = manager.context.parser_pool
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def run(self, sources: List[Source]) -> List[SourceRun]:
+        """Scrape delle source; un SourceRun per source, nell'ordine ricevuto"""
+        if not sources:
+            return []
+
+        # Già caricati all'avvio del manager; ricaricati qui se scaduti o invalidati dalle API
+        self.manager.context.tag_cache.ensure_loaded(self.db)
+
+        by_id: Dict[int, Source] = {}
+        jobs: asyncio.Queue = asyncio.Queue()
+        for source in sources:
+            by_id[source.id] = source # type: ignore
+            # Lettura degli URL noti (database) prima di avviare gli stadi
+            jobs.put_nowait(SourceJob(source.id, source.name, self.manager.create_reader(source))) # type: ignore
+
+        fetch_workers = max(1, min(self.config.pipeline_fetch_workers, len(sources)))
+        parse_workers = max(1, self.config.pipeline_parse_workers)
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.pipeline_queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.pipeline_queue_size)
+        stages = {
+            'fetch': StageStats('fetch', fetch_workers, jobs),
+            'parse': StageStats('parse', parse_workers, parse_queue),
+            'write': StageStats('write', 1, write_queue)
+        }
+        self.manager.context.metrics.set_pipeline(stages)
+
+        self.logger.info(
+            f"Scraping {len(sources)} sources (fetch={fetch_workers}, parse={parse_workers}, "
+            f"queue={self.config.pipeline_queue_size})"
+        )
+
+        runs: Dict[int, SourceRun] = {}
+        fetchers = [asyncio.create_task(self._fetch_worker(jobs, parse_queue, stages)) for _ in range(fetch_workers)]
+        parsers = [asyncio.create_task(self._parse_worker(parse_queue, write_queue, stages)) for _ in range(parse_workers)]
+        writer = asyncio.create_task(self._write_worker(write_queue, by_id, runs, stages['write']))
+        tasks = fetchers + parsers + [writer]
+
+        try:
+            await asyncio.gather(*fetchers)
+            # Un segnale di fine per ogni parser, poi uno per il writer
+            for _ in parsers:
+                await parse_queue.put(None)
+            await asyncio.gather(*parsers)
+            await write_queue.put(None)
+            await writer
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        return [runs[source.id] for source in sources if source.id in runs] # type: ignore
+
+    async def _fetch_worker(self, jobs: asyncio.Queue, output: asyncio.Queue, stages: Dict[str, StageStats]):
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            started = stages['fetch'].started()
+            job.started = started
+            await self._fetch(job)
+            stages['fetch'].finished(started, job.status == 'error')
+
+            await output.put(job)
+            stages['parse'].queued()
+
+    async def _fetch(self, job: SourceJob):
+        """Esegue il reader e classifica l'esito"""
+        reader = job.reader
+        if reader is None:
+            job.status, job.error = 'error', "Failed to create reader"
+            self.logger.error(f"Failed to create reader for source {job.name}")
+            return
+
+        self.logger.info(f"Starting scrape for source: {job.name}")
+        try:
+            async with reader:
+                if not await reader.validate_source():
+                    self.logger.error(f"Source validation failed: {job.name}")
+                    job.status, job.error = 'invalid', "Source validation failed"
+                    return
+
+                job.scraped = await reader.fetch_articles()
+
+            if reader.not_modified:
+                job.status = 'not_modified'
+            elif not job.scraped and reader.skipped_known:
+                job.status = 'no_new'
+            elif not job.scraped:
+                job.status = 'empty'
+            else:
+                job.status = 'ok'
+
+        except Exception as e:
+            self.logger.error(f"Error scraping source {job.name}: {str(e)}")
+            job.status, job.error = 'error', str(e)
+
+    async def _parse_worker(self, queue: asyncio.Queue, output: asyncio.Queue, stages: Dict[str, StageStats]):
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+
+            started = stages['parse'].started()
+            failed = False
+            if job.status == 'ok':
+                try:
+                    size = sum(len(article.content or '') for article in job.scraped)
+                    job.prepared = await self.parser_pool.run(prepare_articles, job.scraped, size=size)
+                    job.scraped = []
+                except Exception as e:
+                    self.logger.error(f"Error preparing articles of {job.name}: {str(e)}")
+                    job.status, job.error = 'error', str(e)
+                    failed = True
+            stages['parse'].finished(started, failed)
+
+            await output.put(job)
+            stages['write'].queued()
+
+    async def _write_worker(self, queue: asyncio.Queue, sources: Dict[int, Source],
+                            runs: Dict[int, SourceRun], stats: StageStats):
+        """Unico utilizzatore della sessione per tutta la run"""
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+
+            started = stats.started()
+            source = sources[job.source_id]
+            articles: List[Article] = []
+            try:
+                articles = self._persist(job, source)
+            except Exception as e:
+                self.logger.error(f"Error saving results of {job.name}: {str(e)}")
+                self.manager.writer.rollback()
+                job.status, job.error = 'error', str(e)
+            stats.finished(started, job.status in ('error', 'lost'))
+
+            runs[job.source_id] = SourceRun(
+                source_id=job.source_id,
+                source_name=job.name,
+                articles=articles,
+                success=job.status not in ('error', 'invalid', 'lost'),
+                error=job.error,
+                duration=time.perf_counter() - job.started
+            )
+
+    def _persist(self, job: SourceJob, source: Source) -> List[Article]:
+        """Salva gli articoli e lo stato della source secondo l'esito del fetch
+
+        Ogni esito termina con un solo commit esplicito, che include le
+        statistiche di rete della run.
+        """
+        manager = self.manager
+        reader = job.reader
+        if reader is None:
+            return []
+
+        if job.source_id in self.lost:
+            # La source è ora di un altro worker: niente articoli, validatori o stato
+            self.logger.warning(f"Lease on source {job.name} lost during scrape, discarding {len(job.prepared)} articles")
+            job.status, job.error = 'lost', "Lease lost to another worker during scrape"
+            return []
+
+        if job.status == 'invalid':
+            manager._record_failure(source, job.error or "Source validation failed", reader.retry_after)
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        if job.status == 'error':
+            manager._record_failure(source, job.error or "Unknown error")
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        # Validatori (ETag, Last-Modified, feed_hash, watermark) solo con un esito definitivo:
+        # salvati con gli articoli o per feed invariato, mai dopo un fetch senza articoli validi
+        if job.status == 'not_modified':
+            self.logger.info(f"Source not modified since last scrape: {job.name}")
+            manager._store_validators(source, reader)
+            manager._mark_scraped(source)
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        if job.status == 'no_new':
+            self.logger.info(f"No new articles for source {job.name} ({reader.skipped_known} already known)")
+            manager._store_validators(source, reader)
+            manager._mark_scraped(source)
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        if job.status == 'empty':
+            self.logger.warning(f"No articles found for source: {job.name}")
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        # Articoli, validatori, stato della source e statistiche in un solo commit
+        try:
+            saved, existing = manager.writer.save_prepared(job.prepared, source)
+        except Exception as e:
+            self.logger.error(f"Error saving {len(job.prepared)} articles for source {job.name}: {str(e)}")
+            manager.writer.rollback()
+            job.status, job.error = 'error', str(e)
+            manager._record_failure(source, str(e))
+            manager._add_fetch_stats(source, reader)
+            self.db.commit()
+            return []
+
+        articles = saved + existing
+        manager._store_validators(source, reader)
+        # Resa per l'intervallo adattivo: solo articoli inseriti ora, esclusi i duplicati di contenuto
+        manager._mark_scraped(source, sum(1 for article in saved if not article.is_duplicate))
+        manager._add_fetch_stats(source, reader)
+        manager.writer.commit()
+
+        self.logger.info(f"Successfully scraped {len(articles)} articles from {job.name}")
+        return articles
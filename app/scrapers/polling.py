@@ -0,0 +1,41 @@
+from typing import Tuple
+
+
+class AdaptivePollInterval:
+    """Intervallo di polling per source adattato agli articoli nuovi trovati
+
+    Si parte da Source.update_frequency. Uno scrape con più articoli nuovi di
+    target_yield accorcia l'intervallo, uno con meno lo allunga, fino a
+    dimezzarlo o aumentarlo del 50% per volta, sempre fra min e max. Le source
+    molto attive sono così interrogate spesso, quelle ferme di rado.
+    """
+
+    MAX_SHRINK = 0.5
+    MAX_GROWTH = 1.5
+
+    def __init__(self, min_interval: int = 300, max_interval: int = 86400, target_yield: float = 3.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_yield = target_yield
+
+    def bounds(self, source) -> Tuple[int, int]:
+        """Limiti della source: min_poll_interval/max_poll_interval in scraping_config o globali"""
+        config = source.scraping_config or {}
+        low = int(config.get('min_poll_interval', self.min_interval))
+        high = int(config.get('max_poll_interval', self.max_interval))
+        return low, max(low, high)
+
+    def current(self, source) -> int:
+        low, high = self.bounds(source)
+        interval = source.poll_interval or source.update_frequency or 3600
+        return int(min(max(interval, low), high))
+
+    def next_interval(self, source, new_articles: int) -> int:
+        """Intervallo dopo uno scrape riuscito che ha trovato new_articles articoli nuovi"""
+        if new_articles <= 0:
+            factor = self.MAX_GROWTH
+        else:
+            factor = min(max(self.target_yield / new_articles, self.MAX_SHRINK), self.MAX_GROWTH)
+
+        low, high = self.bounds(source)
+        return int(min(max(self.current(source) * factor, low), high))
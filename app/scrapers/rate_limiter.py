@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class _TokenBucket:
+    """Token bucket per un singolo host"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class HostRateLimiter:
+    """Rate limiter asincrono per host condiviso da tutti i reader"""
+
+    def __init__(self, domain_overrides: Optional[Dict[str, float]] = None, burst: int = 1):
+        self.domain_overrides = {domain.lower(): delay for domain, delay in (domain_overrides or {}).items()}
+        self.burst = max(1, burst)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        # Crawl-delay dichiarati dagli host in robots.txt
+        self.crawl_delays: Dict[str, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_interval(self, host: str, default: float) -> float:
+        """Intervallo minimo fra richieste per l'host (override per dominio o default della source)
+
+        Mai inferiore al Crawl-delay dell'host.
+        """
+        host = host.lower()
+        interval = default
+        for domain, delay in self.domain_overrides.items():
+            if host == domain or host.endswith('.' + domain):
+                interval = delay
+                break
+        return max(interval, self.crawl_delays.get(host, 0.0))
+
+    def set_crawl_delay(self, url: str, delay: Optional[float]):
+        """Registra il Crawl-delay di robots.txt per l'host dell'URL"""
+        host = urlparse(url).netloc.lower()
+        if not host:
+            return
+        if delay:
+            if self.crawl_delays.get(host) != delay:
+                self.logger.info(f"Crawl-delay for {host}: {delay}s")
+            self.crawl_delays[host] = delay
+        else:
+            self.crawl_delays.pop(host, None)
+
+    async def acquire(self, url: str, interval: float):
+        """Attende finché l'host dell'URL non ha un token disponibile"""
+        host = urlparse(url).netloc.lower()
+        interval = self.get_interval(host, interval)
+        if not host or interval <= 0:
+            return
+
+        # I lock asyncio sono legati al loop: su un nuovo loop si riparte da zero
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._buckets.clear()
+            self._loop = loop
+
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _TokenBucket(self.burst)
+
+        # Il lock serializza le attese sullo stesso host, host diversi non si bloccano
+        async with bucket.lock:
+            now = time.monotonic()
+            bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated) / interval)
+            bucket.updated = now
+
+            if bucket.tokens < 1:
+                wait = (1 - bucket.tokens) * interval
+                self.logger.debug(f"Rate limiting {host}: waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+                bucket.tokens = 1.0
+                bucket.updated = time.monotonic()
+
+            bucket.tokens -= 1
@@ -0,0 +1,86 @@
+import random
+import datetime as dt
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Status HTTP per cui ha senso ritentare
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converte l'header Retry-After (secondi o HTTP-date) in secondi di attesa"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (retry_date - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff esponenziale con cap e full jitter"""
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in RETRYABLE_STATUS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attesa prima del tentativo successivo (attempt parte da 0)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            # Il server ha indicato quanto attendere: rispettalo entro il cap
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class SourceCircuitBreaker:
+    """Circuit breaker per source basato su Source.error_count"""
+
+    MAX_EXPONENT = 16
+
+    def __init__(self, failure_threshold: int = 5, max_cooldown: int = 86400):
+        self.failure_threshold = failure_threshold
+        self.max_cooldown = max_cooldown
+
+    def is_open(self, source, now: Optional[dt.datetime] = None) -> bool:
+        """Il breaker è aperto se la source ha superato la soglia e il cooldown non è scaduto"""
+        if (source.error_count or 0) < self.failure_threshold or source.next_scrape is None:
+            return False
+
+        now = now or dt.datetime.now(dt.timezone.utc)
+        next_scrape = source.next_scrape
+        if next_scrape.tzinfo is None:
+            next_scrape = next_scrape.replace(tzinfo=dt.timezone.utc)
+        return next_scrape > now
+
+    def next_delay(self, source, retry_after: Optional[float] = None) -> float:
+        """Secondi prima del prossimo tentativo dopo un fallimento"""
+        interval = float(source.update_frequency or 3600)
+        failures = source.error_count or 0
+
+        if failures >= self.failure_threshold:
+            # Breaker aperto: cooldown esponenziale con jitter; esponente limitato
+            # perché con error_count molto alto 2 ** exponent supera i float (OverflowError)
+            exponent = min(failures - self.failure_threshold + 1, self.MAX_EXPONENT)
+            delay = min(self.max_cooldown, interval * (2 ** exponent))
+            delay = random.uniform(delay / 2, delay)
+        else:
+            delay = interval
+
+        if retry_after is not None:
+            # Retry-After del server rispettato entro max_cooldown (timedelta ha un limite)
+            delay = max(delay, min(retry_after, self.max_cooldown))
+        return delay
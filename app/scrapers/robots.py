@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import aiohttp
+
+from .rate_limiter import HostRateLimiter
+
+# robots.txt più grandi sono troncati (RFC 9309 impone almeno 500 KiB)
+MAX_ROBOTS_BYTES = 512 * 1024
+
+
+class RobotsCache:
+    """robots.txt per host, scaricati una volta e tenuti in cache per ttl secondi
+
+    Un robots.txt assente (4xx) permette tutto. Anche errori di rete e 5xx
+    permettono tutto, ma restano in cache solo error_ttl secondi: un host
+    momentaneamente giù non deve bloccare le source per un giorno.
+    """
+
+    def __init__(self, ttl: int = 86400, error_ttl: int = 600, max_crawl_delay: float = 30.0, timeout: float = 10.0):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_crawl_delay = max_crawl_delay
+        self.timeout = timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # origin -> (parser, scadenza); parser None = nessuna restrizione
+        self._entries: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _origin(url: str) -> Optional[str]:
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            return None
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    async def _download(self, session: aiohttp.ClientSession, origin: str, user_agent: str,
+                        rate_limiter: Optional[HostRateLimiter] = None, interval: float = 0.0) -> Tuple[Optional[RobotFileParser], int]:
+        """Scarica e parsa robots.txt; ritorna il parser e il ttl da applicare"""
+        url = f"{origin}/robots.txt"
+        if rate_limiter is not None:
+            # Una richiesta all'host come le altre: stesso intervallo della source
+            await rate_limiter.acquire(url, interval)
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with session.get(url, headers={'User-Agent': user_agent}, timeout=timeout) as response:
+                if 400 <= response.status < 500:
+                    self.logger.debug(f"No robots.txt for {origin} (HTTP {response.status})")
+                    return None, self.ttl
+                if response.status != 200:
+                    self.logger.warning(f"HTTP {response.status} fetching {url}, allowing all for {self.error_ttl}s")
+                    return None, self.error_ttl
+                # read(n) ritorna il primo chunk disponibile: si legge fino a EOF o al cap
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body.extend(chunk[:MAX_ROBOTS_BYTES - len(body)])
+                    if len(body) >= MAX_ROBOTS_BYTES:
+                        self.logger.warning(f"{url} larger than {MAX_ROBOTS_BYTES} bytes, truncated")
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Error fetching {url}: {type(e).__name__}, allowing all for {self.error_ttl}s")
+            return None, self.error_ttl
+
+        parser = RobotFileParser(url)
+        parser.parse(bytes(body).decode('utf-8', 'replace').splitlines())
+        parser.modified()
+        return parser, self.ttl
+
+    async def get(self, session: aiohttp.ClientSession, url: str, user_agent: str,
+                  rate_limiter: Optional[HostRateLimiter] = None, interval: float = 0.0) -> Optional[RobotFileParser]:
+        """Parser del robots.txt dell'host dell'URL (None = nessuna restrizione)"""
+        origin = self._origin(url)
+        if origin is None:
+            return None
+
+        entry = self._entries.get(origin)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        # I lock asyncio sono legati al loop: su un nuovo loop si riparte da zero
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._locks.clear()
+            self._loop = loop
+
+        # Un solo download per host anche con molte richieste concorrenti
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(origin)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+
+            parser, ttl = await self._download(session, origin, user_agent, rate_limiter, interval)
+            self._entries[origin] = (parser, time.monotonic() + ttl)
+            return parser
+
+    async def can_fetch(self, session: aiohttp.ClientSession, url: str, user_agent: str,
+                        rate_limiter: Optional[HostRateLimiter] = None, interval: float = 0.0) -> bool:
+        """True se robots.txt permette l'URL all'user agent (il download passa dal rate_limiter, se dato)"""
+        parser = await self.get(session, url, user_agent, rate_limiter, interval)
+        return parser is None or parser.can_fetch(user_agent, url)
+
+    def crawl_delay(self, url: str, user_agent: str) -> Optional[float]:
+        """Crawl-delay (o Request-rate) in cache per l'host, limitato a max_crawl_delay"""
+        origin = self._origin(url)
+        entry = self._entries.get(origin) if origin is not None else None
+        if entry is None or entry[0] is None:
+            return None
+
+        parser = entry[0]
+        delay = parser.crawl_delay(user_agent)
+        if delay is None:
+            rate = parser.request_rate(user_agent)
+            if rate is not None and rate.requests > 0:
+                delay = rate.seconds / rate.requests
+        if delay is None:
+            return None
+        return min(float(delay), self.max_crawl_delay)
+
+    def clear(self):
+        self._entries.clear()
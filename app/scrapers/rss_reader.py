@@ -1,19 +1,19 @@
-import feedparser
 import datetime as dt
 from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import asyncio
-import re
-from dateutil import parser as date_parser
-import feedparser.encodings
 
 from .base import BaseReader, ScrapedArticle
+from .context import ScraperContext
+from .dates import parse_date, struct_to_datetime
+from .parsing import parse_feed, extract_content
+from .text import html_to_text
 
 class RSSReader(BaseReader):
     """Reader per feed RSS/Atom"""
     
-    def __init__(self, source_config: Dict[str, Any]):
-        super().__init__(source_config)
+    def __init__(self, source_config: Dict[str, Any], context: Optional[ScraperContext] = None):
+        super().__init__(source_config, context)
         self.rss_url = str(source_config.get('rss_url') or source_config.get('base_url'))
         self.base_url = str(source_config.get('base_url', ''))
         self.max_articles = source_config.get('max_articles', 50)
@@ -21,44 +21,63 @@ class RSSReader(BaseReader):
         # Configurazione parsing
         self.extract_full_content = source_config.get('extract_full_content', False)
         self.content_selectors = source_config.get('scraping_config', {}) if self.extract_full_content else {}
+        self.structured_data = (source_config.get('scraping_config') or {}).get('structured_data', True)
+        self.fetch_concurrency = max(1, int(source_config.get('fetch_concurrency', 4)))
+        
+        # Feed parsato nella run, condiviso da validate_source e fetch_articles
+        self._feed: Optional[Dict[str, Any]] = None
+        self._feed_loaded = False
         
         self.logger.info(f"RSSReader initialized for {self.rss_url}")
     
+    async def _load_feed(self) -> Optional[Dict[str, Any]]:
+        """Fetch e parse del feed, una sola volta per run
+        
+        Ritorna None se il fetch fallisce o se il feed non è cambiato (self.not_modified).
+        """
+        if self._feed_loaded:
+            return self._feed
+        self._feed_loaded = True
+        
+        self.logger.info(f"Fetching RSS feed: {self.rss_url}")
+        
+        # Fetch RSS content (conditional GET con i validatori salvati)
+        document = await self.fetch_page(self.rss_url, conditional=True)
+        if self.not_modified:
+            return None
+        
+        if document is None:
+            self.logger.error(f"Failed to fetch RSS feed: {self.rss_url}")
+            return None
+        
+        # Short-circuit se il body è identico all'ultimo fetch
+        if self.is_unchanged_body(document.body):
+            self.logger.info(f"RSS feed unchanged since last fetch: {self.rss_url}")
+            self.not_modified = True
+            return None
+        
+        # Parse RSS nel pool di processi: feedparser riceve i bytes grezzi e fa la propria decodifica
+        self._feed = await self.run_parser(parse_feed, document, document.response_headers)
+        return self._feed
+    
     async def fetch_articles(self) -> List[ScrapedArticle]:
         """Fetch articles from RSS feed"""
         try:
-            self.logger.info(f"Fetching RSS feed: {self.rss_url}")
-            
-            # Fetch RSS content
-            rss_content = await self.fetch_url(self.rss_url)
-            if not rss_content:
-                self.logger.error(f"Failed to fetch RSS feed: {self.rss_url}")
+            feed = await self._load_feed()
+            if feed is None:
                 return []
             
-            # Parse RSS
-            try:
-                feed = feedparser.parse(rss_content)
-            except Exception as e:
-                self.logger.warning(f"Error parsing RSS articles: {str(e)}")
-                self.logger.info(f"Changing encoding to latin-1 and retrying...")
-                
-                rss_content = rss_content.encode('latin-1', 'ignore').decode('utf-8')
-                feed = feedparser.parse(rss_content)
-            
-            if feed.bozo:
-                self.logger.warning(f"RSS feed has parsing errors: {feed.bozo_exception}")
+            if feed['bozo']:
+                self.logger.warning(f"RSS feed has parsing errors: {feed['bozo_exception']}")
             
-            self.logger.info(f"Found {len(feed.entries)} entries in RSS feed")
+            self.logger.info(f"Found {len(feed['entries'])} entries in RSS feed")
             
-            articles = []
-            for entry in feed.entries[:self.max_articles]:
-                article = await self._parse_rss_entry(entry)
-                if article:
-                    articles.append(article)
-                    
-                # Rate limiting
-                if len(articles) > 1:
-                    await asyncio.sleep(0.1)
+            # Entry in parallelo (fetch del contenuto completo limitato dal semaforo), ordine del feed preservato
+            semaphore = asyncio.Semaphore(self.fetch_concurrency)
+            results = await asyncio.gather(*[
+                self._parse_rss_entry(entry, semaphore) for entry in feed['entries'][:self.max_articles]
+            ])
+            articles = [article for article in results if article]
             
             self.logger.info(f"Successfully parsed {len(articles)} articles from RSS")
             return articles
@@ -67,7 +86,7 @@ class RSSReader(BaseReader):
             self.logger.error(f"Error fetching RSS articles: {str(e)}")
             return []
     
-    async def _parse_rss_entry(self, entry) -> Optional[ScrapedArticle]:
+    async def _parse_rss_entry(self, entry: Dict[str, Any], semaphore: asyncio.Semaphore) -> Optional[ScrapedArticle]:
         """Parse single RSS entry"""
         try:
             # Extract basic info
@@ -82,6 +101,11 @@ class RSSReader(BaseReader):
             if not url.startswith('http'):
                 url = urljoin(self.base_url, url)
             
+            # Articolo già salvato (per URL o per id dell'entry): nessun parsing né fetch del contenuto completo
+            if self.is_known_url(url) or self.is_known_id(entry.get('id')):
+                self.skipped_known += 1
+                return None
+            
             # Extract content
             content = self._extract_content_from_entry(entry)
             summary = self._extract_summary_from_entry(entry)
@@ -100,7 +124,8 @@ class RSSReader(BaseReader):
             
             # If full content extraction is enabled, fetch full article
             if self.extract_full_content and content and len(content) < 500:
-                full_content = await self._fetch_full_content(url)
+                async with semaphore:
+                    full_content = await self._fetch_full_content(url)
                 if full_content:
                     content = full_content
             
@@ -122,45 +147,45 @@ class RSSReader(BaseReader):
             self.logger.error(f"Error parsing RSS entry: {str(e)}")
             return None
     
-    def _extract_content_from_entry(self, entry) -> str:
+    def _extract_content_from_entry(self, entry: Dict[str, Any]) -> str:
         """Extract content from RSS entry"""
         # Try different content fields
         content_fields = ['content', 'summary', 'description']
         
         for field in content_fields:
-            if hasattr(entry, field):
-                field_value = getattr(entry, field)
+            if field in entry:
+                field_value = entry[field]
                 
                 # Handle different content formats
                 if isinstance(field_value, list) and len(field_value) > 0:
                     content = field_value[0].get('value', '')
                 elif isinstance(field_value, str):
                     content = field_value
-                elif hasattr(field_value, 'value'):
-                    content = field_value.value # type: ignore
+                elif isinstance(field_value, dict):
+                    content = field_value.get('value', '')
                 else:
                     continue
                 
                 if content:
-                    return self._clean_html_content(content)
+                    return html_to_text(content)
         
         return ""
     
-    def _extract_summary_from_entry(self, entry) -> str:
+    def _extract_summary_from_entry(self, entry: Dict[str, Any]) -> str:
         """Extract summary from RSS entry"""
         summary = entry.get('summary', '')
         if summary:
-            return self._clean_html_content(summary)
+            return html_to_text(summary)
         return ""
     
-    def _extract_author_from_entry(self, entry) -> Optional[str]:
+    def _extract_author_from_entry(self, entry: Dict[str, Any]) -> Optional[str]:
         """Extract author from RSS entry"""
         # Try different author fields
         author_fields = ['author', 'author_detail', 'dc_creator']
         
         for field in author_fields:
-            if hasattr(entry, field):
-                author = getattr(entry, field)
+            if field in entry:
+                author = entry[field]
                 if isinstance(author, dict):
                     return author.get('name', '')
                 elif isinstance(author, str):
@@ -168,36 +193,38 @@ class RSSReader(BaseReader):
         
         return None
     
-    def _extract_date_from_entry(self, entry) -> Optional[dt.datetime]:
+    def _extract_date_from_entry(self, entry: Dict[str, Any]) -> Optional[dt.datetime]:
         """Extract published date from RSS entry"""
         date_fields = ['published', 'updated', 'created']
         
         for field in date_fields:
-            if hasattr(entry, field):
-                date_str = getattr(entry, field)
+            if field in entry:
+                date_str = entry[field]
                 if date_str:
                     try:
-                        # Try feedparser's parsed date first
+                        # Try feedparser's parsed date first (tupla time.struct_time)
                         parsed_field = f"{field}_parsed"
-                        if hasattr(entry, parsed_field):
-                            parsed_date = getattr(entry, parsed_field)
+                        if parsed_field in entry:
+                            parsed_date = entry[parsed_field]
                             if parsed_date:
-                                return dt.datetime(*parsed_date[:6])
+                                return struct_to_datetime(parsed_date)
                         
-                        # Fallback to dateutil parser
-                        return date_parser.parse(date_str)
+                        # Fallback: formati RFC 822/ISO e date in italiano
+                        parsed = parse_date(date_str)
+                        if parsed is not None:
+                            return parsed
                     except:
                         continue
         
         return None
     
-    def _extract_tags_from_entry(self, entry) -> List[str]:
+    def _extract_tags_from_entry(self, entry: Dict[str, Any]) -> List[str]:
         """Extract tags from RSS entry"""
         tags = []
         
         # Try tags field
-        if hasattr(entry, 'tags'):
-            for tag in entry.tags:
+        if 'tags' in entry:
+            for tag in entry['tags']:
                 if isinstance(tag, dict):
                     tag_name = tag.get('term', '')
                 else:
@@ -209,63 +236,47 @@ class RSSReader(BaseReader):
                     tags.append(tag_name.lower().strip())
         
         # Try category field
-        if hasattr(entry, 'category'):
-            tags.append(entry.category)
+        if 'category' in entry:
+            tags.append(entry['category'])
         
         return tags
     
-    def _extract_metadata_from_entry(self, entry) -> Dict[str, Any]:
+    def _extract_metadata_from_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
         """Extract metadata from RSS entry"""
         metadata = {}
         
         # Add RSS-specific metadata
-        if hasattr(entry, 'id'):
-            metadata['rss_id'] = entry.id
+        if 'id' in entry:
+            metadata['rss_id'] = entry['id']
         
-        if hasattr(entry, 'comments'):
-            metadata['comments_url'] = entry.comments
+        if 'comments' in entry:
+            metadata['comments_url'] = entry['comments']
         
-        if hasattr(entry, 'enclosures'):
-            metadata['enclosures'] = [enc.href for enc in entry.enclosures]
+        if 'enclosures' in entry:
+            metadata['enclosures'] = [enc.get('href') for enc in entry['enclosures']]
             
         # Consiglio Regione Lazio
-        if hasattr(entry, 'enclosure'):
-            metadata['enclosures'] = [enc.url for enc in entry.enclosure]
+        if 'enclosure' in entry:
+            metadata['enclosures'] = [enc.get('url') for enc in entry['enclosure']]
         
         return metadata
     
-    def _clean_html_content(self, content: str) -> str:
-        """Clean HTML content"""
-        if not content:
-            return ""
-        
-        # Remove HTML tags
-        import re
-        content = re.sub(r'<[^>]+>', ' ', content)
-        
-        # Clean text
-        return self.clean_text(content)
-    
     async def _fetch_full_content(self, url: str) -> Optional[str]:
-        """Fetch full content from article URL"""
+        """Fetch full content from article URL: dati strutturati, poi content_selector (CSS)"""
         try:
-            if not self.content_selectors:
+            content_selector = self.content_selectors.get('content_selector')
+            if not content_selector and not self.structured_data:
                 return None
             
-            html_content = await self.fetch_url(url)
-            if not html_content:
+            document = await self.fetch_document(url)
+            if document is None:
                 return None
             
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Try to extract content using selectors
-            content_selector = self.content_selectors.get('content_selector')
-            if content_selector:
-                content_elements = soup.select(content_selector)
-                if content_elements:
-                    content = ' '.join([elem.get_text() for elem in content_elements])
-                    return self.clean_text(content)
+            full = await self.run_parser(
+                extract_content, document, document.encoding, content_selector, True, self.structured_data
+            )
+            if full['content']:
+                return self.clean_text(full['content'])
             
             return None
             
@@ -276,30 +287,21 @@ class RSSReader(BaseReader):
     async def validate_source(self) -> bool:
         """Validate RSS source"""
         try:
-            rss_content = await self.fetch_url(self.rss_url)
-            if not rss_content:
-                return False
-            
-            # Parse RSS
-            try:
-                feed = feedparser.parse(rss_content)
-            except Exception as e:
-                self.logger.warning(f"Error parsing RSS articles: {str(e)}")
-                self.logger.info(f"Changing encoding to latin-1 and retrying...")
-                
-                rss_content = rss_content.encode('latin-1', 'ignore').decode('utf-8')
-                feed = feedparser.parse(rss_content)
+            # Stesso fetch (memoizzato) usato da fetch_articles
+            feed = await self._load_feed()
+            if self.not_modified:
+                self.logger.info(f"RSS source validated: not modified since last fetch")
+                return True
             
-            # Check if it's a valid feed
-            if not hasattr(feed, 'entries'):
+            if feed is None:
                 return False
             
             # Check if it has at least one entry
-            if len(feed.entries) == 0:
+            if len(feed['entries']) == 0:
                 self.logger.warning(f"RSS feed is valid but empty: {self.rss_url}")
                 return True
             
-            self.logger.info(f"RSS source validated successfully: {len(feed.entries)} entries")
+            self.logger.info(f"RSS source validated successfully: {len(feed['entries'])} entries")
             return True
             
         except Exception as e:
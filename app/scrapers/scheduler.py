@@ -0,0 +1,176 @@
+import asyncio
+import heapq
+import logging
+import time
+import datetime as dt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from .config import ScraperConfig
+from .manager import ScraperManager
+from app.models import Source
+
+
+class ScrapeScheduler:
+    """Daemon che esegue lo scrape di ogni source quando scade il suo next_scrape
+
+    Le source attive stanno in un heap ordinato per next_scrape, riletto dal
+    database ogni scheduler_refresh_interval secondi per recepire source nuove,
+    modificate o disattivate. Le source scadute partono insieme nella pipeline,
+    al massimo scheduler_batch_size per volta. Dopo ogni scrape tornano
+    nell'heap con il next_scrape calcolato dal manager, cioè con l'intervallo
+    adattivo o il cooldown del circuit breaker.
+
+    Più scheduler (processi o nodi) sullo stesso database si dividono le source
+    tramite i lease: quelle reclamate da un altro worker sono saltate e
+    riprese alla scadenza successiva.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], config: Optional[ScraperConfig] = None):
+        self.db = session_factory()
+        self.manager = ScraperManager(self.db, config)
+        self.config = self.manager.context.config
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        # (scadenza epoch, source_id); voci superate restano nell'heap e sono scartate all'estrazione
+        self._heap: List[Tuple[float, int]] = []
+        self._due: Dict[int, float] = {}
+        self._refreshed = 0.0
+        self._stop: Optional[asyncio.Event] = None
+
+        self.batches = 0
+        self.dispatched = 0
+        self.articles = 0
+
+    @staticmethod
+    def _timestamp(value: Optional[dt.datetime]) -> float:
+        """next_scrape come epoch; None = subito (SQLite restituisce datetime naive in UTC)"""
+        if value is None:
+            return 0.0
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=dt.timezone.utc)
+        return value.timestamp()
+
+    def _push(self, source: Source, scraped: bool = False, not_before: float = 0.0):
+        due = max(self._timestamp(source.next_scrape), not_before) # type: ignore
+        if scraped and due <= time.time():
+            # Scrape senza esito registrato (nessun articolo, reader non creato): niente ripetizione immediata
+            due = time.time() + (source.poll_interval or source.update_frequency or 3600) # type: ignore
+        self._due[source.id] = due # type: ignore
+        heapq.heappush(self._heap, (due, source.id)) # type: ignore
+
+    def refresh(self):
+        """Ricostruisce l'heap dalle source attive"""
+        # Chiude la transazione di lettura: si vedono le modifiche di API e altri processi
+        self.db.rollback()
+        if self.manager.leases is not None:
+            self.manager.leases.recover()
+        sources = self.db.query(Source).filter(Source.is_active == True).all()
+
+        # Scadenze spostate in memoria dopo scrape senza esito registrato restano valide
+        previous = self._due
+        self._heap = []
+        self._due = {}
+        for source in sources:
+            self._push(source, not_before=previous.get(source.id, 0.0)) # type: ignore
+        self._refreshed = time.monotonic()
+        self.logger.debug(f"Scheduler refreshed: {len(sources)} active sources")
+
+    def _pop_due(self, now: float) -> List[int]:
+        """Id delle source scadute, al più scheduler_batch_size"""
+        source_ids = []
+        while self._heap and self._heap[0][0] <= now and len(source_ids) < self.config.scheduler_batch_size:
+            due, source_id = heapq.heappop(self._heap)
+            if self._due.get(source_id) != due:
+                continue
+            del self._due[source_id]
+            source_ids.append(source_id)
+        return source_ids
+
+    def next_due(self) -> Optional[float]:
+        """Epoch della prossima scadenza valida nell'heap"""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def tick(self) -> int:
+        """Scrape delle source scadute ora; ritorna quante ne sono partite"""
+        if time.monotonic() - self._refreshed >= self.config.scheduler_refresh_interval:
+            self.refresh()
+
+        now = time.time()
+        source_ids = self._pop_due(now)
+        if not source_ids:
+            return 0
+
+        # Stato corrente dal database: la source può essere stata disattivata o già aggiornata
+        self.db.rollback()
+        sources = self.db.query(Source).filter(Source.id.in_(source_ids), Source.is_active == True).all()
+        due = [source for source in sources if self._timestamp(source.next_scrape) <= now] # type: ignore
+        for source in sources:
+            if source not in due:
+                self._push(source)
+        if not due:
+            return 0
+
+        self.logger.info(f"Dispatching {len(due)} due sources")
+        runs = await self.manager.scrape_sources(due)
+
+        self.batches += 1
+        self.dispatched += len(due)
+        self.articles += sum(len(run.articles) for run in runs)
+
+        # next_scrape aggiornato dal manager (intervallo adattivo o cooldown)
+        for source in due:
+            self._push(source, scraped=True)
+        return len(due)
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run_forever(self):
+        """Esegue tick fino a stop(), dormendo fino alla prossima scadenza o rilettura"""
+        self._stop = asyncio.Event()
+        self.logger.info(
+            f"Scheduler started (batch={self.config.scheduler_batch_size}, "
+            f"refresh={self.config.scheduler_refresh_interval}s)"
+        )
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    dispatched = await self.tick()
+                except Exception as e:
+                    self.logger.error(f"Scheduler tick failed: {str(e)}")
+                    self.db.rollback()
+                    dispatched = 0
+                if dispatched:
+                    # Altre source possono essere scadute durante lo scrape
+                    continue
+
+                next_refresh = self._refreshed + self.config.scheduler_refresh_interval - time.monotonic()
+                next_due = self.next_due()
+                wait = next_refresh if next_due is None else min(next_refresh, next_due - time.time())
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=max(wait, 0.1))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.logger.info(f"Scheduler stopped: {self.dispatched} scrapes in {self.batches} batches, {self.articles} articles")
+
+    def status(self) -> Dict[str, Any]:
+        next_due = self.next_due()
+        return {
+            'sources': len(self._due),
+            'next_due': dt.datetime.fromtimestamp(next_due, dt.timezone.utc).isoformat() if next_due is not None else None,
+            'batches': self.batches,
+            'dispatched': self.dispatched,
+            'articles': self.articles
+        }
+
+    async def close(self):
+        await ScraperManager.close_shared_context()
+        if self.manager.leases is not None:
+            self.manager.leases.close()
+        self.db.close()
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+
+from app.models import Article, ArticleMetadata
+
+
+class SeenUrlIndex:
+    """Indice in memoria, per source, degli URL degli articoli già salvati
+
+    Contiene l'URL completo e non url_hash: url_hash ignora query string e
+    fragment, quindi article.php?id=1 e article.php?id=2 avrebbero lo stesso
+    hash. Viene caricato da Article.url (limitato agli articoli più recenti) e
+    ricaricato dopo ttl secondi, così cancellazioni e scritture da altri
+    processi vengono recepite. Un URL assente dall'indice non è per forza nuovo:
+    la verifica definitiva resta quella di ArticleWriter.save_articles.
+
+    Per le source RSS indicizza anche l'id delle entry (metadata rss_id):
+    un'entry con id stabile ma link cambiato (tracking, redirect) è già nota.
+    """
+
+    def __init__(self, max_per_source: int = 5000, ttl: int = 3600):
+        self.max_per_source = max_per_source
+        self.ttl = ttl
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        # source_id -> (caricamento, URL, id delle entry RSS)
+        self._sources: Dict[int, Tuple[float, Set[str], Set[str]]] = {}
+
+    def _load(self, db: Session, source_id: int) -> Tuple[float, Set[str], Set[str]]:
+        with self._lock:
+            entry = self._sources.get(source_id)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                return entry
+
+        rows = db.query(Article.url).filter(
+            Article.source_id == source_id
+        ).order_by(Article.id.desc()).limit(self.max_per_source).all()
+        urls = {row[0] for row in rows}
+
+        rows = db.query(ArticleMetadata.value).join(Article).filter(
+            Article.source_id == source_id, ArticleMetadata.key == 'rss_id'
+        ).order_by(Article.id.desc()).limit(self.max_per_source).all()
+        ids = {row[0] for row in rows if row[0]}
+        self.logger.debug(f"Loaded {len(urls)} known URLs and {len(ids)} RSS ids for source {source_id}")
+
+        entry = (time.monotonic(), urls, ids)
+        with self._lock:
+            self._sources[source_id] = entry
+        return entry
+
+    def for_source(self, db: Session, source_id: int) -> Set[str]:
+        """URL noti per la source, caricandoli dal database se necessario"""
+        return self._load(db, source_id)[1]
+
+    def ids_for_source(self, db: Session, source_id: int) -> Set[str]:
+        """Id (rss_id) delle entry già salvate per la source"""
+        return self._load(db, source_id)[2]
+
+    def add(self, source_id: int, url: str, rss_id: Optional[str] = None):
+        """Registra un articolo appena salvato"""
+        with self._lock:
+            entry = self._sources.get(source_id)
+            if entry is not None:
+                entry[1].add(url)
+                if rss_id:
+                    entry[2].add(rss_id)
+
+    def forget(self, source_id: int):
+        """Scarta l'indice della source (ricaricato al prossimo utilizzo)"""
+        with self._lock:
+            self._sources.pop(source_id, None)
@@ -0,0 +1,223 @@
+"""Selettori di scraping_config compilati in piani di estrazione.
+
+Ogni selettore è compilato una volta in un etree.XPath. Un valore che inizia
+come un'espressione XPath ('/', './', '../', '(') resta XPath, e così un nome
+di elemento da solo ('h2', '*'): nelle configurazioni esistenti indica i figli
+diretti, mentre in CSS cercherebbe a ogni profondità. Gli altri sono prima
+tradotti come CSS ('h1, h2', '.author', 'article > a'; tag, .classe, #id,
+[attributi], discendente e '>', niente pseudo-classi) e, se la traduzione
+fallisce, compilati come XPath ('h2/a', "div[@class='x']"). I prefissi 'css:'
+e 'xpath:' forzano l'interpretazione ('css:h2' per i discendenti).
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from lxml import etree
+
+# Traduttore CSS completo, usato se installato (non è una dipendenza del progetto)
+try:
+    from cssselect import GenericTranslator, SelectorError as _CssSelectorError
+    HAS_CSSSELECT = True
+except ImportError:
+    HAS_CSSSELECT = False
+
+# Chiave di scraping_config -> chiave del piano
+SELECTOR_KEYS = {
+    'article_list_selector': 'article_list',
+    'title_selector': 'title',
+    'content_selector': 'content',
+    'url_selector': 'url',
+    'date_selector': 'date',
+    'author_selector': 'author',
+    'summary_selector': 'summary',
+    'tag_selector': 'tag',
+    'pagination_selector': 'pagination',
+    'article_selector': 'article_list',  # SitemapReader: contenitore nella pagina articolo
+}
+
+
+class SelectorError(ValueError):
+    """Selettore non valido né come XPath né come CSS"""
+    pass
+
+
+_CSS_TOKEN = re.compile(
+    r'\s*(?P<combinator>>)\s*'
+    r'|(?P<space>\s+)'
+    r'|(?P<tag>\*|[A-Za-z][\w-]*)'
+    r'|\.(?P<cls>-?[A-Za-z_][\w-]*)'
+    r'|#(?P<id>-?[A-Za-z_][\w-]*)'
+    r'|\[\s*(?P<attr>[A-Za-z_][\w:-]*)\s*(?:(?P<op>[~^$*|]?=)\s*(?P<value>"[^"]*"|\'[^\']*\'|[^\]\s]+)\s*)?\]'
+)
+
+
+# Solo l'inizio distingue un XPath: '(' e '::' compaiono anche nelle pseudo-classi CSS
+_XPATH_PREFIX = re.compile(r'(?:\.{1,2})?/|\(')
+# Nome di elemento senza altro: XPath sull'asse child, come prima dei selettori CSS
+_ELEMENT_NAME = re.compile(r'(?:\*|[A-Za-z][\w-]*)$')
+_QUOTED = re.compile(r'"[^"]*"|\'[^\']*\'')
+# ':' singolo: pseudo-classe CSS (in XPath sarebbe un prefisso di namespace, inutile sull'HTML)
+_PSEUDO_CLASS = re.compile(r'(?<!:):(?!:)')
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def _attr_condition(attr: str, op: Optional[str], value: Optional[str]) -> str:
+    name = f'@{attr}'
+    if op is None:
+        return name
+    if value and value[0] in '"\'':
+        value = value[1:-1]
+    literal = _xpath_literal(value or '')
+    if op == '=':
+        return f'{name} = {literal}'
+    if op == '~=':
+        return f"contains(concat(' ', normalize-space({name}), ' '), {_xpath_literal(f' {value} ')})"
+    if op == '^=':
+        return f'starts-with({name}, {literal})'
+    if op == '$=':
+        return f'substring({name}, string-length({name}) - string-length({literal}) + 1) = {literal}'
+    if op == '*=':
+        return f'contains({name}, {literal})'
+    # |=
+    return f"({name} = {literal} or starts-with({name}, {_xpath_literal(f'{value}-')}))"
+
+
+def _simple_css_to_xpath(css: str) -> str:
+    """Traduttore CSS minimale (senza pseudo-classi)"""
+    groups = []
+    for group in css.split(','):
+        group = group.strip()
+        if not group:
+            raise SelectorError(f"Empty selector group in '{css}'")
+
+        path = 'descendant-or-self::'
+        tag, conditions = None, []
+        position = 0
+
+        def flush(axis_next: str) -> str:
+            step = (tag or '*') + ''.join(f'[{cond}]' for cond in conditions)
+            return step + axis_next
+
+        while position < len(group):
+            match = _CSS_TOKEN.match(group, position)
+            if match is None or match.end() == position:
+                raise SelectorError(f"Unsupported CSS selector '{css}'")
+            position = match.end()
+
+            if match.group('combinator') or match.group('space'):
+                if tag is None and not conditions:
+                    raise SelectorError(f"Dangling combinator in '{css}'")
+                path += flush('/' if match.group('combinator') else '/descendant-or-self::*/')
+                tag, conditions = None, []
+            elif match.group('tag'):
+                if tag is not None or conditions:
+                    raise SelectorError(f"Unexpected element name in '{css}'")
+                tag = match.group('tag')
+            elif match.group('cls'):
+                conditions.append(
+                    f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')"
+                )
+            elif match.group('id'):
+                conditions.append(f"@id = {_xpath_literal(match.group('id'))}")
+            else:
+                conditions.append(_attr_condition(match.group('attr'), match.group('op'), match.group('value')))
+
+        if tag is None and not conditions:
+            raise SelectorError(f"Dangling combinator in '{css}'")
+        groups.append(path + flush(''))
+    return ' | '.join(groups)
+
+
+def css_to_xpath(css: str) -> str:
+    """Traduce un selettore CSS in XPath relativo all'elemento di contesto"""
+    if HAS_CSSSELECT:
+        try:
+            return GenericTranslator().css_to_xpath(css)
+        except _CssSelectorError as e:
+            raise SelectorError(f"Invalid CSS selector '{css}': {str(e)}")
+    return _simple_css_to_xpath(css)
+
+
+def compile_selector(selector: str) -> etree.XPath:
+    """Compila un selettore (XPath o CSS) in un etree.XPath"""
+    selector = selector.strip()
+    if not selector:
+        raise SelectorError("Empty selector")
+
+    if selector.startswith('css:'):
+        expression = css_to_xpath(selector[4:].strip())
+    elif selector.startswith('xpath:'):
+        expression = selector[6:].strip()
+    elif _XPATH_PREFIX.match(selector) or _ELEMENT_NAME.match(selector):
+        expression = selector
+    else:
+        try:
+            expression = css_to_xpath(selector)
+        except SelectorError as e:
+            # es. 'h2/a' o 'h2[1]': non è CSS, può essere XPath; 'a:hover' invece non è nessuno dei due
+            if _PSEUDO_CLASS.search(_QUOTED.sub('', selector)):
+                raise SelectorError(str(e) if HAS_CSSSELECT else f"{str(e)} (CSS pseudo-classes are not supported)")
+            expression = selector
+
+    try:
+        return etree.XPath(expression)
+    except etree.XPathSyntaxError as e:
+        raise SelectorError(f"Invalid selector '{selector}': {str(e)}")
+
+
+@lru_cache(maxsize=1024)
+def cached_selector(selector: str) -> Optional[etree.XPath]:
+    """compile_selector in cache per processo; None se il selettore non è valido"""
+    try:
+        return compile_selector(selector)
+    except SelectorError:
+        return None
+
+
+class ExtractionPlan:
+    """Selettori di una source compilati una sola volta (None se non validi)"""
+
+    def __init__(self, selectors: Dict[str, Optional[str]]):
+        self.selectors = dict(selectors)
+        self.xpaths: Dict[str, Optional[etree.XPath]] = {
+            key: cached_selector(selector) if selector else None
+            for key, selector in self.selectors.items()
+        }
+
+    def get(self, key: str) -> Optional[etree.XPath]:
+        return self.xpaths.get(key)
+
+
+@lru_cache(maxsize=256)
+def _cached_plan(items: Tuple[Tuple[str, str], ...]) -> ExtractionPlan:
+    return ExtractionPlan(dict(items))
+
+
+def get_plan(selectors: Dict[str, Optional[str]]) -> ExtractionPlan:
+    """Piano compilato per i selettori, in cache per processo (una voce per configurazione)"""
+    return _cached_plan(tuple(sorted((key, value or '') for key, value in selectors.items())))
+
+
+def validate_scraping_config(scraping_config: Optional[Dict]) -> List[str]:
+    """Errori dei selettori di una scraping_config (lista vuota se valida)"""
+    errors = []
+    for config_key in SELECTOR_KEYS:
+        selector = (scraping_config or {}).get(config_key)
+        if selector is None:
+            continue
+        if not isinstance(selector, str):
+            errors.append(f"{config_key}: selector must be a string")
+            continue
+        try:
+            compile_selector(selector)
+        except SelectorError as e:
+            errors.append(f"{config_key}: {str(e)}")
+    return errors
@@ -0,0 +1,234 @@
+import datetime as dt
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urljoin
+import asyncio
+
+from .base import ScrapedArticle
+from .context import ScraperContext
+from .dates import parse_date
+from .parsing import parse_sitemap, extract_article
+from .web_reader import WebReader
+
+# Ordinamento delle voci senza lastmod (trattate come le più vecchie)
+_OLDEST = dt.datetime.min.replace(tzinfo=dt.timezone.utc)
+
+class SitemapReader(WebReader):
+    """Reader incrementale da sitemap.xml (indici e news sitemap inclusi)
+
+    Scarica solo gli URL con lastmod successivo al watermark della source e ne
+    estrae il contenuto con i selettori di scraping_config, applicati alla pagina
+    dell'articolo invece che a un elenco.
+    """
+
+    def __init__(self, source_config: Dict[str, Any], context: Optional[ScraperContext] = None):
+        super().__init__(source_config, context)
+        self.sitemap_url = self.scraping_config.get('sitemap_url') or urljoin(self.base_url, '/sitemap.xml')
+        self.article_selector = self.scraping_config.get('article_selector', '/html')
+        self.max_sitemaps = int(self.scraping_config.get('max_sitemaps', 50))
+        # Le sitemap arrivano a 50 MB: limiti propri, non quelli delle pagine HTML
+        self.sitemap_max_bytes = int(source_config.get('sitemap_max_bytes', 50 * 1024 * 1024))
+        self.sitemap_body_timeout = float(source_config.get('sitemap_body_timeout', 120.0))
+
+        # Watermark salvato (naive nel database = UTC); alla prima run solo gli ultimi giorni
+        since = source_config.get('sitemap_watermark')
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=dt.timezone.utc)
+        lookback_days = self.scraping_config.get('sitemap_lookback_days', 7)
+        if since is None and lookback_days:
+            since = self.UTCNOW() - dt.timedelta(days=lookback_days)
+        self.since: Optional[dt.datetime] = since
+
+        # Nuovo watermark da persistere (None se non avanza)
+        self.watermark: Optional[dt.datetime] = None
+
+        # Sitemap parsate nella run, condivise da validate_source e fetch_articles
+        self._sitemaps: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        self.logger.info(f"SitemapReader initialized for {self.sitemap_url}")
+
+    def _article_selectors(self) -> Dict[str, Optional[str]]:
+        """Selettori della pagina articolo: 'article_list' individua il contenitore"""
+        selectors = self._selectors()
+        selectors['article_list'] = self.article_selector
+        return selectors
+
+    async def _load_sitemap(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch e parse (voci non più recenti del watermark scartate), una sola volta per run
+
+        Niente conditional GET: un indice senza lastmod resta identico anche quando
+        cambiano le sitemap figlie; il delta è dato dal watermark.
+        """
+        if url not in self._sitemaps:
+            document = await self.fetch_page(url, max_bytes=self.sitemap_max_bytes, body_timeout=self.sitemap_body_timeout)
+            if document is None:
+                self._sitemaps[url] = None
+            else:
+                self._sitemaps[url] = await self.run_parser(parse_sitemap, document, self.since)
+                if self._sitemaps[url]['error']:
+                    self.logger.warning(f"Sitemap {url} has parsing errors: {self._sitemaps[url]['error']}")
+        return self._sitemaps[url]
+
+    async def _load_child_sitemap(self, url: str, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await self._load_sitemap(url)
+
+    async def _collect_entries(self) -> List[Dict[str, Any]]:
+        """URL più recenti del watermark da tutta la gerarchia di sitemap"""
+        root = await self._load_sitemap(self.sitemap_url)
+        if root is None:
+            return []
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        level, visited = [root], {self.sitemap_url}
+        while level:
+            children = []
+            for sitemap in level:
+                for entry in sitemap['urls']:
+                    previous = entries.get(entry['url'])
+                    if previous is None or (entry['lastmod'] or _OLDEST) > (previous['lastmod'] or _OLDEST):
+                        entries[entry['url']] = entry
+                for child in sitemap['sitemaps']:
+                    if child['url'] in visited:
+                        continue
+                    if len(visited) >= self.max_sitemaps:
+                        self.logger.warning(f"Sitemap limit reached ({self.max_sitemaps}), skipping {child['url']}")
+                        continue
+                    visited.add(child['url'])
+                    children.append(child['url'])
+
+            # Sitemap figlie (solo quelle modificate dopo il watermark) in parallelo
+            results = await asyncio.gather(*[self._load_child_sitemap(url, semaphore) for url in children])
+            level = [sitemap for sitemap in results if sitemap is not None]
+
+        return list(entries.values())
+
+    async def fetch_articles(self) -> List[ScrapedArticle]:
+        """Fetch degli articoli modificati dopo il watermark, dal più vecchio"""
+        try:
+            self.logger.info(f"Starting sitemap scraping for {self.sitemap_url}")
+
+            entries = await self._collect_entries()
+            if not entries:
+                self.logger.info(f"No sitemap entries newer than {self.since}")
+                self.not_modified = True
+                return []
+
+            # Dal più vecchio: il watermark avanza senza lasciare buchi anche con max_articles
+            entries.sort(key=lambda entry: entry['lastmod'] or _OLDEST)
+
+            candidates = []
+            for entry in entries:
+                if self.is_known_url(entry['url']):
+                    self.skipped_known += 1
+                    continue
+                if len(candidates) < self.max_articles:
+                    candidates.append(entry)
+
+            self.logger.info(
+                f"Found {len(entries)} sitemap entries newer than {self.since} "
+                f"({self.skipped_known} already known, fetching {len(candidates)})"
+            )
+
+            semaphore = asyncio.Semaphore(self.fetch_concurrency)
+            results = await asyncio.gather(*[self._scrape_entry(entry, semaphore) for entry in candidates])
+
+            done = {entry['url'] for entry in entries if self.is_known_url(entry['url'])}
+            done.update(entry['url'] for entry, (_, fetched) in zip(candidates, results) if fetched)
+            self._advance_watermark(entries, done)
+
+            articles = [article for article, _ in results if article]
+            self.logger.info(f"Successfully scraped {len(articles)} articles from sitemap")
+            return articles
+
+        except Exception as e:
+            self.logger.error(f"Error in sitemap scraping: {str(e)}")
+            return []
+
+    def _advance_watermark(self, entries: List[Dict[str, Any]], done: set):
+        """Watermark = lastmod più recente tale che tutte le voci fino a esso siano state elaborate"""
+        pending = [entry['lastmod'] for entry in entries if entry['lastmod'] is not None and entry['url'] not in done]
+        limit = min(pending) if pending else None
+        completed = [
+            entry['lastmod'] for entry in entries
+            if entry['lastmod'] is not None and entry['url'] in done and (limit is None or entry['lastmod'] < limit)
+        ]
+        if not completed:
+            return
+
+        # lastmod nel futuro (orologi sbagliati) non devono bloccare le run successive
+        watermark = min(max(completed), self.UTCNOW())
+        if self.since is None or watermark > self.since:
+            self.watermark = watermark
+
+    async def _scrape_entry(self, entry: Dict[str, Any], semaphore: asyncio.Semaphore) -> Tuple[Optional[ScrapedArticle], bool]:
+        """Articolo della voce e True se la voce è stata elaborata (anche senza articolo)"""
+        url = entry['url']
+        try:
+            async with semaphore:
+                document = await self.fetch_document(url)
+            if document is None:
+                return None, False
+
+            fields = await self.run_parser(
+                extract_article, document, document.encoding, url, self._article_selectors(), self.structured_data
+            )
+            title = (fields or {}).get('title') or entry['title']
+            if not fields or not title:
+                self.logger.debug(f"Skipping sitemap entry without article: {url}")
+                return None, True
+
+            content = fields['content'] or fields['summary'] or ''
+            published_date = parse_date(fields['date_text']) or entry['published'] or entry['lastmod']
+
+            article = ScrapedArticle(
+                title=self.clean_text(title),
+                content=self.clean_text(content),
+                url=url,
+                author=fields['author'],
+                published_date=published_date,
+                summary=self.clean_text(fields['summary']) if fields['summary'] else None,
+                tags=fields['tags'] or entry['keywords'],
+                metadata={
+                    'scraped_from': self.sitemap_url,
+                    'lastmod': entry['lastmod'].isoformat() if entry['lastmod'] else None
+                }
+            )
+
+            self.logger.debug(f"Parsed sitemap article: {title[:50]}...")
+            return article, True
+
+        except Exception as e:
+            self.logger.error(f"Error parsing sitemap entry {url}: {str(e)}")
+            return None, False
+
+    async def validate_source(self) -> bool:
+        """Validate sitemap source"""
+        try:
+            # Stessa sitemap (memoizzata) usata da fetch_articles
+            sitemap = await self._load_sitemap(self.sitemap_url)
+            if sitemap is None or (sitemap['error'] and not sitemap['urls'] and not sitemap['sitemaps']):
+                self.logger.warning(f"Invalid or unreachable sitemap: {self.sitemap_url}")
+                return False
+
+            self.logger.info(
+                f"Sitemap validated successfully: {len(sitemap['urls'])} urls, "
+                f"{len(sitemap['sitemaps'])} sitemaps newer than watermark"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Sitemap validation failed: {str(e)}")
+            return False
+
+    def get_source_info(self) -> Dict[str, Any]:
+        """Get sitemap source information"""
+        return {
+            'type': 'sitemap',
+            'base_url': self.base_url,
+            'sitemap_url': self.sitemap_url,
+            'max_articles': self.max_articles,
+            'watermark': self.since.isoformat() if self.since else None,
+            'scraping_config': self.scraping_config,
+            'last_update': self.get_last_update().isoformat()
+        }
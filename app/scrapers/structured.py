@@ -0,0 +1,238 @@
+"""Dati strutturati incorporati nelle pagine articolo.
+
+Molte pagine di notizie contengono già titolo, autore, date e testo come JSON:
+oggetti schema.org in <script type="application/ld+json">, lo stato di Next.js
+in <script id="__NEXT_DATA__"> o almeno i meta OpenGraph. Estrarli richiede
+solo un paio di espressioni regolari e json.loads, senza costruire il DOM né
+selettori configurati per source. Le funzioni lavorano sul testo già decodificato
+e ritornano solo strutture picklable.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from .text import html_to_text, normalize_text
+
+# Tipi schema.org di un articolo
+ARTICLE_TYPES = {
+    'Article', 'NewsArticle', 'ReportageNewsArticle', 'AnalysisNewsArticle', 'OpinionNewsArticle',
+    'BackgroundNewsArticle', 'ReviewNewsArticle', 'LiveBlogPosting', 'BlogPosting', 'Report',
+    'TechArticle', 'ScholarlyArticle',
+}
+
+_LD_JSON_RE = re.compile(
+    r'<script[^>]+type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id\s*=\s*["\']__NEXT_DATA__["\'][^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+_META_RE = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s"\'>]+)')
+_HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+
+# Testo minimo perché un campo di JSON applicativo sia considerato il corpo dell'articolo
+_MIN_BODY_CHARS = 200
+# Profondità massima della visita di __NEXT_DATA__
+_MAX_DEPTH = 12
+
+
+def empty_article(source: Optional[str] = None) -> Dict[str, Any]:
+    """Campi di un articolo estratto, tutti vuoti"""
+    return {
+        'source': source, 'title': None, 'content': None, 'summary': None,
+        'author': None, 'published': None, 'modified': None, 'tags': []
+    }
+
+
+def _text(value: Any) -> Optional[str]:
+    """Stringa pulita (HTML e entità rimossi) o None"""
+    if isinstance(value, list):
+        value = next((item for item in value if isinstance(item, str)), None)
+    if not isinstance(value, str):
+        return None
+    text = html_to_text(value) if '<' in value else normalize_text(value)
+    return text or None
+
+
+def _names(value: Any) -> Optional[str]:
+    """Autore/i schema.org: stringa, Person/Organization o lista"""
+    if isinstance(value, str):
+        return _text(value)
+    if isinstance(value, dict):
+        return _text(value.get('name'))
+    if isinstance(value, list):
+        names = [name for name in (_names(item) for item in value) if name]
+        return ', '.join(names) or None
+    return None
+
+
+def _keywords(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [keyword.strip() for keyword in value.split(',') if keyword.strip()]
+    if isinstance(value, list):
+        keywords = [item.get('name') if isinstance(item, dict) else item for item in value]
+        return [keyword.strip() for keyword in keywords if isinstance(keyword, str) and keyword.strip()]
+    return []
+
+
+def _is_article(node: Dict[str, Any]) -> bool:
+    types = node.get('@type')
+    if isinstance(types, str):
+        types = [types]
+    return isinstance(types, list) and any(isinstance(kind, str) and kind in ARTICLE_TYPES for kind in types)
+
+
+def _ld_nodes(data: Any):
+    """Oggetti JSON-LD, espandendo liste e @graph"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _ld_nodes(data['@graph'])
+        main = data.get('mainEntity')
+        if isinstance(main, (dict, list)):
+            yield from _ld_nodes(main)
+
+
+def _load_json(raw: str) -> Any:
+    try:
+        return json.loads(raw.strip())
+    except ValueError:
+        # CDATA o commenti HTML attorno al JSON
+        cleaned = raw.strip().removeprefix('<!--').removesuffix('-->').strip()
+        cleaned = cleaned.removeprefix('//<![CDATA[').removesuffix('//]]>').strip()
+        try:
+            return json.loads(cleaned)
+        except ValueError:
+            return None
+
+
+def extract_json_ld(html: str) -> Optional[Dict[str, Any]]:
+    """Primo articolo schema.org (NewsArticle & co.) degli script JSON-LD"""
+    best = None
+    for match in _LD_JSON_RE.finditer(html):
+        for node in _ld_nodes(_load_json(match.group(1))):
+            if not _is_article(node):
+                continue
+
+            result = empty_article('json-ld')
+            result.update({
+                'title': _text(node.get('headline')) or _text(node.get('name')),
+                'content': _text(node.get('articleBody')) or _text(node.get('text')),
+                'summary': _text(node.get('description')),
+                'author': _names(node.get('author')),
+                'published': _text(node.get('datePublished')),
+                'modified': _text(node.get('dateModified')),
+                'tags': _keywords(node.get('keywords')) or _keywords(node.get('articleSection'))
+            })
+            if result['content']:
+                return result
+            # Senza corpo: metadati comunque utili se non c'è di meglio
+            best = best or result
+    return best
+
+
+def _body_candidates(data: Any, depth: int = 0):
+    """Oggetti del JSON applicativo con un titolo e un testo lungo"""
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(data, list):
+        for item in data:
+            yield from _body_candidates(item, depth + 1)
+    elif isinstance(data, dict):
+        title = data.get('headline') or data.get('title')
+        body = data.get('articleBody') or data.get('body') or data.get('content')
+        if isinstance(title, str) and isinstance(body, str) and len(body) >= _MIN_BODY_CHARS:
+            yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from _body_candidates(value, depth + 1)
+
+
+def extract_next_data(html: str) -> Optional[Dict[str, Any]]:
+    """Articolo dallo stato __NEXT_DATA__ di Next.js (oggetto con il testo più lungo)"""
+    match = _NEXT_DATA_RE.search(html)
+    if match is None:
+        return None
+    data = _load_json(match.group(1))
+    if data is None:
+        return None
+
+    def body_of(node):
+        return node.get('articleBody') or node.get('body') or node.get('content')
+
+    node = max(_body_candidates(data), key=lambda candidate: len(body_of(candidate)), default=None)
+    if node is None:
+        return None
+
+    result = empty_article('next-data')
+    result.update({
+        'title': _text(node.get('headline') or node.get('title')),
+        'content': _text(body_of(node)),
+        'summary': _text(node.get('description') or node.get('excerpt') or node.get('summary')),
+        'author': _names(node.get('author') or node.get('authors')),
+        'published': _text(node.get('datePublished') or node.get('publishedAt') or node.get('date')),
+        'modified': _text(node.get('dateModified') or node.get('updatedAt')),
+        'tags': _keywords(node.get('keywords') or node.get('tags'))
+    })
+    return result
+
+
+def extract_opengraph(html: str) -> Optional[Dict[str, Any]]:
+    """Meta OpenGraph/article:* dell'head (nessun corpo, solo metadati)"""
+    head_end = _HEAD_END_RE.search(html)
+    head = html[:head_end.start()] if head_end else html[:64 * 1024]
+
+    meta: Dict[str, Any] = {}
+    tags = []
+    for tag in _META_RE.finditer(head):
+        attrs = {name.lower(): value.strip('"\'') for name, value in _ATTR_RE.findall(tag.group(0))}
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        value = attrs.get('content')
+        if not key or value is None:
+            continue
+        if key == 'article:tag':
+            tags.append(value)
+        elif key not in meta:
+            meta[key] = value
+
+    title = _text(meta.get('og:title'))
+    if title is None:
+        return None
+
+    result = empty_article('opengraph')
+    result.update({
+        'title': title,
+        'summary': _text(meta.get('og:description') or meta.get('description')),
+        'author': _text(meta.get('article:author') or meta.get('author')),
+        'published': _text(meta.get('article:published_time')),
+        'modified': _text(meta.get('article:modified_time')),
+        'tags': [tag for tag in (_text(tag) for tag in tags) if tag]
+    })
+    return result
+
+
+def extract_structured(html: str) -> Optional[Dict[str, Any]]:
+    """Articolo dai dati strutturati: JSON-LD, poi __NEXT_DATA__, poi OpenGraph
+
+    I campi mancanti della fonte scelta sono completati dalle successive;
+    'content' è None se nessuna fonte contiene il corpo dell'articolo.
+    """
+    result = None
+    for extractor in (extract_json_ld, extract_next_data, extract_opengraph):
+        found = extractor(html)
+        if found is None:
+            continue
+        if result is None:
+            result = found
+        else:
+            for key, value in found.items():
+                if key != 'source' and not result[key]:
+                    result[key] = value
+        if result['content'] and result['title'] and result['published']:
+            break
+    return result
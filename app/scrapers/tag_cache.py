@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy.orm import Session
+
+from app.models import Tag
+
+
+class TagCache:
+    """Cache di processo normalized_name -> tag id
+
+    Caricata per intero dalla tabella tags (al primo uso o con warm) e ricaricata
+    dopo ttl secondi, così i tag creati o rimossi da altri processi vengono
+    recepiti. I tag inseriti dallo scraper sono aggiunti dopo il commit; le
+    modifiche dalle API la invalidano.
+    """
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._known_ids: Set[int] = set()
+        self._loaded: Optional[float] = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded is not None and time.monotonic() - self._loaded < self.ttl
+
+    def warm(self, db: Session):
+        """Carica tutti i tag (con normalized_name duplicati vince l'id più basso)"""
+        ids: Dict[str, int] = {}
+        for normalized_name, tag_id in db.query(Tag.normalized_name, Tag.id).order_by(Tag.id):
+            if normalized_name is not None:
+                ids.setdefault(normalized_name, tag_id)
+
+        with self._lock:
+            self._ids = ids
+            self._known_ids = set(ids.values())
+            self._loaded = time.monotonic()
+        self.logger.debug(f"Loaded {len(ids)} tags")
+
+    def ensure_loaded(self, db: Session):
+        if not self._is_fresh():
+            self.warm(db)
+
+    def lookup(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """Id dei tag noti fra names (quelli assenti non compaiono nel risultato)"""
+        self.ensure_loaded(db)
+        with self._lock:
+            return {name: self._ids[name] for name in names if name in self._ids}
+
+    def knows_id(self, tag_ids: Iterable[int]) -> bool:
+        """True se uno degli id è già in cache (SQLite può riusare gli id dei tag cancellati)"""
+        with self._lock:
+            return any(tag_id in self._known_ids for tag_id in tag_ids)
+
+    def add(self, ids: Dict[str, int]):
+        """Registra tag salvati (da chiamare dopo il commit)"""
+        with self._lock:
+            for name, tag_id in ids.items():
+                if name not in self._ids:
+                    self._ids[name] = tag_id
+                    self._known_ids.add(tag_id)
+
+    def invalidate(self):
+        """Forza il ricaricamento al prossimo uso"""
+        with self._lock:
+            self._ids = {}
+            self._known_ids = set()
+            self._loaded = None
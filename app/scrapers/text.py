@@ -0,0 +1,47 @@
+"""Normalizzazione del testo estratto da feed e pagine HTML.
+
+Regex precompilate al posto di re.sub ad ogni chiamata: i tag (e il contenuto di
+script/style/commenti) diventano spazi, tutte le entità HTML (nominali,
+numeriche e legacy senza ';') sono decodificate con html.unescape e gli spazi
+bianchi, incluso &nbsp;, sono compattati.
+"""
+import html
+import re
+
+_TAG_RE = re.compile(r'<[^>]*>')
+# script/style e commenti vanno rimossi insieme al contenuto
+_BLOCK_RE = re.compile(r'<(script|style)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+# Pre-check economico: _BLOCK_RE (più lenta) gira solo se serve
+_BLOCK_HINT_RE = re.compile(r'<(?:!--|[sS][cC][rR]|[sS][tT][yY])')
+
+def unescape_entities(text: str) -> str:
+    """Decodifica le entità HTML (html.unescape, incluse quelle legacy senza ';')"""
+    ampersands = text.count('&')
+    if ampersands == 0:
+        return text
+    # Caso più comune nell'output di feedparser: solo &amp;
+    if ampersands == text.count('&amp;'):
+        return text.replace('&amp;', '&')
+    return html.unescape(text)
+
+
+def normalize_text(text: str) -> str:
+    """Decodifica le entità HTML e compatta gli spazi bianchi"""
+    if not text:
+        return ""
+
+    # str.split() considera whitespace anche \xa0 (&nbsp;) e gli a capo
+    return ' '.join(unescape_entities(text).split())
+
+
+def html_to_text(content: str) -> str:
+    """Testo leggibile da un frammento HTML"""
+    if not content:
+        return ""
+
+    if '<' in content:
+        if _BLOCK_HINT_RE.search(content) is not None:
+            content = _BLOCK_RE.sub(' ', content)
+        content = _TAG_RE.sub(' ', content)
+
+    return normalize_text(content)
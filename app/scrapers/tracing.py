@@ -0,0 +1,128 @@
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+import aiohttp
+
+
+@dataclass
+class RequestTiming:
+    """Tempi per fase di una singola richiesta HTTP (millisecondi)"""
+    url: str
+    host: str
+    started: float = 0.0
+    dns_start: Optional[float] = None
+    dns_end: Optional[float] = None
+    connect_start: Optional[float] = None
+    connect_end: Optional[float] = None
+    headers_sent: Optional[float] = None
+    response_start: Optional[float] = None
+    finished: Optional[float] = None
+    status: Optional[int] = None
+    bytes: int = 0
+    reused_connection: bool = False
+    error: Optional[str] = None
+
+    @staticmethod
+    def _elapsed(start: Optional[float], end: Optional[float]) -> float:
+        if start is None or end is None:
+            return 0.0
+        return max(0.0, (end - start) * 1000)
+
+    @property
+    def dns_ms(self) -> float:
+        return self._elapsed(self.dns_start, self.dns_end)
+
+    @property
+    def connect_ms(self) -> float:
+        """Connessione TCP + handshake TLS (aiohttp non li separa)"""
+        return self._elapsed(self.connect_start, self.connect_end)
+
+    @property
+    def ttfb_ms(self) -> float:
+        return self._elapsed(self.headers_sent, self.response_start)
+
+    @property
+    def transfer_ms(self) -> float:
+        return self._elapsed(self.response_start, self.finished)
+
+    @property
+    def total_ms(self) -> float:
+        return self._elapsed(self.started, self.finished)
+
+
+def _timing(ctx: SimpleNamespace) -> Optional[RequestTiming]:
+    timing = ctx.trace_request_ctx
+    return timing if isinstance(timing, RequestTiming) else None
+
+
+async def _on_request_start(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.started = time.perf_counter()
+
+
+async def _on_dns_start(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.dns_start = time.perf_counter()
+
+
+async def _on_dns_end(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.dns_end = time.perf_counter()
+
+
+async def _on_connection_create_start(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.connect_end = time.perf_counter()
+
+
+async def _on_connection_reuse(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.reused_connection = True
+
+
+async def _on_headers_sent(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.headers_sent = time.perf_counter()
+
+
+async def _on_request_end(session, ctx, params):
+    # Scatta alla ricezione degli header di risposta: il body è letto dopo
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.response_start = time.perf_counter()
+        timing.status = params.response.status
+
+
+async def _on_request_exception(session, ctx, params):
+    timing = _timing(ctx)
+    if timing is not None:
+        timing.finished = time.perf_counter()
+        timing.error = type(params.exception).__name__
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig che compila il RequestTiming passato come trace_request_ctx"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuse)
+    trace_config.on_request_headers_sent.append(_on_headers_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
@@ -1,19 +1,18 @@
 import datetime as dt
 from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin, urlparse
 import asyncio
-import re
-from dateutil import parser as date_parser
-from lxml import etree
-from bs4 import BeautifulSoup
 
 from .base import BaseReader, ScrapedArticle
+from .context import ScraperContext
+from .dates import parse_date
+from .parsing import extract_listing, extract_content
+from .selectors import validate_scraping_config
 
 class WebReader(BaseReader):
     """Reader per scraping diretto di pagine web"""
     
-    def __init__(self, source_config: Dict[str, Any]):
-        super().__init__(source_config)
+    def __init__(self, source_config: Dict[str, Any], context: Optional[ScraperContext] = None):
+        super().__init__(source_config, context)
         self.base_url = source_config.get('base_url', '')
         self.scraping_config = source_config.get('scraping_config', {})
         self.max_articles = source_config.get('max_articles', 20)
@@ -32,6 +31,16 @@ class WebReader(BaseReader):
         self.follow_pagination = self.scraping_config.get('follow_pagination', False)
         self.pagination_selector = self.scraping_config.get('pagination_selector', '.pagination a')
         self.max_pages = self.scraping_config.get('max_pages', 3)
+        self.structured_data = self.scraping_config.get('structured_data', True)
+        self.fetch_concurrency = max(1, int(source_config.get('fetch_concurrency', 4)))
+        
+        # Estrazione per pagina nella run (articoli e paginazione da un solo parse),
+        # condivisa da validate_source, fetch_articles e _get_pagination_urls
+        self._listings: Dict[str, Dict[str, List[Any]]] = {}
+        
+        # Selettori non compilabili (config salvate prima della validazione) non estraggono nulla
+        for error in validate_scraping_config(self.scraping_config):
+            self.logger.warning(f"Invalid selector in scraping_config: {error}")
         
         self.logger.info(f"WebReader initialized for {self.base_url}")
     
@@ -48,21 +57,41 @@ class WebReader(BaseReader):
                 pagination_urls = await self._get_pagination_urls()
                 pages_to_scrape.extend(pagination_urls[:self.max_pages])
             
-            # Scrape each page
-            for page_url in pages_to_scrape:
-                page_articles = await self._scrape_page(page_url)
-                articles.extend(page_articles)
-                
-                # Rate limiting between pages
-                if len(pages_to_scrape) > 1:
-                    await asyncio.sleep(self.rate_limit)
-                
-                # Stop if we have enough articles
-                if len(articles) >= self.max_articles:
-                    break
-            
-            # Limit final results
-            articles = articles[:self.max_articles]
+            # Un solo semaforo per pagine e dettagli: richieste in volo per source limitate
+            semaphore = asyncio.Semaphore(self.fetch_concurrency)
+            
+            # La pagina successiva è scaricata mentre si elaborano i dettagli della corrente,
+            # solo se la corrente contiene articoli nuovi (altrimenti la paginazione si ferma)
+            next_task: Optional[asyncio.Future] = None
+            try:
+                for index, page_url in enumerate(pages_to_scrape):
+                    if next_task is not None:
+                        await next_task
+                        next_task = None
+                    await self._load_page(page_url)
+                    
+                    # Pagina composta solo da articoli già noti: le successive sono più vecchie
+                    if self._is_known_listing(page_url):
+                        self.skipped_known += len(self._listings[page_url]['items'])
+                        self.logger.info(f"All articles on {page_url} already known, stopping pagination")
+                        break
+                    
+                    # Prefetch solo se la pagina corrente non basta a raggiungere max_articles
+                    remaining = self.max_articles - len(articles)
+                    if index + 1 < len(pages_to_scrape) and remaining > self._count_candidates(page_url):
+                        next_task = asyncio.ensure_future(self._prefetch_page(pages_to_scrape[index + 1], semaphore))
+                    
+                    page_articles = await self._scrape_page(page_url, semaphore, self.max_articles - len(articles))
+                    articles.extend(page_articles)
+                    
+                    # Stop if we have enough articles
+                    if len(articles) >= self.max_articles:
+                        break
+            finally:
+                # Pagina successiva non più necessaria
+                if next_task is not None and not next_task.done():
+                    next_task.cancel()
+                    await asyncio.gather(next_task, return_exceptions=True)
             
             self.logger.info(f"Successfully scraped {len(articles)} articles from web")
             return articles
@@ -71,30 +100,84 @@ class WebReader(BaseReader):
             self.logger.error(f"Error in web scraping: {str(e)}")
             return []
     
-    async def _scrape_page(self, url: str) -> List[ScrapedArticle]:
-        """Scrape articles from a single page"""
+    def _selectors(self, with_pagination: bool = False) -> Dict[str, Optional[str]]:
+        """Selettori (XPath o CSS) da cui le funzioni di parsing compilano il piano di estrazione"""
+        return {
+            'article_list': self.article_list_selector,
+            'title': self.title_selector,
+            'content': self.content_selector,
+            'url': self.url_selector,
+            'date': self.date_selector,
+            'author': self.author_selector,
+            'summary': self.summary_selector,
+            'tag': self.tag_selector,
+            'pagination': self.pagination_selector if with_pagination else None
+        }
+    
+    async def _load_page(self, url: str) -> Dict[str, List[Any]]:
+        """Fetch e parse di una pagina di elenco, una sola volta per run"""
+        if url not in self._listings:
+            document = await self.fetch_page(url)
+            if document is None:
+                return {'items': [], 'pagination': []}
+            
+            # Parsing ed estrazione dei campi nel pool di processi
+            with_pagination = self.follow_pagination and url == self.base_url
+            self._listings[url] = await self.run_parser(
+                extract_listing, document, document.encoding, url, self._selectors(with_pagination)
+            )
+        return self._listings[url]
+    
+    async def _load_listing(self, url: str) -> List[Dict[str, Any]]:
+        """Campi grezzi degli articoli della pagina"""
+        return (await self._load_page(url))['items']
+    
+    def _is_known_listing(self, url: str) -> bool:
+        """True se tutti gli articoli (con URL) della pagina sono già nel database"""
+        urls = [item['url'] for item in self._listings.get(url, {}).get('items', []) if item['url']]
+        return bool(urls) and all(self.is_known_url(item_url) for item_url in urls)
+    
+    def _count_candidates(self, url: str) -> int:
+        """Articoli della pagina con titolo e URL non ancora nel database"""
+        return sum(
+            1 for item in self._listings.get(url, {}).get('items', [])
+            if item['title'] and item['url'] and not self.is_known_url(item['url'])
+        )
+    
+    async def _prefetch_page(self, url: str, semaphore: asyncio.Semaphore):
+        """Scarica e parsa una pagina di elenco rispettando il limite di concorrenza"""
+        async with semaphore:
+            await self._load_page(url)
+    
+    async def _scrape_page(self, url: str, semaphore: asyncio.Semaphore, limit: int) -> List[ScrapedArticle]:
+        """Scrape at most limit new articles from a single page"""
         try:
             self.logger.info(f"Scraping page: {url}")
             
-            html_content = await self.fetch_url(url)
-            if not html_content:
-                return []
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            dom = etree.HTML(str(soup), parser=etree.HTMLParser())
-            
-            # Find article elements
-            article_elements = dom.xpath(self.article_list_selector)
+            items = await self._load_listing(url)
             
-            if not article_elements:
+            if not items:
                 self.logger.warning(f"No articles found using selector: {self.article_list_selector}")
                 return []
             
-            articles = []
-            for element in article_elements:
-                article = await self._parse_article_element(element, url)
-                if article:
-                    articles.append(article)
+            # Scarto economico prima di qualsiasi fetch: senza titolo/URL o già salvati
+            candidates = []
+            for item in items:
+                if not item['title'] or not item['url']:
+                    self.logger.debug("Skipping article: no title or URL found")
+                    continue
+                if self.is_known_url(item['url']):
+                    self.skipped_known += 1
+                    continue
+                candidates.append(item)
+                if len(candidates) >= limit:
+                    break
+            
+            # Fetch dei dettagli in parallelo, ordine della pagina preservato
+            results = await asyncio.gather(*[
+                self._parse_article_item(item, url, semaphore) for item in candidates
+            ])
+            articles = [article for article in results if article]
             
             self.logger.info(f"Scraped {len(articles)} articles from {url}")
             return articles
@@ -103,48 +186,44 @@ class WebReader(BaseReader):
             self.logger.error(f"Error scraping page {url}: {str(e)}")
             return []
     
-    async def _parse_article_element(self, element, base_url: str) -> Optional[ScrapedArticle]:
-        """Parse single article element"""
+    async def _parse_article_item(self, item: Dict[str, Any], base_url: str, semaphore: asyncio.Semaphore) -> Optional[ScrapedArticle]:
+        """Build article from the fields extracted from a listing element"""
         try:
-            # Extract title
-            title = self._extract_text_by_selector(element, self.title_selector)
+            title = item['title']
             if not title:
                 self.logger.debug("Skipping article: no title found")
                 return None
             
-            # Extract URL
-            url = self._extract_url_by_selector(element, self.url_selector, base_url)
+            url = item['url']
             if not url:
                 self.logger.debug("Skipping article: no URL found")
                 return None
             
-            # Extract content (summary from listing page)
-            content = self._extract_text_by_selector(element, self.content_selector)
-            
-            # Extract summary
-            summary = self._extract_text_by_selector(element, self.summary_selector)
-            
-            # Extract author
-            author = self._extract_text_by_selector(element, self.author_selector)
+            # Content (summary from listing page), summary, author
+            content = item['content']
+            summary = item['summary']
+            author = item['author']
             
             # Extract date
-            published_date = self._extract_date_by_selector(element, self.date_selector)
-            
-            # Extract tags (from classes or data attributes)
-            tags = self._extract_tags_from_element(element, self.tag_selector)
+            published_date = self._parse_date_text(item['date_text'])
             
             # Create metadata
             metadata = {
                 'scraped_from': base_url,
-                'element_classes': element.get('class', []),
-                'element_id': element.get('id')
+                'element_classes': item['element_classes'],
+                'element_id': item['element_id']
             }
             
             # Try to fetch full content if URL is different from base
             if url != base_url and content and len(content) < 200:
-                full_content = await self._fetch_full_article_content(url)
-                if full_content:
-                    content = full_content
+                async with semaphore:
+                    full = await self._fetch_full_article_content(url)
+                if full is not None:
+                    content = full['content'] or content
+                    author = author or full['author']
+                    published_date = published_date or parse_date(full['published'])
+                    if full['source']:
+                        metadata['content_source'] = full['source']
             
             article = ScrapedArticle(
                 title=self.clean_text(title),
@@ -153,7 +232,7 @@ class WebReader(BaseReader):
                 author=author,
                 published_date=published_date,
                 summary=self.clean_text(summary) if summary else None,
-                tags=tags,
+                tags=item['tags'],
                 metadata=metadata
             )
             
@@ -164,139 +243,28 @@ class WebReader(BaseReader):
             self.logger.error(f"Error parsing article element: {str(e)}")
             return None
     
-    def __get_xml_node_by_selector(self, element, selector: str, multiple: bool = False) -> Optional[List[etree._Element]]:
-        """Get XML node by XPath selector"""
-        try:
-            found_element = element.xpath(selector)
-            
-            if found_element is None:
-                self.logger.debug(f"No element found for selector: {selector}")
-                return None
-            
-            if isinstance(found_element, list) and len(found_element) == 0:
-                self.logger.debug(f"No element found for selector: {selector}")
-                return None
-
-            found_element = [found_element[0]] if isinstance(found_element, list) and not multiple else found_element
-            
-            self.logger.debug(f"Found element: {found_element}({type(found_element)}) with selector: {selector}")
-
-            #print(type(found_element))
-            #print(dir(found_element))
-
-            return found_element
-        except Exception as e:
-            self.logger.debug(f"Error finding XML node with selector {selector}: {str(e)}")
-            return None
-    
-    def _extract_text_by_selector(self, element : etree._Element, selector: str) -> Optional[str]:
-        """Extract text using XPath selector"""
+    def _parse_date_text(self, date_str: Optional[str]) -> Optional[dt.datetime]:
+        """Parse the text of the date element"""
         try:
-            found_element = self.__get_xml_node_by_selector(element, selector)
-            if found_element is None:
-                return None
-
-            return found_element[0].text if len(found_element) > 0 else None
+            return parse_date(date_str)
         except Exception as e:
-            self.logger.debug(f"Error extracting text with selector {selector}: {str(e)}")
+            self.logger.debug(f"Error parsing date {date_str}: {str(e)}")
             return None
     
-    def _extract_url_by_selector(self, element, selector: str, base_url: str) -> Optional[str]:
-        """Extract url using XPath selector"""
+    async def _fetch_full_article_content(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch full content (e metadati) from article URL: dati strutturati, poi content_selector"""
         try:
-            found_element = self.__get_xml_node_by_selector(element, selector)
-            if found_element is None:
+            document = await self.fetch_document(url)
+            if document is None:
                 return None
-
-            href = found_element[0].attrib.get('href', '?') if len(found_element) > 0 and found_element[0].attrib.has_key('href') else None
-            
-            #print(found_element.keys())
-            #print(found_element.get('href', '?'))
-            #print(found_element.items())
-            
-            if href is not None:
-                # Make URL absolute
-                if href.startswith('http'):
-                    return href
-                else:
-                    return urljoin(base_url, href)
-            return None
-        except Exception as e:
-            self.logger.debug(f"Error extracting URL with selector {selector}: {str(e)}")
-            return None
-    
-    def _extract_date_by_selector(self, element : etree._Element, selector: str) -> Optional[dt.datetime]:
-        """Extract date using XPath selector"""
-        import parsedatetime
-        try:
-            found_element = self.__get_xml_node_by_selector(element, selector)
-            if found_element is None:
-                return None
-
-            # Try datetime attribute first
-            date_str = found_element[0].text if len(found_element) > 0 else None
-            
-            if date_str is not None:
-                try:
-                    # Try to parse as ISO format first
-                    return date_parser.parse(date_str)
-                except ValueError:
-                    # If that fails, try parsedatetime
-                    cal = parsedatetime.Calendar()
-                    if date_str == '1 hr ago':
-                        date_str = '1 hrs ago'
-                    elif date_str == '1 day ago':
-                        date_str = '24 hrs ago'
-                    elif date_str == '2 days ago':
-                        date_str = '48 hrs ago'
-                    elif date_str == '3 days ago':
-                        date_str = '72 hrs ago'
-                    time_struct, parse_status = cal.parse(date_str)
-                    if parse_status == 0:
-                        return dt.datetime(*time_struct[:6], tzinfo=dt.timezone.utc)
-
-            return None
-        except Exception as e:
-            self.logger.debug(f"Error extracting date with selector {selector}: {str(e)}")
-            return None
-    
-    def _extract_tags_from_element(self, element : etree._Element, selector: str) -> List[str]:
-        """Extract tags from element classes and data attributes"""
-        tags = []
-        try:
-            found_element = self.__get_xml_node_by_selector(element, selector, multiple=True)
-        
-            if found_element is None:
-                return tags
-        
-            # From data attributes
-            for elem in found_element:
-                value = elem.text
-                if value:
-                    tags.append(value.strip())                
             
-            return tags
-        except Exception as e:
-            self.logger.debug(f"Error extracting date with selector {selector}: {str(e)}")
-            return tags
-    
-    async def _fetch_full_article_content(self, url: str) -> Optional[str]:
-        """Fetch full content from article URL"""
-        try:
-            html_content = await self.fetch_url(url)
-            if not html_content:
-                return None
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            dom = etree.HTML(str(soup), parser=etree.HTMLParser())
-            
-            # Try to extract full content
-            content_elements = dom.xpath(self.content_selector)
-            if content_elements:
-                content = ' '.join([elem.text for elem in content_elements if elem.text is not None])
-                return self.clean_text(content)
+            full = await self.run_parser(
+                extract_content, document, document.encoding, self.content_selector, False, self.structured_data
+            )
+            if full['content'] is not None:
+                full['content'] = self.clean_text(full['content'])
             
-            return None
+            return full
             
         except Exception as e:
             self.logger.error(f"Error fetching full content for {url}: {str(e)}")
@@ -305,34 +273,12 @@ class WebReader(BaseReader):
     async def _get_pagination_urls(self) -> List[str]:
         """Get pagination URLs"""
         try:
-            html_content = await self.fetch_url(self.base_url)
-            if not html_content:
-                return []
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            dom = etree.HTML(str(soup), parser=etree.HTMLParser())
-
-            urls = []
-            pagination_links = dom.xpath(self.pagination_selector)
-            if not pagination_links or len(pagination_links) == 0:
+            # Estratti insieme agli articoli dallo stesso parse della pagina base
+            urls = (await self._load_page(self.base_url))['pagination']
+            if not urls:
                 self.logger.warning(f"No pagination links found using selector: {self.pagination_selector}")
-                return urls
-            
-            # Extract href attributes            
-            for elem in pagination_links:
-                
-                if not isinstance(elem, etree._Element):
-                    self.logger.warning(f"Expected etree._Element, got {type(elem)}")
-                    continue
-                
-                href = str(elem.attrib.get('href', '?') if elem.attrib.has_key('href') else None)
-                if href is not None:
-                    if href.startswith('http'):
-                        urls.append(href)
-                    else:
-                        urls.append(urljoin(self.base_url, href))
             
-            return list(set(urls))  # Remove duplicates
+            return urls
             
         except Exception as e:
             self.logger.error(f"Error getting pagination URLs: {str(e)}")
@@ -341,25 +287,15 @@ class WebReader(BaseReader):
     async def validate_source(self) -> bool:
         """Validate web source"""
         try:
-            html_content = await self.fetch_url(self.base_url)
-            if not html_content:
-                return False
-            
-            # Fetch the page
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Convert to etree for XPath
-            dom = etree.HTML(str(soup), parser=etree.HTMLParser())
+            # Stessa pagina (memoizzata) usata da fetch_articles
+            items = await self._load_listing(self.base_url)
             
             # Check if page has expected structure
-            # article_elements = soup.select(self.article_list_selector)
-            article_elements = dom.xpath(self.article_list_selector)
-            
-            if not article_elements:
+            if not items:
                 self.logger.warning(f"No articles found using selector: {self.article_list_selector}")
                 return False
             
-            self.logger.info(f"Web source validated successfully: {len(article_elements)} articles found")
+            self.logger.info(f"Web source validated successfully: {len(items)} articles found")
             return True
             
         except Exception as e:
@@ -0,0 +1,297 @@
+import logging
+import datetime as dt
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import case, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .articles import PreparedArticle, ScrapedArticle, prepare_articles
+from .seen_index import SeenUrlIndex
+from .tag_cache import TagCache
+from app.models import Source, Article, Tag, ArticleTag, ArticleMetadata, compute_url_hash
+
+# Parametri per query IN (SQLite ne ammette 999 nelle versioni più vecchie)
+IN_CHUNK_SIZE = 500
+# Righe per INSERT multi-VALUES dei tag (5 parametri per riga)
+TAG_INSERT_CHUNK_SIZE = 150
+# Tag per UPDATE aggregato delle frequenze (CASE con 2 parametri per tag)
+FREQUENCY_CHUNK_SIZE = 200
+
+
+class StaleTagCacheError(Exception):
+    """Un id della TagCache non esiste più nel database"""
+    pass
+
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ArticleWriter:
+    """Salva gli articoli di una run in blocco, con un solo commit per batch
+
+    Articoli esistenti e duplicati di contenuto sono cercati con una query IN
+    per batch; articoli, metadata e associazioni ai tag sono inseriti in blocco.
+    Se il batch fallisce (es. stesso URL inserito da un altro processo) viene
+    ripetuto riga per riga, ognuna nel proprio savepoint: le righe valide sono
+    salvate, quelle in errore scartate e loggate.
+
+    I tag sono risolti dalla TagCache di processo; quelli nuovi inseriti con
+    INSERT ... ON CONFLICT DO NOTHING e le frequenze aggiornate con un solo
+    UPDATE per batch.
+    """
+
+    def __init__(self, db: Session, seen_index: Optional[SeenUrlIndex] = None, tag_cache: Optional[TagCache] = None):
+        self.db = db
+        self.seen_index = seen_index
+        self.tag_cache = tag_cache if tag_cache is not None else TagCache()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # Aggiornamenti delle cache validi solo dopo il commit
+        self._pending_tags: Dict[str, int] = {}
+        self._pending_urls: List[Tuple[int, str, Optional[str]]] = []
+
+    def save_articles(self, scraped_articles: List[ScrapedArticle], source: Source) -> List[Article]:
+        """Salva gli articoli nuovi e ritorna, nell'ordine ricevuto, i salvati e quelli già presenti"""
+        prepared = prepare_articles(scraped_articles)
+        try:
+            saved, existing = self.save_prepared(prepared, source)
+            self.commit()
+        except Exception as e:
+            self.logger.error(f"Error saving {len(prepared)} articles for source {source.name}: {str(e)}")
+            self.rollback()
+            return []
+
+        by_url = {article.url: article for article in saved + existing}
+        return [by_url[item.url] for item in prepared if item.url in by_url]
+
+    def save_prepared(self, prepared: List[PreparedArticle], source: Source) -> Tuple[List[Article], List[Article]]:
+        """Aggiunge alla transazione corrente gli articoli nuovi, senza commit
+
+        Ritorna (inseriti, già presenti per URL). Il chiamante conclude con
+        commit() o, se solleva un'eccezione, con rollback().
+        """
+        if not prepared:
+            return [], []
+
+        existing = self._existing_by_url([item.url for item in prepared])
+        known_hashes = self._known_content_hashes([item.content_hash for item in prepared])
+
+        rows: List[Tuple[Article, PreparedArticle]] = []
+        for item in prepared:
+            if item.url in existing:
+                self.logger.debug(f"Article already exists: {item.url}")
+                continue
+
+            article = self._new_article(item, source)
+            if item.content_hash is not None:
+                if item.content_hash in known_hashes:
+                    self.logger.debug(f"Duplicate content found for: {item.title}")
+                    article.is_duplicate = True # type: ignore
+                # Copie successive nello stesso batch sono duplicati della prima
+                known_hashes.add(item.content_hash)
+            rows.append((article, item))
+
+        saved = self._write(rows, self._pending_tags)
+        # Id delle entry RSS indicizzati insieme all'URL
+        rss_ids = {item.url: item.metadata.get('rss_id') for item in prepared}
+        self._pending_urls.extend(
+            (source.id, article.url, rss_ids.get(article.url)) for article in list(existing.values()) + saved # type: ignore
+        )
+
+        self.logger.debug(f"Saved {len(saved)} new articles ({len(existing)} already present) for {source.name}")
+        return saved, list(existing.values())
+
+    def commit(self):
+        """Commit della sessione, poi tag creati e URL salvati entrano nelle cache"""
+        self.db.commit()
+        self.tag_cache.add(self._pending_tags)
+        if self.seen_index is not None:
+            for source_id, url, rss_id in self._pending_urls:
+                self.seen_index.add(source_id, url, rss_id)
+        self._pending_tags = {}
+        self._pending_urls = []
+
+    def rollback(self):
+        self.db.rollback()
+        self._pending_tags = {}
+        self._pending_urls = []
+
+    def _existing_by_url(self, urls: List[str]) -> Dict[str, Article]:
+        """Articoli già salvati, cercati per url_hash (indicizzato) e confermati per URL"""
+        wanted = set(urls)
+        hashes = list({compute_url_hash(url) for url in urls})
+        existing: Dict[str, Article] = {}
+        for chunk in _chunks(hashes):
+            for article in self.db.query(Article).filter(Article.url_hash.in_(chunk)):
+                if article.url in wanted:
+                    existing[article.url] = article # type: ignore
+        return existing
+
+    def _known_content_hashes(self, hashes: List[Optional[str]]) -> Set[str]:
+        values = list({value for value in hashes if value is not None})
+        known: Set[str] = set()
+        for chunk in _chunks(values):
+            known.update(row[0] for row in self.db.query(Article.content_hash).filter(Article.content_hash.in_(chunk)))
+        return known
+
+    def _new_article(self, item: PreparedArticle, source: Source) -> Article:
+        return Article(
+            title=item.title,
+            content=item.content,
+            summary=item.summary,
+            url=item.url,
+            author=item.author,
+            source_id=source.id,
+            published_date=item.published_date,
+            scraped_date=dt.datetime.now(dt.timezone.utc),
+            word_count=item.word_count,
+            language='it',  # Default, potrebbe essere rilevato automaticamente
+            is_duplicate=False,
+            content_hash=item.content_hash,
+            url_hash=item.url_hash
+        )
+
+    def _write(self, rows: List[Tuple[Article, PreparedArticle]], created_tags: Dict[str, int]) -> List[Article]:
+        """Inserisce il batch in un savepoint; se fallisce riprova riga per riga
+
+        I tag creati in savepoint andati a buon fine sono aggiunti a created_tags.
+        """
+        if not rows:
+            return []
+
+        try:
+            created: Dict[str, int] = {}
+            with self.db.begin_nested():
+                self._insert(rows, created_tags, created)
+            created_tags.update(created)
+            return [article for article, _ in rows]
+        except StaleTagCacheError as e:
+            self.logger.warning(f"{str(e)}, reloading tags and retrying row by row")
+            self.tag_cache.invalidate()
+        except Exception as e:
+            self.logger.warning(f"Batch insert of {len(rows)} articles failed, retrying row by row: {str(e)}")
+
+        saved = []
+        for article, item in rows:
+            # Nuova istanza: quella del batch fallito è stata espulsa dalla sessione
+            article = self._copy(article)
+            try:
+                created = {}
+                with self.db.begin_nested():
+                    self._insert([(article, item)], created_tags, created)
+                created_tags.update(created)
+                saved.append(article)
+            except Exception as e:
+                if isinstance(e, StaleTagCacheError):
+                    self.tag_cache.invalidate()
+                self.logger.error(f"Error saving article {item.title}: {str(e)}")
+        return saved
+
+    @staticmethod
+    def _copy(article: Article) -> Article:
+        columns = ('title', 'content', 'summary', 'url', 'author', 'source_id', 'published_date', 'scraped_date',
+                   'word_count', 'language', 'is_duplicate', 'content_hash', 'url_hash')
+        return Article(**{column: getattr(article, column) for column in columns})
+
+    def _insert(self, rows: List[Tuple[Article, PreparedArticle]], created_tags: Dict[str, int], created: Dict[str, int]):
+        """Articoli (un flush, id via RETURNING), poi metadata e tag in blocco"""
+        self.db.add_all([article for article, _ in rows])
+        self.db.flush()
+
+        metadata = [
+            {'article_id': article.id, 'key': key, 'value': value}
+            for article, item in rows
+            for key, value in item.metadata.items()
+        ]
+        if metadata:
+            self.db.execute(insert(ArticleMetadata), metadata)
+
+        self._insert_tags(rows, created_tags, created)
+
+    def _insert_or_ignore(self, table):
+        """INSERT con ON CONFLICT del dialetto in uso (SQLite o PostgreSQL)"""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return postgresql_insert(table)
+        return sqlite_insert(table)
+
+    def _select_tag_ids(self, names: List[str]) -> Dict[str, int]:
+        ids: Dict[str, int] = {}
+        for chunk in _chunks(names):
+            query = self.db.query(Tag.normalized_name, Tag.id).filter(Tag.normalized_name.in_(chunk)).order_by(Tag.id)
+            for normalized_name, tag_id in query:
+                ids.setdefault(normalized_name, tag_id)
+        return ids
+
+    def _resolve_tags(self, names: Dict[str, str], created_tags: Dict[str, int], created: Dict[str, int]) -> Dict[str, int]:
+        """normalized_name -> id: cache, tag creati in questo batch, database, infine inserimento"""
+        ids = self.tag_cache.lookup(self.db, names)
+        ids.update({name: created_tags[name] for name in names if name in created_tags and name not in ids})
+
+        missing = [name for name in names if name not in ids]
+        if missing:
+            # Creati da altri processi dopo il caricamento della cache
+            ids.update(self._select_tag_ids(missing))
+            missing = [name for name in missing if name not in ids]
+
+        if missing:
+            now = dt.datetime.now(dt.timezone.utc)
+            values = [
+                {'name': names[name], 'normalized_name': name, 'tag_type': 'auto', 'frequency': 0, 'created_date': now}
+                for name in missing
+            ]
+            for chunk in _chunks(values, TAG_INSERT_CHUNK_SIZE):
+                self.db.execute(self._insert_or_ignore(Tag).values(chunk).on_conflict_do_nothing(index_elements=['name']))
+
+            inserted = self._select_tag_ids(missing)
+            if self.tag_cache.knows_id(inserted.values()):
+                # Id di un tag cancellato riassegnato: la cache punta al tag sbagliato
+                raise StaleTagCacheError("Cached tag ids were reused by new tags")
+            created.update(inserted)
+            ids.update(inserted)
+            for name in missing:
+                if name not in ids:
+                    # Nome già usato da un tag con normalized_name diverso
+                    self.logger.warning(f"Cannot create tag '{names[name]}': name already taken")
+        return ids
+
+    def _insert_tags(self, rows: List[Tuple[Article, PreparedArticle]], created_tags: Dict[str, int], created: Dict[str, int]):
+        """Associazioni articolo-tag in blocco e un UPDATE aggregato delle frequenze"""
+        names: Dict[str, str] = {}
+        for _, item in rows:
+            for name, tag_name in item.tags.items():
+                names.setdefault(name, tag_name)
+
+        if not names:
+            return
+
+        ids = self._resolve_tags(names, created_tags, created)
+
+        links = []
+        deltas: Counter = Counter()
+        for article, item in rows:
+            for name in item.tags:
+                tag_id = ids.get(name)
+                if tag_id is None:
+                    continue
+                links.append({'article_id': article.id, 'tag_id': tag_id, 'confidence': 0.8, 'source': 'scraper'})
+                deltas[tag_id] += 1
+        if not links:
+            return
+
+        # Frequenze: un solo UPDATE ... CASE per blocco di tag; un id mancante invalida la cache
+        tag_ids = list(deltas)
+        for chunk in _chunks(tag_ids, FREQUENCY_CHUNK_SIZE):
+            result = self.db.execute(
+                update(Tag)
+                .where(Tag.id.in_(chunk))
+                .values(frequency=Tag.frequency + case({tag_id: deltas[tag_id] for tag_id in chunk}, value=Tag.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(chunk):
+                raise StaleTagCacheError(f"{len(chunk) - result.rowcount} cached tags no longer exist")
+
+        # Articoli appena inseriti: nessuna associazione preesistente, tag già deduplicati per articolo
+        self.db.execute(insert(ArticleTag), links)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark del salvataggio articoli (app/scrapers/writer.py)
+
+Confronta il vecchio percorso per articolo di ScraperManager._save_article
+(query per URL e content_hash, flush, query per tag, commit per articolo) con
+ArticleWriter.save_articles su un database SQLite su file, e riporta gli
+articoli salvati al secondo.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import datetime as dt
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Source, Article, Tag, ArticleTag, ArticleMetadata
+from app.scrapers.base import ScrapedArticle
+from app.scrapers.writer import ArticleWriter
+
+BATCH_SIZES = [20, 100, 500]
+TAGS = ['politica', 'economia', 'cronaca', 'sport', 'cultura', 'esteri', 'regione', 'sanità']
+
+
+def make_articles(prefix: str, count: int):
+    """Articoli di una run: ~2 KB di testo, 3 tag e 3 metadata ciascuno"""
+    return [
+        ScrapedArticle(
+            title=f"Notizia {prefix}-{i}",
+            content=f"Contenuto dell'articolo {prefix}-{i}. " + "Testo di esempio del corpo. " * 70,
+            url=f"https://example.it/{prefix}/articolo-{i}.html",
+            author="Redazione",
+            published_date=dt.datetime.now(dt.timezone.utc),
+            summary=f"Sommario {i}",
+            tags=[TAGS[i % len(TAGS)], TAGS[(i + 3) % len(TAGS)], f"tema-{i % 50}"],
+            metadata={'scraped_from': 'https://example.it/', 'element_id': f'a{i}', 'lastmod': None}
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_save(db, scraped_article: ScrapedArticle, source: Source):
+    """Implementazione precedente di ScraperManager._save_article (resa sincrona)"""
+    try:
+        if db.query(Article).filter_by(url=scraped_article.url).first():
+            return
+        article = Article(
+            title=scraped_article.title, content=scraped_article.content, summary=scraped_article.summary,
+            url=scraped_article.url, author=scraped_article.author, source_id=source.id,
+            published_date=scraped_article.published_date, scraped_date=dt.datetime.now(dt.timezone.utc),
+            word_count=len(scraped_article.content.split()), language='it'
+        )
+        article.generate_content_hash()
+        article.generate_url_hash()
+        if db.query(Article).filter_by(content_hash=article.content_hash).first():
+            article.is_duplicate = True
+        db.add(article)
+        db.flush()
+        for tag_name in scraped_article.tags or []:
+            tag_name_clean = tag_name.strip().lower()
+            tag = db.query(Tag).filter_by(normalized_name=tag_name_clean).first()
+            if not tag:
+                tag = Tag(name=tag_name, normalized_name=tag_name_clean, tag_type='auto')
+                db.add(tag)
+                db.flush()
+            if not db.query(ArticleTag).filter_by(article_id=article.id, tag_id=tag.id).first():
+                db.add(ArticleTag(article_id=article.id, tag_id=tag.id, confidence=0.8, source='scraper'))
+                tag.increment_frequency()
+        for key, value in (scraped_article.metadata or {}).items():
+            if value is not None:
+                db.add(ArticleMetadata(article_id=article.id, key=key, value=str(value)))
+        db.commit()
+    except Exception:
+        db.rollback()
+
+
+def new_session(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    source = Source(name='bench', base_url='https://example.it/')
+    db.add(source)
+    db.commit()
+    return engine, db, source
+
+
+def main():
+    print("💾 Benchmark salvataggio articoli (SQLite su file)")
+    print("=" * 60)
+    print(f"{'batch':>8}{'legacy art/s':>16}{'writer art/s':>16}{'speedup':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in BATCH_SIZES:
+            engine, db, source = new_session(directory, f'legacy-{size}.db')
+            # Database già popolato: le lookup non partono da tabelle vuote
+            for article in make_articles('warm', 200):
+                legacy_save(db, article, source)
+            start = time.perf_counter()
+            for article in make_articles('run', size):
+                legacy_save(db, article, source)
+            legacy = size / (time.perf_counter() - start)
+            db.close()
+            engine.dispose()
+
+            engine, db, source = new_session(directory, f'writer-{size}.db')
+            writer = ArticleWriter(db)
+            writer.save_articles(make_articles('warm', 200), source)
+            start = time.perf_counter()
+            saved = writer.save_articles(make_articles('run', size), source)
+            batch = size / (time.perf_counter() - start)
+            assert len(saved) == size
+            db.close()
+            engine.dispose()
+
+            print(f"{size:>8}{legacy:>16.0f}{batch:>16.0f}{batch / legacy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark del parsing delle date (app/scrapers/dates.py)
+
+Confronta la vecchia implementazione (dateutil, poi un nuovo parsedatetime.Calendar
+per ogni stringa non riconosciuta) con parse_date, a cache vuota e a cache calda,
+su un corpus di stringhe prese da feed e pagine di notizie.
+"""
+
+import sys
+import os
+import time
+import datetime as dt
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from dateutil import parser as date_parser
+import parsedatetime
+
+from app.scrapers.dates import parse_date, parse_absolute_date
+
+# Forme reali di date nei feed RSS/Atom e negli elenchi articoli
+CORPUS = [
+    # RSS 2.0 (RFC 822)
+    'Tue, 10 Jun 2025 10:30:00 GMT',
+    'Tue, 10 Jun 2025 12:30:00 +0200',
+    'Wed, 11 Jun 2025 08:05:13 +0000',
+    # Atom / JSON-LD / <time datetime>
+    '2025-06-10T10:30:00Z',
+    '2025-06-10T12:30:00+02:00',
+    '2025-06-10T12:30:00.000+02:00',
+    '2025-06-10',
+    # Siti italiani
+    '10/06/2025',
+    '10.06.2025 ore 12:30',
+    '10 giugno 2025',
+    '10 Giugno 2025 - 12:30',
+    'Martedì 10 giugno 2025',
+    '10 giu 2025',
+    # Siti inglesi
+    'June 10, 2025',
+    '10 Jun 2025',
+    # Relative
+    '3 ore fa',
+    'ieri',
+    'ieri alle 18:30',
+    '1 hr ago',
+    '2 days ago',
+]
+
+
+def legacy_parse(date_str: str):
+    """Implementazione precedente di WebReader._parse_date_text"""
+    try:
+        return date_parser.parse(date_str)
+    except ValueError:
+        cal = parsedatetime.Calendar()
+        if date_str == '1 hr ago':
+            date_str = '1 hrs ago'
+        elif date_str == '1 day ago':
+            date_str = '24 hrs ago'
+        elif date_str == '2 days ago':
+            date_str = '48 hrs ago'
+        elif date_str == '3 days ago':
+            date_str = '72 hrs ago'
+        time_struct, parse_status = cal.parse(date_str)
+        if parse_status == 0:
+            return dt.datetime(*time_struct[:6], tzinfo=dt.timezone.utc)
+    return None
+
+
+def rate(func, strings, min_seconds: float = 0.5, before=None) -> float:
+    """Stringhe/s ripetendo il corpus finché non passano almeno min_seconds"""
+    parsed = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        if before is not None:
+            before()
+        for text in strings:
+            func(text)
+        parsed += len(strings)
+        elapsed = time.perf_counter() - start
+    return parsed / elapsed
+
+
+def main():
+    print("📅 Benchmark parsing date")
+    print("=" * 60)
+
+    legacy = rate(legacy_parse, CORPUS)
+    cold = rate(parse_date, CORPUS, before=parse_absolute_date.cache_clear)
+    warm = rate(parse_date, CORPUS)
+    print(f"{'legacy':<26}{legacy:>12.0f} strings/s")
+    print(f"{'parse_date (cache vuota)':<26}{cold:>12.0f} strings/s{cold / legacy:>9.1f}x")
+    print(f"{'parse_date (cache calda)':<26}{warm:>12.0f} strings/s{warm / legacy:>9.1f}x")
+
+    print("=" * 60)
+    print(f"{'input':<34}{'legacy':<28}parse_date")
+    for text in CORPUS:
+        try:
+            before = legacy_parse(text)
+        except Exception as e:
+            before = type(e).__name__
+        print(f"{text:<34}{str(before)[:26]:<28}{parse_date(text)}")
+
+
+if __name__ == "__main__":
+    main()
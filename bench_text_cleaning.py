@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark della pulizia del testo HTML (app/scrapers/text.py)
+
+Confronta la vecchia implementazione (re.sub non precompilata + replace a catena)
+con html_to_text e riporta il throughput in MB/s. La vecchia versione lascia
+gran parte delle entità non decodificate: la colonna "unescape" è la stessa
+pulizia con html.unescape, cioè il riferimento a parità di output.
+"""
+
+import sys
+import os
+import html
+import re
+import time
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from app.scrapers.text import html_to_text
+
+# Frammento tipico dopo feedparser: caratteri già decodificati, poche entità residue
+FEED_PARAGRAPH = (
+    "<p>Il Consiglio regionale ha approvato la legge sul <strong>bilancio</strong> con 26 voti "
+    "favorevoli e 14 contrari. L’assessore ha dichiarato: “è un risultato importante” &amp; "
+    "ha ringraziato gli uffici. <a href=\"/notizie/123\">leggi tutto</a></p>\n"
+)
+# HTML di pagina con molte entità nominali
+ENTITY_PARAGRAPH = (
+    "<p>Il Consiglio regionale ha approvato&nbsp;la legge sul <strong>bilancio</strong> "
+    "con 26 voti favorevoli &amp; 14 contrari. L&#39;assessore ha dichiarato: "
+    "&quot;&egrave; un risultato importante&quot; &ndash; <a href=\"/notizie/123\">leggi tutto</a></p>\n"
+)
+SAMPLES = {
+    'feed summary (~300 B)': FEED_PARAGRAPH,
+    'feed article (~30 KB)': FEED_PARAGRAPH * 100,
+    'long page (~1.5 MB)': FEED_PARAGRAPH * 5000,
+    'entity-dense (~30 KB)': ENTITY_PARAGRAPH * 100,
+}
+
+
+def legacy_clean(content: str) -> str:
+    """Implementazione precedente: RSSReader._clean_html_content + BaseReader.clean_text"""
+    content = re.sub(r'<[^>]+>', ' ', content)
+    text = ' '.join(content.split())
+    text = text.replace('&nbsp;', ' ')
+    text = text.replace('&amp;', '&')
+    text = text.replace('&lt;', '<')
+    text = text.replace('&gt;', '>')
+    text = text.replace('&quot;', '"')
+    text = text.replace('&#39;', "'")
+    return text.strip()
+
+
+def legacy_unescape_clean(content: str) -> str:
+    """Vecchia pulizia dei tag con decodifica completa via html.unescape"""
+    content = re.sub(r'<[^>]+>', ' ', content)
+    return ' '.join(html.unescape(content).split())
+
+
+def throughput(func, content: str, min_seconds: float = 0.5) -> float:
+    """MB/s ripetendo func finché non passano almeno min_seconds"""
+    size = len(content.encode('utf-8'))
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        func(content)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return size * iterations / elapsed / (1024 * 1024)
+
+
+def main():
+    print("🧹 Benchmark pulizia testo HTML")
+    print("=" * 60)
+    print(f"{'input':<26}{'legacy MB/s':>12}{'unescape':>10}{'new MB/s':>12}{'vs legacy':>11}{'vs unescape':>13}")
+
+    for name, content in SAMPLES.items():
+        before = throughput(legacy_clean, content)
+        reference = throughput(legacy_unescape_clean, content)
+        after = throughput(html_to_text, content)
+        print(f"{name:<26}{before:>12.1f}{reference:>10.1f}{after:>12.1f}{after / before:>10.2f}x{after / reference:>12.2f}x")
+
+    print("=" * 60)
+    print("Esempio:", html_to_text(ENTITY_PARAGRAPH))
+    print("Legacy: ", legacy_clean(ENTITY_PARAGRAPH))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Scheduler di RSSNewsReader: processo long-running che esegue lo scrape di
+ogni source attiva alla scadenza del suo next_scrape
+
+Più istanze, anche su host diversi con lo stesso database, si dividono le
+source tramite lease.
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import logging
+import signal
+from dataclasses import replace
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from app.models.base import SessionLocal, create_tables
+from app.scrapers import ScraperConfig
+from app.scrapers.scheduler import ScrapeScheduler
+
+
+async def run(args, config: ScraperConfig):
+    scheduler = ScrapeScheduler(SessionLocal, config)
+
+    # SIGINT/SIGTERM: termina lo scrape in corso e chiude
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except NotImplementedError:
+            # Windows: resta KeyboardInterrupt
+            pass
+
+    try:
+        if args.once:
+            scheduler.refresh()
+            while await scheduler.tick():
+                pass
+        else:
+            await scheduler.run_forever()
+        return scheduler.status()
+    finally:
+        await scheduler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSSNewsReader scrape scheduler")
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Scrape the sources due now, then exit"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=ScraperConfig.scheduler_batch_size,
+        help=f"Max due sources dispatched together (default: {ScraperConfig.scheduler_batch_size})"
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=ScraperConfig.pipeline_fetch_workers,
+        help=f"Sources fetched concurrently (default: {ScraperConfig.pipeline_fetch_workers})"
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=int,
+        default=ScraperConfig.scheduler_refresh_interval,
+        help=f"Seconds between source reloads from the database (default: {ScraperConfig.scheduler_refresh_interval})"
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Worker name recorded on leased sources (default: hostname)"
+    )
+    parser.add_argument(
+        "--static-interval",
+        action="store_true",
+        help="Always poll every update_frequency seconds (no adaptive interval)"
+    )
+
+    args = parser.parse_args()
+
+    config = replace(
+        ScraperConfig(),
+        scheduler_batch_size=args.batch_size,
+        pipeline_fetch_workers=args.fetch_workers,
+        scheduler_refresh_interval=args.refresh_interval,
+        adaptive_interval=not args.static_interval,
+        worker_id=args.worker_id
+    )
+
+    logger = logging.getLogger(__name__)
+
+    print("⏰ Starting RSSNewsReader scheduler")
+    print("=" * 50)
+    print(f"📦 Batch size: {config.scheduler_batch_size}")
+    print(f"📡 Fetch workers: {config.pipeline_fetch_workers}")
+    print(f"🔄 Refresh interval: {config.scheduler_refresh_interval}s")
+    print(f"📈 Adaptive interval: {config.adaptive_interval}")
+    print("=" * 50)
+
+    try:
+        create_tables()
+        status = asyncio.run(run(args, config))
+        print(f"✅ {status['dispatched']} scrapes in {status['batches']} batches, {status['articles']} articles")
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped by user")
+    except Exception as e:
+        logger.error(f"Scheduler error: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script per selettori (CSS/XPath) e parsing delle date
+"""
+
+import sys
+import os
+import datetime as dt
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from lxml import html
+
+from app.scrapers.dates import parse_date
+from app.scrapers.selectors import SelectorError, compile_selector
+
+PAGE = html.fromstring("""
+<html><body>
+  <div class="news">
+    <article id="primo"><h2><a href="/a">Primo</a></h2><p>Testo uno</p></article>
+    <article><h2 class="titolo"><a href="/b">Secondo</a></h2></article>
+  </div>
+</body></html>
+""")
+
+def _texts(selector, context=PAGE):
+    return [element.text_content().strip() for element in compile_selector(selector)(context)]
+
+def test_selector_classification():
+    """XPath e CSS riconosciuti dalla forma del selettore"""
+    print("\n🎯 Test selector classification...")
+
+    article = PAGE.xpath('//article')[0]
+    cases = [
+        # XPath: assoluti, relativi, raggruppati e nomi di elemento sull'asse child
+        ('//article//h2', ['Primo', 'Secondo'], PAGE),
+        ('.//h2/a', ['Primo'], article),
+        ('(//h2)[2]', ['Secondo'], PAGE),
+        ('h2', ['Primo'], article),
+        ('p', [], PAGE.xpath('//div')[0]),
+        ('h2/a', ['Primo'], article),
+        # CSS: classi, id, combinatori
+        ('div.news h2.titolo', ['Secondo'], PAGE),
+        ('#primo p', ['Testo uno'], PAGE),
+        ('article > h2 a', ['Primo', 'Secondo'], PAGE),
+        # Prefissi espliciti
+        ('css:h2 a', ['Primo'], article),
+        ('xpath://p', ['Testo uno'], PAGE),
+    ]
+    for selector, expected, context in cases:
+        texts = _texts(selector, context)
+        assert texts == expected, f"{selector}: {texts}"
+        print(f"   ✅ {selector!r} -> {texts}")
+
+    for selector in ('', 'a:hover', '//h2['):
+        try:
+            compile_selector(selector)
+        except SelectorError as e:
+            print(f"   ✅ {selector!r} rejected: {e}")
+        else:
+            raise AssertionError(f"{selector!r} should be rejected")
+
+def test_date_fast_paths():
+    """Un caso per ciascun percorso veloce di parse_date"""
+    print("\n📅 Test date parsing...")
+
+    utc = dt.timezone.utc
+    now = dt.datetime(2025, 6, 10, 12, 0, tzinfo=utc)
+    cases = [
+        # ISO 8601
+        ('2025-06-09T08:30:00+00:00', dt.datetime(2025, 6, 9, 8, 30, tzinfo=utc)),
+        # RFC 822 (feed RSS)
+        ('Mon, 09 Jun 2025 08:30:00 GMT', dt.datetime(2025, 6, 9, 8, 30, tzinfo=utc)),
+        # Relativa
+        ('3 ore fa', now - dt.timedelta(hours=3)),
+        ('2 days ago', now - dt.timedelta(days=2)),
+    ]
+    for text, expected in cases:
+        parsed = parse_date(text, now)
+        assert parsed == expected, f"{text}: {parsed}"
+        print(f"   ✅ {text!r} -> {parsed}")
+
+    # Date senza fuso: sono nel fuso locale, si confrontano i campi
+    local_cases = [
+        # Numerica italiana, giorno prima del mese
+        ('09/06/2025 08:30', (2025, 6, 9, 8, 30)),
+        # Mese in italiano, anche dopo un prefisso
+        ('9 giugno 2025 ore 08:30', (2025, 6, 9, 8, 30)),
+        ('Pubblicato il 9 giugno 2025', (2025, 6, 9, 0, 0)),
+        # Giorno relativo e data senza anno, rispetto a now
+        ('ieri alle 08:30', None),
+        ('20 dicembre', (2024, 12, 20, 0, 0)),
+        # Altre forme lasciate a dateutil
+        ('June 9, 2025', (2025, 6, 9, 0, 0)),
+    ]
+    for text, fields in local_cases:
+        parsed = parse_date(text, now)
+        assert parsed is not None and parsed.tzinfo is not None, f"{text}: {parsed}"
+        if fields is None:
+            yesterday = (now.astimezone(parsed.tzinfo) - dt.timedelta(days=1)).date()
+            fields = (yesterday.year, yesterday.month, yesterday.day, 8, 30)
+        assert (parsed.year, parsed.month, parsed.day, parsed.hour, parsed.minute) == fields, f"{text}: {parsed}"
+        print(f"   ✅ {text!r} -> {parsed}")
+
+    for text in ('', 'non è una data', '31 febbraio 2025'):
+        assert parse_date(text, now) is None, text
+    print("   ✅ Invalid dates -> None")
+
+if __name__ == "__main__":
+    test_selector_classification()
+    test_date_fast_paths()
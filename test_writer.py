@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script per ArticleWriter e SourceLeases su un database SQLite temporaneo
+"""
+
+import sys
+import os
+import tempfile
+
+# Aggiungi il percorso root del progetto al PYTHONPATH
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Source, Article, ArticleMetadata, ArticleTag, Tag
+from app.models.base import _set_sqlite_pragmas
+from app.scrapers.articles import ScrapedArticle
+from app.scrapers.leases import SourceLeases
+from app.scrapers.writer import ArticleWriter
+
+def _create_session(path):
+    """Database SQLite su file (WAL come in produzione), con tabelle e una source"""
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 30})
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(Source(name="Test Source", base_url="https://example.com"))
+    db.commit()
+    return Session, db
+
+def _article(n, content=None, tags=None):
+    return ScrapedArticle(
+        title=f"Articolo {n}",
+        content=content or f"Contenuto dell'articolo numero {n}",
+        url=f"https://example.com/articolo-{n}",
+        tags=tags or [],
+        metadata={'rss_id': f"id-{n}"}
+    )
+
+def test_writer_batch_insert():
+    """Un batch di articoli nuovi: articoli, metadata e tag in un solo commit"""
+    print("\n💾 Test ArticleWriter batch insert...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Session, db = _create_session(os.path.join(tmp, 'writer.db'))
+        try:
+            source = db.query(Source).first()
+            writer = ArticleWriter(db)
+
+            saved = writer.save_articles([
+                _article(1, tags=['Politica', 'Economia']),
+                _article(2, tags=['politica']),
+                _article(3),
+            ], source)
+
+            assert [article.url for article in saved] == [f"https://example.com/articolo-{n}" for n in (1, 2, 3)]
+            assert db.query(Article).count() == 3
+            assert db.query(ArticleMetadata).filter_by(key='rss_id').count() == 3
+            assert db.query(ArticleTag).count() == 3
+            frequencies = {tag.normalized_name: tag.frequency for tag in db.query(Tag)}
+            assert frequencies == {'politica': 2, 'economia': 1}, frequencies
+            print(f"   ✅ Saved {len(saved)} articles, tag frequencies {frequencies}")
+
+            # Seconda run con gli stessi URL: nessun nuovo inserimento
+            saved = writer.save_articles([_article(1), _article(2)], source)
+            assert len(saved) == 2
+            assert db.query(Article).count() == 3
+            print("   ✅ Existing URLs returned without new rows")
+        finally:
+            db.close()
+
+def test_writer_duplicate_marking():
+    """Stesso contenuto con URL diverso: l'articolo è salvato come duplicato"""
+    print("\n🔁 Test ArticleWriter duplicate marking...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Session, db = _create_session(os.path.join(tmp, 'writer.db'))
+        try:
+            source = db.query(Source).first()
+            writer = ArticleWriter(db)
+
+            writer.save_articles([_article(1, content="Stesso testo ripubblicato")], source)
+            # Duplicato di un articolo già salvato e, nello stesso batch, della prima copia
+            saved = writer.save_articles([
+                _article(2, content="Stesso testo ripubblicato"),
+                _article(3, content="Testo nuovo"),
+                _article(4, content="Testo nuovo"),
+            ], source)
+
+            flags = {article.url.rsplit('-', 1)[1]: article.is_duplicate for article in saved}
+            assert flags == {'2': True, '3': False, '4': True}, flags
+            assert db.query(Article).count() == 4
+            print(f"   ✅ Duplicate flags: {flags}")
+        finally:
+            db.close()
+
+def test_writer_row_fallback():
+    """URL inserito da un altro processo durante il batch: le altre righe sono salvate una per una"""
+    print("\n🧩 Test ArticleWriter row-by-row fallback...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Session, db = _create_session(os.path.join(tmp, 'writer.db'))
+        other = Session()
+        try:
+            source = db.query(Source).first()
+            writer = ArticleWriter(db)
+
+            # Dopo la ricerca degli URL esistenti un altro processo salva l'articolo 2
+            existing_by_url = writer._existing_by_url
+
+            def existing_then_clash(urls):
+                existing = existing_by_url(urls)
+                other.add(Article(title="Altro processo", content="Salvato altrove", url=_article(2).url, source_id=source.id))
+                other.commit()
+                return existing
+
+            writer._existing_by_url = existing_then_clash
+
+            saved = writer.save_articles([_article(1), _article(2), _article(3)], source)
+
+            assert [article.url for article in saved] == [_article(1).url, _article(3).url]
+            titles = sorted(article.title for article in db.query(Article))
+            assert titles == ["Altro processo", "Articolo 1", "Articolo 3"], titles
+            # I metadata della riga scartata non restano nel database
+            assert db.query(ArticleMetadata).filter_by(key='rss_id').count() == 2
+            print(f"   ✅ Saved {len(saved)} of 3 articles after the unique URL clash")
+        finally:
+            other.close()
+            db.close()
+
+def test_leases_single_owner():
+    """Due worker reclamano la stessa source: solo uno la ottiene"""
+    print("\n🔒 Test SourceLeases...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Session, db = _create_session(os.path.join(tmp, 'leases.db'))
+        first = SourceLeases(Session(), 'worker-a', ttl=60)
+        second = SourceLeases(Session(), 'worker-b', ttl=60)
+        try:
+            source_id = db.query(Source.id).scalar()
+
+            assert first.claim([source_id]) == {source_id}
+            assert second.claim([source_id]) == set()
+            print("   ✅ Second worker cannot claim a held source")
+
+            # Rilasciata dal primo, la source torna reclamabile
+            first.release([source_id])
+            assert second.claim([source_id]) == {source_id}
+            assert first.claim([source_id]) == set()
+            print("   ✅ Released source claimed by the other worker")
+        finally:
+            for leases in (first, second):
+                leases.close()
+                leases.db.close()
+            db.close()
+
+if __name__ == "__main__":
+    test_writer_batch_insert()
+    test_writer_duplicate_marking()
+    test_writer_row_fallback()
+    test_leases_single_owner()